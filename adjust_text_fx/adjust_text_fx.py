@@ -181,6 +181,7 @@ class AdjustFX(object):
 
     def __init__(self, selection):
         import xml.etree.cElementTree as ET
+        import shutil
 
         print ('\n', '>' * 20, 'adjust text fx %s' % VERSION, '<' * 20, '\n')
 
@@ -191,9 +192,7 @@ class AdjustFX(object):
 
         self.selected_segment = selection[0]
 
-        self.temp_save_path = os.path.join(SCRIPT_PATH, 'temp')
-        if not os.path.isdir(self.temp_save_path):
-            os.makedirs(self.temp_save_path)
+        self.temp_save_path = create_temp_folder('adjust_text_fx')
 
         self.temp_text_file = os.path.join(self.temp_save_path, 'temp_text.ttg_node')
         print ('temp_text_file:', self.temp_text_file)
@@ -236,6 +235,7 @@ class AdjustFX(object):
         # Check text fx for text layers
 
         if not self.get_value('FontName'):
+            shutil.rmtree(self.temp_save_path, True)
             return message_box('Segment text fx contains no text layers')
 
         # Check number of fx on segment. If only one add additional fx
@@ -1301,7 +1301,7 @@ class AdjustFX(object):
 
         # Remove temp files
 
-        shutil.rmtree(self.temp_save_path)
+        shutil.rmtree(self.temp_save_path, True)
 
         print ('\n>>> Temp files removed <<<\n')
 
@@ -1591,7 +1591,7 @@ class AdjustFX(object):
 
         # Remove temp files
 
-        shutil.rmtree(self.temp_save_path)
+        shutil.rmtree(self.temp_save_path, True)
 
         # Close window
 
@@ -1599,6 +1599,23 @@ class AdjustFX(object):
 
 # -------------------------------------- #
 
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
+
 def message_box(message):
 
     msg_box = QtWidgets.QMessageBox()
@@ -14,6 +14,9 @@ Description:
 
     Scene must have another camera added other than just the default camera
 
+    Multiple surfaces or geos can be selected, each gets its own projector or diffuse map
+    projecting from one new frame camera with one save and reload of the Action node
+
     Right-click on Action surface or geo  -> Create Projection... -> Projector Projection
     Right-click on Action surface or geo  -> Create Projection... -> Projector Light-Linked Projection
     Right-click on Action surface or geo  -> Create Projection... -> Diffuse Projection
@@ -49,68 +52,218 @@ from __future__ import print_function
 
 VERSION = 'v2.0'
 
-def find_line(action_filename, item):
+# Selected node types that projections are created for
 
-    with open(action_filename, 'r') as action_file:
-        for num, line in enumerate(action_file, 1):
-            if item in line:
-                item_line = num
-                return item_line
+GEO_TYPES = ('Surface', 'Geom')
 
-def find_next_line(action_filename, item, item_line_num):
+# Last Action setup read or written, kept so the next projection on the same Action node
+# doesn't have to index it again while the saved setup is the same
 
-    with open(action_filename, 'r') as action_file:
-        for num, line in enumerate(action_file, 1):
-            if num > item_line_num:
+ACTION_SETUPS = {}
+
+class ActionSetup(object):
+    """
+    Saved Action setup read once and indexed by node so lookups don't have to rescan the file
+
+    Each node has its type, name, number and the line numbers of its Node and Name lines, first line of each key,
+    Child lines and Channel blocks. Parents are found from Child lines. Line numbers start at 1 like the file scans they replace
+
+    Edits are kept until write, so any number of them cost one pass over the setup. Lookups see the setup as it was last
+    read or written, so a setup can be kept and used again while the Action node hasn't changed
+    """
+
+    def __init__(self, action_filename):
+
+        self.action_filename = action_filename
+
+        with open(action_filename, 'r') as action_file:
+            self.index(action_file.readlines())
+
+    def index(self, lines):
+
+        # Index nodes of setup lines, edits and remembered lookups start over
+
+        self.lines = lines
+
+        self.nodes = []
+        self.node_names = {}
+        self.node_numbers = {}
+
+        # Keys belong to the last node opened
+
+        node = None
+
+        for line_number, line in enumerate(self.lines, 1):
+            words = line.split()
+
+            if not words:
+                continue
+
+            key = words[0]
+
+            if key == 'Node':
+                node = {'type': ' '.join(words[1:]), 'line': line_number, 'name': None, 'name_line': None, 'number': None, 'keys': {}, 'child_lines': [], 'channels': {}}
+                self.nodes.append(node)
+                continue
+            elif node is None:
+                continue
+
+            if key == 'Name' and node['name'] is None:
+                node['name'] = words[-1]
+                node['name_line'] = line_number
+                if node['name'] not in self.node_names:
+                    self.node_names[node['name']] = node
+            elif key == 'Number' and node['number'] is None:
+                node['number'] = words[-1]
+                self.node_numbers[node['number']] = node
+            elif key == 'Child':
+                node['child_lines'].append(line_number)
+            elif key == 'Channel' and len(words) > 1:
+                if words[1] not in node['channels']:
+                    node['channels'][words[1]] = line_number
+
+            if key not in node['keys']:
+                node['keys'][key] = line_number
+
+        # Child node number to parent node
+
+        self.parents = {}
+
+        for node in self.nodes:
+            for line_number in node['child_lines']:
+                child_number = self.value(line_number)
+                if child_number not in self.parents:
+                    self.parents[child_number] = node
+
+        # Lines found by find_line
+
+        self.found_lines = {}
+
+        # Edits by line number, inserted lines go after their line number
+
+        self.replaced_lines = {}
+        self.inserted_lines = {}
+
+    def node(self, node_name):
+
+        return self.node_names.get(node_name)
+
+    def parent(self, node):
+
+        # Returns node that has node as a child, None if node isn't a child
+
+        return self.parents.get(node['number'])
+
+    def parent_name(self, node_name):
+
+        # Returns name of node that node is parented to, None if it's only parented to scene
+
+        node = self.node(node_name)
+        parent = node and self.parent(node)
+
+        if parent is None or parent['name'] == 'scene':
+            return None
+        return parent['name']
+
+    def children(self, node):
+
+        # Returns nodes linked as children of node
+
+        child_numbers = [self.value(line_number) for line_number in node['child_lines']]
+
+        return [self.node_numbers[child_number] for child_number in child_numbers if child_number in self.node_numbers]
+
+    def find_line(self, item):
+
+        # Returns first line of setup with item anywhere in it, for lookups that aren't a node key
+
+        if item not in self.found_lines:
+            self.found_lines[item] = None
+            for line_number, line in enumerate(self.lines, 1):
                 if item in line:
-                    item_line = num
-                    return item_line
+                    self.found_lines[item] = line_number
+                    break
 
-def get_line_value(action_filename, line_number):
+        return self.found_lines[item]
 
-    with open(action_filename, 'r') as action_file:
-        for num, line in enumerate(action_file, 1):
-            if num == line_number:
-                item_value = line.rsplit(' ', 1)[1]
-                return item_value
+    def value(self, line_number):
 
-#--------------------------------------------#
+        # Returns last value on line
 
-def get_result_camera():
-    import flame
+        return self.lines[line_number - 1].split()[-1]
 
-    def find_parent(child_num):
+    def set_value(self, line_number, value):
 
-        action_file = open(action_filename)
-        lines = action_file.readlines()
-        name_line = lines[child_num]
-        action_file.close()
+        # Replace last value on line, keeping its key and indent
 
-        if 'Name' in name_line:
-            camera_parent_name = name_line.rsplit(' ', 1)[1][:-1]
+        line = self.replaced_lines.get(line_number, self.lines[line_number - 1])
 
-            if camera_parent_name == 'scene':
-                camera_parent_name = None
+        self.replaced_lines[line_number] = '%s %s\n' % (line.rstrip().rsplit(None, 1)[0], value)
 
-            return camera_parent_name
+    def replace_line(self, line_number, line):
 
-        child_num = child_num - 1
-        return find_parent(child_num)
+        self.replaced_lines[line_number] = line
 
-    # Save action to check result camera - result camera should not be default camera
+    def remove_line(self, line_number):
+
+        self.replaced_lines[line_number] = ''
+
+    def insert_lines(self, line_number, lines):
+
+        # Lines are inserted after line number in the order they're added
+
+        self.inserted_lines.setdefault(line_number, []).extend(lines)
+
+    def add_child(self, node, child_number):
+
+        # Link node number as child of node, after its last Child line or its Number line
+
+        number_line = node['keys']['Number']
+        indent = self.lines[number_line - 1][:-len(self.lines[number_line - 1].lstrip())]
+
+        if node['child_lines']:
+            line_number = node['child_lines'][-1]
+        else:
+            line_number = number_line
 
-    save_action_path, action_filename, action_node, action_node_name, temp_folder = save_action_node()
+        self.insert_lines(line_number, ['%sChild %s\n' % (indent, child_number)])
+
+    def write(self):
+
+        # Write setup with all edits in one pass, then index setup as written
+
+        contents = []
+
+        for line_number, line in enumerate(self.lines, 1):
+            contents.append(self.replaced_lines.get(line_number, line))
+            contents.extend(self.inserted_lines.get(line_number, []))
+
+        contents = ''.join(contents)
+
+        with open(self.action_filename, 'w') as action_file:
+            action_file.write(contents)
+
+        self.index(contents.splitlines(True))
+
+#--------------------------------------------#
+
+def get_result_camera(temp_folder):
+    import flame
+
+    # Get action setup to check result camera - result camera should not be default camera
+
+    action_setup, action_node = get_action_setup(temp_folder)
 
     # Find result camera line
 
-    item_line = find_line(action_filename, 'ResultCamChannel')
+    item_line = action_setup.find_line('ResultCamChannel')
 
     result_cam_line = item_line + 3
     # print ('result_cam_line:', result_cam_line)
 
     # Get result camera value
 
-    item_value = get_line_value(action_filename, result_cam_line)
+    item_value = action_setup.value(result_cam_line)
 
     result_camera_num = int(item_value) + 1
     # print ('result_camera_num:', result_camera_num)
@@ -142,32 +295,14 @@ def get_result_camera():
         result_cam_name = str(result_cam.name)[1:-1]
         # print ('result_cam_name:', result_cam_name)
 
-    # Get result camera node number for action file to search for node camera is parented to
-
-    item_line = find_line(action_filename, result_cam_name)
-    result_cam_number_line = item_line + 1
-    # print ('result_cam_number_line:', result_cam_number_line)
-
     # Get name of node camera is parented to if it has a parent
 
-    item_value = get_line_value(action_filename, result_cam_number_line)
-    result_cam_number = item_value
-    # print ('result_cam_number:', result_cam_number)
-
-    result_cam_child_num = 'Child ' + result_cam_number
-    # print ('result_cam_child_num:', result_cam_child_num)
-
-    item_line = find_line(action_filename, result_cam_child_num)
-    child_num = item_line
-    # print ('child_num:', child_num)
-
-    # Get name of node parented to camera node
-
-    camera_parent_name = find_parent(child_num)
+    camera_parent_name = action_setup.parent_name(result_cam_name)
+    # print ('camera_parent_name:', camera_parent_name)
 
     # print ('\n >>> done getting result camera <<<\n')
 
-    return camera_parent_name, action_filename, action_node
+    return camera_parent_name, action_setup, action_node
 
 def create_cur_frame_camera(projection_type):
     import flame
@@ -300,7 +435,7 @@ def get_action_node():
 
     return action_node, action_node_name
 
-def save_action_node():
+def save_action_node(temp_folder):
     import flame
     import os
 
@@ -310,16 +445,9 @@ def save_action_node():
 
     # Save Action node
 
-    temp_folder = '/opt/Autodesk/shared/python/temp_action'
     save_action_path = os.path.join(temp_folder, action_node_name)
     # print ('save_action_path:', save_action_path)
 
-    try:
-        os.makedirs(temp_folder)
-    except:
-        # print ('temp action folder already exists')
-        pass
-
     action_node.save_node_setup(save_action_path)
 
     # Set Action path and filename variable
@@ -329,7 +457,58 @@ def save_action_node():
 
     # print ('\n>>> action node saved <<<\n')
 
-    return save_action_path, action_filename, action_node, action_node_name, temp_folder
+    return save_action_path, action_filename, action_node, action_node_name
+
+def get_action_setup(temp_folder):
+    import flame
+
+    # Always save action node, result camera, links and positions can change without nodes being added or removed
+    # Use kept action setup if saved setup is the same, otherwise read saved setup
+
+    save_action_path, action_filename, action_node, action_node_name = save_action_node(temp_folder)
+
+    with open(action_filename, 'r') as action_file:
+        lines = action_file.readlines()
+
+    action_setup = ACTION_SETUPS.get('action_setup')
+
+    if ACTION_SETUPS.get('key') == (str(flame.batch.name), action_node_name) and action_setup.lines == lines:
+        print ('>>> action setup unchanged - using kept action setup <<<')
+        action_setup.action_filename = action_filename
+        return action_setup, action_node
+
+    action_setup = ActionSetup(action_filename)
+
+    keep_action_setup(action_node, action_node_name, action_setup)
+
+    return action_setup, action_node
+
+def keep_action_setup(action_node, action_node_name, action_setup):
+    import flame
+
+    # Keep action setup for next projection, only the last Action node is kept
+
+    ACTION_SETUPS.clear()
+    ACTION_SETUPS.update({'key': (str(flame.batch.name), action_node_name),
+                          'action_setup': action_setup})
+
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+    import os
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
 
 def name_node(node_type, node_num=0):
     import flame
@@ -371,11 +550,25 @@ def create_projector_projection(selection):
 
     projection_type = 'projector'
 
+    # Private temp folder for action setups saved while creating projection
+
+    temp_folder = create_temp_folder('create_projection')
+
+    try:
+        return projector_projection(selection, projection_type, temp_folder)
+    finally:
+        shutil.rmtree(temp_folder, True)
+
+def projector_projection(selection, projection_type, temp_folder):
+    import time
+
+    start_time = time.time()
+
     # Get result camera
 
-    camera_parent_name, action_filename, action_node = get_result_camera()
+    camera_parent_name, action_setup, action_node = get_result_camera(temp_folder)
 
-    # Create camera at current frame
+    # Create camera at current frame, all projectors are parented to it
 
     new_camera, new_camera_name, camera_exists, new_camera_index = create_cur_frame_camera(projection_type)
 
@@ -388,197 +581,137 @@ def create_projector_projection(selection):
         child_node = action_node.get_node(new_camera_name)
         action_node.connect_nodes(parent_node, child_node, link_type='Default')
 
-    # Get name of surface/geo
+    # Get names of selected surfaces/geos
 
-    for item in selection:
-        geo_name_line = 'Name ' + str(item.name)[1:-1]
-        geo_type = item.type
-        # print ('geo_name_line:', geo_name_line)
+    geo_names = [str(item.name)[1:-1] for item in selection if item.type in GEO_TYPES]
+    # print ('geo_names:', geo_names)
 
     # Get position of existing projector if one already exists
 
     node_projector_pos_x_line = 0
     node_projector_pos_y_line = 0
 
-    with open(action_filename, 'r') as action_file:
-        for num, line in enumerate(action_file, 1):
-            if 'Node Projector' in line:
-                node_projector_pos_x_line = num + 7
-                node_projector_pos_y_line = num + 8
+    for node in action_setup.nodes:
+        if node['type'].startswith('Projector'):
+            node_projector_pos_x_line = node['line'] + 7
+            node_projector_pos_y_line = node['line'] + 8
 
     if node_projector_pos_x_line != 0:
         # print ('node_projector_pos_x_line:', node_projector_pos_x_line)
         # print ('node_projector_pos_y_line:', node_projector_pos_y_line)
 
-        item_value = get_line_value(action_filename, node_projector_pos_x_line)
+        item_value = action_setup.value(node_projector_pos_x_line)
         node_projector_pos_x = item_value
         # print ('node_projector_pos_x:', node_projector_pos_x)
 
-        item_value = get_line_value(action_filename, node_projector_pos_y_line)
+        item_value = action_setup.value(node_projector_pos_y_line)
         node_projector_pos_y = item_value
         # print ('node_projector_pos_y:', node_projector_pos_y)
 
-    # Create projector
+    # Create projector for each surface/geo
 
-    projector = action_node.create_node('Projector')
+    projector_names = []
 
-    # Name projector
+    for geo_name in geo_names:
+        projector = action_node.create_node('Projector')
 
-    projector_name = name_node('projector_fr')
-    projector.name = projector_name
+        # Name projector
 
-    # Parent camera to projector
+        projector_name = name_node('projector_fr')
+        projector.name = projector_name
 
-    action_node.connect_nodes(new_camera, projector)
+        # Parent camera to projector
 
-    # Assign new_camera field of view to projector
+        action_node.connect_nodes(new_camera, projector)
 
-    projector.fov = new_camera.fov
-    # print ('projectorFOV:', projector.fov)
-
-    # Zero out projector z position
-
-    projector.position = (0, 0, 0)
-    # print ('projectorPosition:', projector.position, '\n')
-
-    # Save action node
+        # Assign new_camera field of view to projector
 
-    save_action_path, action_filename, action_node, action_node_name, temp_folder = save_action_node()
+        projector.fov = new_camera.fov
+        # print ('projectorFOV:', projector.fov)
 
-    # Get line numbers for geo, projector, and camera positions in schematic
-    # Get x and y position of surface/geo in schematic
+        # Zero out projector z position
 
-    if geo_type == 'Surface':
-        item_line = find_line(action_filename, geo_name_line)
+        projector.position = (0, 0, 0)
+        # print ('projectorPosition:', projector.position, '\n')
 
-        item_line = find_next_line(action_filename, 'PosX', item_line)
+        projector_names.append(projector_name)
 
-        geo_pos_x_line_num = item_line
-        geo_pos_y_line_num = geo_pos_x_line_num + 1
-
-        # print ('geo_pos_x_line_num:', geo_pos_x_line_num)
-        # print ('geo_pos_y_line_num:', geo_pos_y_line_num, '\n')
-
-    elif geo_type == 'Geom':
-        item_line = find_line(action_filename, geo_name_line)
-
-        item_line = find_next_line(action_filename, 'PosX', item_line)
-
-        geo_pos_x_line_num = item_line
-        geo_pos_y_line_num = geo_pos_x_line_num + 1
-
-        # print ('geo_pos_x_line_num:', geo_pos_x_line_num)
-        # print ('geo_pos_y_line_num:', geo_pos_y_line_num, '\n')
-
-    # Get x and y position of projector
-
-    item_line = find_line(action_filename, projector_name)
-    item_line = find_next_line(action_filename, 'PosX', item_line)
-
-    projector_pos_x_line_num = item_line
-    projector_pos_y_line_num = projector_pos_x_line_num + 1
-
-    # print ('projector_pos_x_line_num:', projector_pos_x_line_num)
-    # print ('projector_pos_y_line_num:', projector_pos_y_line_num, '\n')
-
-    # Get x and y position of new_camera
-
-    item_line = find_line(action_filename, new_camera_name)
-
-    item_line = find_next_line(action_filename, 'PosX', item_line)
-
-    new_camera_pos_x_line_num = item_line
-    new_camera_pos_y_line_num = new_camera_pos_x_line_num + 1
-
-    # print ('new_camera_pos_x_line_num:', new_camera_pos_x_line_num)
-    # print ('new_camera_pos_y_line_num:', new_camera_pos_y_line_num, '\n')
-
-    # Get position values for geo in schematic
+    # Save action node
 
-    item_value = get_line_value(action_filename, geo_pos_x_line_num)
-    geo_pos_x = item_value
-    # print ('geo_pos_x:', geo_pos_x)
+    save_action_path, action_filename, action_node, action_node_name = save_action_node(temp_folder)
 
-    item_value = get_line_value(action_filename, geo_pos_y_line_num)
-    geo_pos_y = item_value
-    # print ('geo_pos_y:', geo_pos_y)
+    action_setup = ActionSetup(action_filename)
 
-    # Set new position values for projector and camera next to geo if no projector existing
+    # Set new position values for first projector next to first geo if no projector existing
 
     if node_projector_pos_x_line == 0:
-        new_projector_pos_x = str(int(geo_pos_x) + 300)
-        new_projector_pos_y = geo_pos_y
-        # print ('new_projector_pos_x:', new_projector_pos_x)
-        # print ('new_projector_pos_y:', new_projector_pos_y)
+        geo_pos_x_line_num = action_setup.node(geo_names[0])['keys']['PosX']
 
-        new_camera_pos_x = new_projector_pos_x
-        new_camera_pos_y = str(int(new_projector_pos_y) + 150)
-        # print ('new_camera_pos_x:', new_camera_pos_x)
-        # print ('new_camera_pos_y:', new_camera_pos_y, '\n')
+        new_projector_pos_x = str(int(action_setup.value(geo_pos_x_line_num)) + 300)
+        new_projector_pos_y = action_setup.value(geo_pos_x_line_num + 1)
 
-    # If projector already exists, place new projector next to that one
+    # If projector already exists, place first projector next to that one
 
     else:
         new_projector_pos_x = str(int(node_projector_pos_x) + 300)
         new_projector_pos_y = node_projector_pos_y
-        # print ('new_projector_pos_x:', new_projector_pos_x)
-        # print ('new_projector_pos_y:', new_projector_pos_y)
 
-        new_camera_pos_x = new_projector_pos_x
-        new_camera_pos_y = str(int(new_projector_pos_y) + 150)
-        # print ('new_camera_pos_x:', new_camera_pos_x)
-        # print ('new_camera_pos_y:', new_camera_pos_y, '\n')
+    # Camera goes above first projector
+
+    new_camera_pos_x = new_projector_pos_x
+    new_camera_pos_y = str(int(new_projector_pos_y) + 150)
+    # print ('new_camera_pos_x:', new_camera_pos_x)
+    # print ('new_camera_pos_y:', new_camera_pos_y, '\n')
+
+    # Edit action file to change projector and new camera positions, each projector goes next to the one before it
+
+    for projector_name in projector_names:
+        projector_pos_x_line_num = action_setup.node(projector_name)['keys']['PosX']
 
-    # Edit action file to change projector and new camera position
+        action_setup.set_value(projector_pos_x_line_num, new_projector_pos_x)
+        action_setup.set_value(projector_pos_x_line_num + 1, new_projector_pos_y)
 
-    edit_action = open(action_filename, 'r')
-    contents = edit_action.readlines()
-    edit_action.close()
+        new_projector_pos_x = str(int(new_projector_pos_x) + 300)
 
-    contents[projector_pos_x_line_num] = '        PosX %s\n' % new_projector_pos_x
-    contents[projector_pos_y_line_num] = '        PosY %s\n' % new_projector_pos_y
+    new_camera_pos_x_line_num = action_setup.node(new_camera_name)['keys']['PosX']
 
-    contents[new_camera_pos_x_line_num] = '        PosX %s\n' % new_camera_pos_x
-    contents[new_camera_pos_y_line_num] = '        PosY %s\n' % new_camera_pos_y
+    action_setup.set_value(new_camera_pos_x_line_num, new_camera_pos_x)
+    action_setup.set_value(new_camera_pos_x_line_num + 1, new_camera_pos_y)
 
-    edit_action = open(action_filename, 'w')
-    contents = ''.join(contents)
-    edit_action.write(contents)
-    edit_action.close()
+    action_setup.write()
 
     # Reload Action node
 
     action_node.load_node_setup(save_action_path)
 
-    # Remove temp action save folder
+    keep_action_setup(action_node, action_node_name, action_setup)
 
-    shutil.rmtree(temp_folder)
+    print ('\n>>> created %s projector projection(s) in %.2f sec <<<\n' % (len(projector_names), time.time() - start_time))
 
-    print ('\n>>> created projector projection <<<\n')
-
-    return action_node, projector_name
+    return action_node, list(zip(geo_names, projector_names))
 
 def create_light_linked_projector_projection(selection):
 
-    for item in selection:
-        select_geo_name = str(item.name)[1:-1]
+    # Create projector projection for each surface/geo
+
+    action_node, projections = create_projector_projection(selection)
 
-    # Create projector projection
+    # Light link each projector to its surface or geo
 
-    action_node, projector_name = create_projector_projection(selection)
+    for geo_name, projector_name in projections:
+        parent_node = action_node.get_node(projector_name)
+        child_node = action_node.get_node(geo_name)
+        # print ('parent_node:', parent_node.name)
+        # print ('child_node:', child_node.name)
 
-    # Light link projector to surface or geo
+        action_node.connect_nodes(parent_node, child_node, link_type='Light')
 
-    parent_node = action_node.get_node(projector_name)
-    child_node = action_node.get_node(select_geo_name)
-    # print ('parent_node:', parent_node.name)
-    # print ('child_node:', child_node.name)
+    # Kept action setup doesn't have light links
 
-    action_node.connect_nodes(parent_node, child_node, link_type='Light')
+    ACTION_SETUPS.clear()
 
 def create_diffuse_projection(selection):
     import shutil
-    import flame
 
     print ('\n', '>' * 20, 'create projection %s - diffuse projection' % VERSION, '<' * 20, '\n')
 
@@ -586,47 +719,57 @@ def create_diffuse_projection(selection):
 
     projection_type = 'diffuse'
 
+    # Private temp folder for action setups saved while creating projection
+
+    temp_folder = create_temp_folder('create_projection')
+
+    try:
+        diffuse_projection(selection, projection_type, temp_folder)
+    finally:
+        shutil.rmtree(temp_folder, True)
+
+def diffuse_projection(selection, projection_type, temp_folder):
+    import time
+
+    start_time = time.time()
+
     # Get result camera
 
-    camera_parent_name, action_filename, action_node = get_result_camera()
+    camera_parent_name, action_setup, action_node = get_result_camera(temp_folder)
     # print ('camera parent name:', camera_parent_name)
 
     # Get position of last camera
-    # Find last camera added line
+    # Find last camera added
     # Ignore stereo left and right cameras
     #-------------------------------------#
 
-    with open(action_filename, 'r') as action_file:
-        for num, line in enumerate(action_file, 1):
-            if 'Node Camera' in line:
-                next_line = next(action_file)
-                if 'right' not in next_line:
-                    if 'left' not in next_line:
-                        node_camera_name_line = num
-                        # print ('node_camera_name_line:', node_camera_name_line)
+    for node in action_setup.nodes:
+        if node['type'].startswith('Camera'):
+            if 'right' not in node['name']:
+                if 'left' not in node['name']:
+                    node_camera = node
+                    # print ('node_camera:', node_camera['name'])
 
     # Find X and Y position lines for last camera
 
-    item_line = find_next_line(action_filename, 'PosX', node_camera_name_line)
-
-    node_camera_pos_x_line = item_line
+    node_camera_pos_x_line = node_camera['keys']['PosX']
     node_camera_pos_y_line = node_camera_pos_x_line + 1
     # print ('node_camera_pos_x_line:', node_camera_pos_x_line)
     # print ('node_camera_pos_y_line:', node_camera_pos_y_line)
 
     # Get last camera X value
 
-    item_value = get_line_value(action_filename, node_camera_pos_x_line)
+    item_value = action_setup.value(node_camera_pos_x_line)
     node_camera_pos_x = str(int(item_value))
 
     # Get last camera Y value
 
-    item_value = get_line_value(action_filename, node_camera_pos_y_line)
+    item_value = action_setup.value(node_camera_pos_y_line)
     node_camera_pos_y = item_value
 
     #-------------------------------------#
 
-    # Create camera at current frame
+    # Create camera at current frame, all diffuse maps project from it
 
     new_camera, new_camera_name, camera_exists, new_camera_index = create_cur_frame_camera(projection_type)
     # print ('new_camera_index:', new_camera_index)
@@ -642,84 +785,74 @@ def create_diffuse_projection(selection):
         child_node = action_node.get_node(new_camera_name)
         action_node.connect_nodes(parent_node, child_node, link_type='Default')
 
-    # Create diffuse node
+    # Create diffuse node for each selected surface/geo
 
-    diffuse_map = action_node.create_node('Diffuse Map')
+    diffuse_map_names = []
 
-    # Name diffuse map
-
-    diffuse_map_name = name_node('diffuse_fr')
-    diffuse_map.name = diffuse_map_name
-    # print ('diffuse_map_name:', diffuse_map_name)
+    for item in selection:
+        if item.type in GEO_TYPES:
+            diffuse_map = action_node.create_node('Diffuse Map')
 
-    # Save action node again with new diffuse map added
+            # Name diffuse map
 
-    save_action_path, action_filename, action_node, action_node_name, temp_folder = save_action_node()
+            diffuse_map_name = name_node('diffuse_fr')
+            diffuse_map.name = diffuse_map_name
+            # print ('diffuse_map_name:', diffuse_map_name)
 
-    # Find diffuse map projection map and newly created camera line numbers
+            diffuse_map_names.append(diffuse_map_name)
 
-    item_line = find_line(action_filename, diffuse_map_name)
+    # Save action node again with new diffuse maps added
 
-    diffuse_projection_camera_line_num = item_line + 21
-    diffuse_projection_map_line_num = item_line + 23
-    # print ('diffuse_projection_camera_line_num:', diffuse_projection_camera_line_num)
-    # print ('diffuse_projection_map_line_num:', diffuse_projection_map_line_num)
+    save_action_path, action_filename, action_node, action_node_name = save_action_node(temp_folder)
 
-    item_line = find_line(action_filename, new_camera_name)
+    action_setup = ActionSetup(action_filename)
 
-    new_camera_line_num = item_line
-    # print ('new_camera_line_num:', new_camera_line_num)
+    camera_index_fix = 2
 
-    # Find X and Y position lines for new frame camera
+    # Edit action file to change diffuse map type and projection camera of each diffuse map
 
-    item_line = find_next_line(action_filename, 'PosX', new_camera_line_num)
+    for diffuse_map_name in diffuse_map_names:
 
-    camera_pos_x_line = item_line
-    camera_pos_y_line = camera_pos_x_line + 1
-    # print ('camera_pos_x_line:', camera_pos_x_line)
-    # print ('camera_pos_y_line:', camera_pos_y_line)
+        # Find diffuse map projection map and camera line numbers
 
-    action_file.close()
+        item_line = action_setup.node(diffuse_map_name)['name_line']
 
-    camera_index_fix = 2
+        diffuse_projection_camera_line_num = item_line + 22
+        diffuse_projection_map_line_num = item_line + 24
+        # print ('diffuse_projection_camera_line_num:', diffuse_projection_camera_line_num)
+        # print ('diffuse_projection_map_line_num:', diffuse_projection_map_line_num)
 
-    # Edit action file to change diffuse map type, projection camera, and position camera next to last exisitng camera
+        action_setup.replace_line(diffuse_projection_camera_line_num, '                        MapCamera %s\n' % str(int(new_camera_index) - camera_index_fix))
+        action_setup.replace_line(diffuse_projection_map_line_num, '                        MapCoordType PROJECTION\n')
 
-    edit_action = open(action_filename, 'r')
-    contents = edit_action.readlines()
-    edit_action.close()
+    # Position new frame camera next to last exisitng camera
 
     if not camera_exists:
-        contents[camera_pos_x_line] = '        PosX %s\n' % node_camera_pos_x
-        contents[camera_pos_y_line] = '        PosY %s\n' % node_camera_pos_y
+        camera_pos_x_line = action_setup.node(new_camera_name)['keys']['PosX']
+        camera_pos_y_line = camera_pos_x_line + 1
+        # print ('camera_pos_x_line:', camera_pos_x_line)
+        # print ('camera_pos_y_line:', camera_pos_y_line)
 
-    contents[diffuse_projection_camera_line_num] = '                        MapCamera %s\n' % str(int(new_camera_index) - camera_index_fix)
-    contents[diffuse_projection_map_line_num] = '                        MapCoordType PROJECTION\n'
+        action_setup.set_value(camera_pos_x_line, node_camera_pos_x)
+        action_setup.set_value(camera_pos_y_line, node_camera_pos_y)
 
-    edit_action = open(action_filename, 'w')
-    contents = ''.join(contents)
-    edit_action.write(contents)
-    edit_action.close()
+    action_setup.write()
 
     # Reload Action node
 
     action_node.load_node_setup(save_action_path)
 
-    # Remove temp action save folder
+    keep_action_setup(action_node, action_node_name, action_setup)
 
-    shutil.rmtree(temp_folder)
-
-    print ('\n>>> created diffuse projection <<<\n')
+    print ('\n>>> created %s diffuse projection(s) in %.2f sec <<<\n' % (len(diffuse_map_names), time.time() - start_time))
 
 # Scopes
 #-------------------------------------#
 
 def scope_geo(selection):
 
-    geo_types = ('Surface', 'Geom')
-
     for item in selection:
-        if item.type in geo_types:
+        if item.type in GEO_TYPES:
             return True
     return False
 
@@ -37,15 +37,13 @@ SCRIPT_PATH = '/opt/Autodesk/shared/python/find_a_point'
 class FindAPoint(object):
 
     def __init__(self, selection):
+        import shutil
 
         print ('\n', '>' * 20, 'find a point %s' % VERSION, '<' * 20, '\n')
 
         # Set paths
 
-        self.temp_path = os.path.join(SCRIPT_PATH, 'temp')
-
-        if not os.path.isdir(self.temp_path):
-            os.makedirs(self.temp_path)
+        self.temp_path = create_temp_folder('find_a_point')
 
         # Init variables
 
@@ -53,56 +51,31 @@ class FindAPoint(object):
         self.action_node = ''
         self.action_filename = ''
         self.save_action_path = ''
+        self.action_setup = None
         self.camera_parent_name = ''
 
-        self.create_find_a_point()
-
-    def find_line(self, item):
-
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if item in line:
-                    item_line = num
-                    return item_line
-
-    def get_line_value(self, line_number):
+        # Remove temp action save folder even if creating nodes fails
 
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if num == line_number:
-                    item_value = line.rsplit(' ', 1)[1]
-                    return item_value
+        try:
+            self.create_find_a_point()
+        finally:
+            shutil.rmtree(self.temp_path, True)
 
     #--------------------------------------------#
 
     def get_result_camera(self):
         import flame
 
-        def find_parent(child_num):
-
-            action_file = open(self.action_filename)
-            lines = action_file.readlines()
-            name_line = lines[child_num]
-            action_file.close()
-
-            if 'Name' in name_line:
-                camera_parent_name = name_line.rsplit(' ', 1)[1][:-1]
-                if camera_parent_name == 'scene':
-                    camera_parent_name = None
-                return camera_parent_name
-            child_num = child_num - 1
-            return find_parent(child_num)
-
         # Find result camera line
 
-        item_line = self.find_line('ResultCamChannel')
+        item_line = self.action_setup.find_line('ResultCamChannel')
 
         result_cam_line = item_line + 3
         # print ('result_cam_line:', result_cam_line)
 
         # Get result camera value
 
-        item_value = self.get_line_value(result_cam_line)
+        item_value = self.action_setup.value(result_cam_line)
 
         result_camera_num = int(item_value) + 1
 
@@ -125,29 +98,10 @@ class FindAPoint(object):
             result_cam = action_camera_list[result_camera_num]
             result_cam_name = str(result_cam.name)[1:-1]
 
-        # Get result camera node number for action file to search for node camera is parented to
-
-        item_line = self.find_line(result_cam_name)
-        result_cam_number_line = item_line + 1
-        # print ('result_cam_number_line:', result_cam_number_line)
-
         # Get name of node camera is parented to if it has a parent
 
-        result_cam_number = self.get_line_value(result_cam_number_line)
-        # print ('result_cam_number:', result_cam_number)
-
-        result_cam_child_num = 'Child ' + result_cam_number
-        # print ('result_cam_child_num:', result_cam_child_num)
-
-        child_num = self.find_line(result_cam_child_num)
-        # print ('child_num:', child_num)
-
-        if child_num == None:
-            self.camera_parent_name = None
-        else:
-            # Get name of node parented to camera node
-
-            self.camera_parent_name = find_parent(child_num)
+        self.camera_parent_name = self.action_setup.parent_name(result_cam_name)
+        # print ('camera_parent_name:', self.camera_parent_name)
 
     def create_cur_frame_camera(self):
         import flame
@@ -206,6 +160,10 @@ class FindAPoint(object):
 
         self.action_filename = self.save_action_path + '.action'
 
+        # Read saved action once for lookups
+
+        self.action_setup = ActionSetup(self.action_filename)
+
     def name_node(self, node_type, node_num=0):
         import flame
 
@@ -241,7 +199,6 @@ class FindAPoint(object):
     #--------------------------------------------#
 
     def create_find_a_point(self):
-        import shutil
         import flame
 
         # Get action node
@@ -299,11 +256,208 @@ class FindAPoint(object):
         z_axis_node.pos_x = self.cursor_position[0]
         z_axis_node.pos_y = self.cursor_position[1] - 300
 
-        # Remove temp action save folder
+        print ('\n>>> created nodes to find a point <<<\n')
+
+class ActionSetup(object):
+    """
+    Saved Action setup read once and indexed by node so lookups don't have to rescan the file
 
-        shutil.rmtree(self.temp_path)
+    Each node has its type, name, number and the line numbers of its Node and Name lines, first line of each key,
+    Child lines and Channel blocks. Parents are found from Child lines. Line numbers start at 1 like the file scans they replace
 
-        print ('\n>>> created nodes to find a point <<<\n')
+    Edits are kept until write, so any number of them cost one pass over the setup. Lookups see the setup as it was last
+    read or written, so a setup can be kept and used again while the Action node hasn't changed
+    """
+
+    def __init__(self, action_filename):
+
+        self.action_filename = action_filename
+
+        with open(action_filename, 'r') as action_file:
+            self.index(action_file.readlines())
+
+    def index(self, lines):
+
+        # Index nodes of setup lines, edits and remembered lookups start over
+
+        self.lines = lines
+
+        self.nodes = []
+        self.node_names = {}
+        self.node_numbers = {}
+
+        # Keys belong to the last node opened
+
+        node = None
+
+        for line_number, line in enumerate(self.lines, 1):
+            words = line.split()
+
+            if not words:
+                continue
+
+            key = words[0]
+
+            if key == 'Node':
+                node = {'type': ' '.join(words[1:]), 'line': line_number, 'name': None, 'name_line': None, 'number': None, 'keys': {}, 'child_lines': [], 'channels': {}}
+                self.nodes.append(node)
+                continue
+            elif node is None:
+                continue
+
+            if key == 'Name' and node['name'] is None:
+                node['name'] = words[-1]
+                node['name_line'] = line_number
+                if node['name'] not in self.node_names:
+                    self.node_names[node['name']] = node
+            elif key == 'Number' and node['number'] is None:
+                node['number'] = words[-1]
+                self.node_numbers[node['number']] = node
+            elif key == 'Child':
+                node['child_lines'].append(line_number)
+            elif key == 'Channel' and len(words) > 1:
+                if words[1] not in node['channels']:
+                    node['channels'][words[1]] = line_number
+
+            if key not in node['keys']:
+                node['keys'][key] = line_number
+
+        # Child node number to parent node
+
+        self.parents = {}
+
+        for node in self.nodes:
+            for line_number in node['child_lines']:
+                child_number = self.value(line_number)
+                if child_number not in self.parents:
+                    self.parents[child_number] = node
+
+        # Lines found by find_line
+
+        self.found_lines = {}
+
+        # Edits by line number, inserted lines go after their line number
+
+        self.replaced_lines = {}
+        self.inserted_lines = {}
+
+    def node(self, node_name):
+
+        return self.node_names.get(node_name)
+
+    def parent(self, node):
+
+        # Returns node that has node as a child, None if node isn't a child
+
+        return self.parents.get(node['number'])
+
+    def parent_name(self, node_name):
+
+        # Returns name of node that node is parented to, None if it's only parented to scene
+
+        node = self.node(node_name)
+        parent = node and self.parent(node)
+
+        if parent is None or parent['name'] == 'scene':
+            return None
+        return parent['name']
+
+    def children(self, node):
+
+        # Returns nodes linked as children of node
+
+        child_numbers = [self.value(line_number) for line_number in node['child_lines']]
+
+        return [self.node_numbers[child_number] for child_number in child_numbers if child_number in self.node_numbers]
+
+    def find_line(self, item):
+
+        # Returns first line of setup with item anywhere in it, for lookups that aren't a node key
+
+        if item not in self.found_lines:
+            self.found_lines[item] = None
+            for line_number, line in enumerate(self.lines, 1):
+                if item in line:
+                    self.found_lines[item] = line_number
+                    break
+
+        return self.found_lines[item]
+
+    def value(self, line_number):
+
+        # Returns last value on line
+
+        return self.lines[line_number - 1].split()[-1]
+
+    def set_value(self, line_number, value):
+
+        # Replace last value on line, keeping its key and indent
+
+        line = self.replaced_lines.get(line_number, self.lines[line_number - 1])
+
+        self.replaced_lines[line_number] = '%s %s\n' % (line.rstrip().rsplit(None, 1)[0], value)
+
+    def replace_line(self, line_number, line):
+
+        self.replaced_lines[line_number] = line
+
+    def remove_line(self, line_number):
+
+        self.replaced_lines[line_number] = ''
+
+    def insert_lines(self, line_number, lines):
+
+        # Lines are inserted after line number in the order they're added
+
+        self.inserted_lines.setdefault(line_number, []).extend(lines)
+
+    def add_child(self, node, child_number):
+
+        # Link node number as child of node, after its last Child line or its Number line
+
+        number_line = node['keys']['Number']
+        indent = self.lines[number_line - 1][:-len(self.lines[number_line - 1].lstrip())]
+
+        if node['child_lines']:
+            line_number = node['child_lines'][-1]
+        else:
+            line_number = number_line
+
+        self.insert_lines(line_number, ['%sChild %s\n' % (indent, child_number)])
+
+    def write(self):
+
+        # Write setup with all edits in one pass, then index setup as written
+
+        contents = []
+
+        for line_number, line in enumerate(self.lines, 1):
+            contents.append(self.replaced_lines.get(line_number, line))
+            contents.extend(self.inserted_lines.get(line_number, []))
+
+        contents = ''.join(contents)
+
+        with open(self.action_filename, 'w') as action_file:
+            action_file.write(contents)
+
+        self.index(contents.splitlines(True))
+
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
 
 def get_action_custom_ui_actions():
 
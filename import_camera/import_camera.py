@@ -189,6 +189,7 @@ class Import(object):
 
     def __init__(self, selection, filter_type):
         import flame
+        import shutil
         import ast
 
         print ('\n', '>' * 20, 'import fbx %s' % VERSION, '<' * 20, '\n')
@@ -233,18 +234,15 @@ class Import(object):
 
         # Create temp folder
 
-        self.temp_folder = os.path.join(SCRIPT_PATH, 'temp')
-
-        try:
-            os.makedirs(self.temp_folder)
-            print ('\n>>> temp folder created <<<\n')
-        except:
-            print ('temp folder already exists')
+        self.temp_folder = create_temp_folder('import_camera')
+        print ('\n>>> temp folder created <<<\n')
 
         self.camera_file_path = self.file_browse(self.camera_path, self.filter_type)
 
         if self.camera_file_path:
             self.main_window()
+        else:
+            shutil.rmtree(self.temp_folder, True)
 
     def check_config_file(self):
 
@@ -926,24 +924,25 @@ class Import(object):
 
             self.window.close()
 
-            if self.st_map_setup_button.isChecked():
-                self.create_st_map_setup()
-            elif self.patch_setup_button.isChecked():
-                self.create_patch_setup()
-            else:
-                self.create_camera_action()
-
-            # Delete temp folder
+            # Temp folder is deleted even if setup creation fails
 
-            shutil.rmtree(self.temp_folder)
-            print ('\n>>> temp folder deleted <<<\n')
+            try:
+                if self.st_map_setup_button.isChecked():
+                    self.create_st_map_setup()
+                elif self.patch_setup_button.isChecked():
+                    self.create_patch_setup()
+                else:
+                    self.create_camera_action()
+            finally:
+                shutil.rmtree(self.temp_folder, True)
+                print ('\n>>> temp folder deleted <<<\n')
 
             print ('done.')
 
         def cancel():
             import shutil
 
-            shutil.rmtree(self.temp_folder)
+            shutil.rmtree(self.temp_folder, True)
 
             self.window.close()
 
@@ -1478,6 +1477,23 @@ class Import(object):
         print ('\n>>> import cancelled <<<\n')
         return
 
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
+
 def message_box(message):
 
     msg_box = QtWidgets.QMessageBox()
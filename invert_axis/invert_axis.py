@@ -12,6 +12,8 @@ Description:
 
     Create inverted axis at current frame or copy parent axis and invert at current frame
 
+    All selected axis nodes are inverted together with one save and reload of the Action node
+
     Right-click on axis node -> Invert Axis... -> Create Inverted Axis
     Right-click on axis node -> Invert Axis... -> Copy Parent Axis Values and Invert
 
@@ -51,15 +53,14 @@ class InvertAxis(object):
 
         self.current_frame = flame.batch.current_frame
 
-        # Get selected axis
+        # Get selected axes, all of them are inverted with one save and load of action node
 
-        for selected_axis in selection:
-            self.selected_axis = selected_axis
-            self.axis_name = str(selected_axis.name)[1:-1]
+        self.selected_axes = [item for item in selection if item.type == 'Axis']
+        self.axis_names = [str(selected_axis.name)[1:-1] for selected_axis in self.selected_axes]
 
         # Temp folder for saving action setup
 
-        self.temp_folder = os.path.join(SCRIPT_PATH, 'temp_action')
+        self.temp_folder = create_temp_folder('invert_axis')
 
         # Action variables
 
@@ -68,391 +69,424 @@ class InvertAxis(object):
         self.save_action_path = os.path.join(self.temp_folder, self.action_node_name)
         self.action_filename = self.save_action_path + '.action'
 
-        # Init lists
+        # Action setup, read each time action node is saved
+
+        self.action_setup = None
+
+        # Inverted axis names given so far, so axes renamed in action setup get different names
 
-        self.axis_child_list = []
-        self.axis_child_lines_list = []
+        self.inverted_axis_names = []
 
     def create_inverted_axis(self):
-        import flame
+        import time
 
         print ('\n', '>' * 20, 'invert axis %s - create inverted axis' % VERSION, '<' * 20, '\n')
 
-        # Create new axis node
+        start_time = time.time()
 
-        self.inverted_axis = self.action_node.create_node('Axis')
-        self.inverted_axis_name = self.name_axis()
-        self.inverted_axis.name = self.inverted_axis_name
+        # Create new axis node for each selected axis
 
-        # Copy axis values
+        inverted_axes = []
 
-        self.copy_axis_values(self.inverted_axis, self.selected_axis)
+        for selected_axis, axis_name in zip(self.selected_axes, self.axis_names):
+            inverted_axis = self.action_node.create_node('Axis')
+            inverted_axis_name = self.name_axis()
+            inverted_axis.name = inverted_axis_name
 
-        # Connect nodes
+            # Copy axis values
 
-        self.action_node.connect_nodes(self.selected_axis, self.inverted_axis)
+            self.copy_axis_values(inverted_axis, selected_axis)
+
+            # Connect nodes
+
+            self.action_node.connect_nodes(selected_axis, inverted_axis)
+
+            inverted_axes.append((axis_name, inverted_axis_name))
 
         # Save action node
 
         self.save_action_node()
 
-        # Position/Invert New Inverted Axis Node
+        # Position/Invert New Inverted Axis Nodes
         # -------------------------------
 
-        # Get selected axis position
+        for axis_name, inverted_axis_name in inverted_axes:
+            selected_axis = self.action_setup.node(axis_name)
+            inverted_axis = self.action_setup.node(inverted_axis_name)
 
-        item_line = self.find_line(self.axis_name)
-        line_number = self.find_line_after('PosX', item_line)
-        item_value = self.get_line_value(line_number)
-        selected_axis_pos_x = item_value
+            # Get selected axis position
 
-        next_line_num = line_number + 1
-        item_value = self.get_line_value(next_line_num)
-        selected_axis_pos_y = item_value
+            selected_axis_pos_x_line = selected_axis['keys']['PosX']
+            selected_axis_pos_x = self.action_setup.value(selected_axis_pos_x_line)
+            selected_axis_pos_y = self.action_setup.value(selected_axis_pos_x_line + 1)
 
-        # Find pos x and y lines for inverted axis
+            # Position New Inverted Axis in Selected Axis Position and invert it
 
-        item_line = self.find_line(self.inverted_axis_name)
-        line_number = self.find_line_after('PosX', item_line)
-        inverted_axis_pos_x_line = line_number - 1
-        inverted_axis_pos_y_line = inverted_axis_pos_x_line + 1
+            self.action_setup.set_value(inverted_axis['keys']['PosX'], selected_axis_pos_x)
+            self.action_setup.set_value(inverted_axis['keys']['PosX'] + 1, selected_axis_pos_y)
+            self.action_setup.set_value(inverted_axis['keys']['InvertMode'], 'yes')
 
-        # Get axis invert mode line
+            # Reposition Selected Axis above Inverted Axis
 
-        item_line = self.find_line(self.inverted_axis_name)
-        line_number = self.find_line_after('InvertMode', item_line)
-        invert_mode_line = line_number - 1
+            self.action_setup.set_value(selected_axis_pos_x_line + 1, str(int(selected_axis_pos_y) + 150))
 
-        # ---------------------------------------------------------------------
+            # Move child connections of Selected Axis to Inverted Axis, Inverted Axis stays a child of Selected Axis
 
-        # Reposition selected axis node
-        # -----------------------------
+            for line_number in selected_axis['child_lines']:
+                child_number = self.action_setup.value(line_number)
+                if child_number != inverted_axis['number']:
+                    self.action_setup.remove_line(line_number)
+                    self.action_setup.add_child(inverted_axis, child_number)
 
-        # Get y pos line for selected node
+        # Save modified action file
 
-        selected_axis_new_pos_y = str(int(selected_axis_pos_y) + 150)
+        self.action_setup.write()
 
-        # Get selected axis y position line for repo
+        # Reload saved action node
 
-        item_line = self.find_line(self.axis_name)
-        line_number = self.find_line_after('PosX', item_line)
-        selected_axis_pos_y_line = line_number + 1
+        self.reload_action_node()
 
-        # ---------------------------------------------------------------------
+        # Remove temp action folder
 
-        # Get selected axis connections to be removed
+        self.remove_temp_folder()
 
-        item_line = self.find_line(self.axis_name)
-        item_line_num = self.find_line_after('Child', item_line)
-        self.find_child_lines('Child', item_line_num)
+        print ('>>> %s inverted axis created in %.2f sec <<<' % (len(inverted_axes), time.time() - start_time))
 
-        # Put child lines into list to be inserted
+    def invert_parent_axis(self):
+        import time
 
-        self.get_child_lines()
+        print ('\n', '>' * 20, 'invert axis %s - invert parent axis' % VERSION, '<' * 20, '\n')
 
-        # Get Inverted Axis line number to insert child lines to reconnect
+        start_time = time.time()
 
-        inverted_axis_line = self.find_line(self.inverted_axis_name)
-        line_number = self.find_line_after('Number', inverted_axis_line)
-        line_number = line_number - len(self.axis_child_list)
-        insert_line_number = line_number + 1
+        # Save action node
 
-        # ---------------------------------------------------------------------
+        self.save_action_node()
 
-        # Remove Inverted Axis from lists of Child nodes
-        # Get inverted axis node number and set Child Name variable
+        # Get parent axis info
+        # --------------------
 
-        inverted_axis_node_num = self.get_line_value(inverted_axis_line + 1)
-        inverted_axis_child_num = 'Child ' + str(inverted_axis_node_num)
+        inverted_axes = []
+        renamed_axes = {}
 
-        # Check child lists for Inverted Axis Child Number
-        # If found remove from Inverted Axis from lists
+        for axis_name in self.axis_names:
+            selected_axis = self.action_setup.node(axis_name)
 
-        for axis in self.axis_child_lines_list:
-            if inverted_axis_child_num in axis:
-                axis_index = self.axis_child_lines_list.index(axis)
-                self.axis_child_lines_list.pop(axis_index)
-                self.axis_child_list.pop(axis_index)
+            # Find parent of selected axis
 
-        # Edit action lines
+            parent_axis = self.action_setup.parent(selected_axis)
 
-        edit_action = open(self.action_filename, 'r')
-        contents = edit_action.readlines()
-        edit_action.close()
+            # If parent is axis, rename selected axis to inverted axis and invert it
 
-        # Position New Inverted Axis in Selected Axis Position
+            if parent_axis and parent_axis['type'] == 'Axis':
+                inverted_axis_name = self.name_axis()
 
-        contents[inverted_axis_pos_x_line] = '        PosX %s' % selected_axis_pos_x
-        contents[inverted_axis_pos_y_line] = '        PosY %s' % selected_axis_pos_y
-        contents[invert_mode_line] = '                InvertMode yes'
+                self.action_setup.set_value(selected_axis['name_line'], inverted_axis_name)
+                self.action_setup.set_value(selected_axis['keys']['InvertMode'], 'yes')
 
-        # Reposition Selected Axis above Inverted Axis
+                inverted_axes.append((inverted_axis_name, parent_axis['name']))
+                renamed_axes[axis_name] = inverted_axis_name
+            else:
+                print ('>>> %s has no parent axis to invert <<<' % axis_name)
 
-        contents[selected_axis_pos_y_line] = '        PosY %s\n' % selected_axis_new_pos_y
+        if inverted_axes:
 
-        ## Remove child connections from Selected Axis
+            # Save modified action file and reload action setup
 
-        for line_number in self.axis_child_list:
+            self.action_setup.write()
 
-            contents[line_number] = ''
+            self.reload_action_node()
 
-        # Insert lines for inverted axis child connections
+            # Copy parent axis values at current frame, parent may have been renamed too
 
-        for child_line in self.axis_child_lines_list:
-            contents.insert(insert_line_number, child_line)
+            for inverted_axis_name, parent_axis_name in inverted_axes:
+                parent_axis_name = renamed_axes.get(parent_axis_name, parent_axis_name)
+                self.copy_axis_values(self.action_node.get_node(inverted_axis_name), self.action_node.get_node(parent_axis_name))
 
-        # Save modified action file
+            # Remove temp action file
 
-        edit_action = open(self.action_filename, 'w')
-        contents = ''.join(contents)
-        edit_action.write(contents)
-        edit_action.close()
+            self.remove_temp_folder()
 
-        # Reload saved action node
+            print ('\n', '>>> %s inverted axis created in %.2f sec <<<' % (len(inverted_axes), time.time() - start_time), '\n')
 
-        self.reload_action_node()
+        else:
+            # If no parent axis, remove temp action file
 
-        # Remove temp action folder
+            self.remove_temp_folder()
 
-        self.remove_temp_folder()
+            print ('\n', '>>> no parent axis to invert <<<', '\n')
 
-        print ('>>> inverted axis created <<<')
+    #-------------------------------------#
 
-    def invert_parent_axis(self):
+    def save_action_node(self):
         import flame
 
-        print ('\n', '>' * 20, 'invert axis %s - invert parent axis' % VERSION, '<' * 20, '\n')
+        # Save action node and read it once for lookups
 
-        # Save action node
+        action_node = flame.batch.get_node(self.action_node_name)
+        action_node.save_node_setup(self.save_action_path)
 
-        self.save_action_node()
+        self.action_setup = ActionSetup(self.action_filename)
 
-        # Get parent axis info
-        # --------------------
+    def reload_action_node(self):
 
-        # Find selected axis node number
+        # Reload action setup
 
-        item_line = self.find_line(self.axis_name)
-        line_number = self.find_line_after('Number', item_line)
-        item_value = self.get_line_value(line_number)
-        axis_number = item_value
+        self.action_node.load_node_setup(self.save_action_path)
 
-        # Find parent of selected axis
+    def remove_temp_folder(self):
+        import shutil
 
-        item_line = self.find_line('Child %s' % axis_number)
-        line_number = self.find_line_before('Name', item_line)
-        item_value = self.get_line_value(line_number)
-        parent_axis_name = item_value[:-1]
+        # Remove temp action folder
 
-        # Check that parent node type is node type is axis
+        shutil.rmtree(self.temp_folder, True)
 
-        node_type_line = line_number -1
-        node_type_line_value = self.get_line_value(node_type_line)
+    def name_axis(self, axis_num=0):
+        import flame
 
-        # If parent is axis, invert axis
+        existing_nodes = []
 
-        if node_type_line_value == 'Axis\n':
+        for node in flame.batch.current_node.get_value().nodes:
+            node_name = str(node.name)[1:-1]
+            existing_nodes.append(node_name)
 
-            # Rename selected axis to inverted axis
+        axis_name = 'inverted_axis_fr' + str(self.current_frame) + '_' + str(axis_num)
 
-            selected_axis_name = self.name_axis()
-            self.selected_axis.name = selected_axis_name
-            axis_name = str(self.selected_axis.name)[1:-1]
+        if axis_name not in existing_nodes and axis_name not in self.inverted_axis_names:
+            self.inverted_axis_names.append(axis_name)
+            return axis_name
+        axis_num = axis_num + 1
+        return self.name_axis(axis_num)
 
-            # Save action node
+    def copy_axis_values(self, axis_to_invert, axis_node):
 
-            self.save_action_node()
+        axis_to_invert.position = axis_node.position.get_value()
+        axis_to_invert.rotation = axis_node.rotation.get_value()
+        axis_to_invert.scale = axis_node.scale.get_value()
+        axis_to_invert.shear = axis_node.shear.get_value()
+        axis_to_invert.center = axis_node.center.get_value()
 
-            # Get list of all nodes in action node
+#-------------------------------------#
 
-            action_node_list = []
+class ActionSetup(object):
+    """
+    Saved Action setup read once and indexed by node so lookups don't have to rescan the file
 
-            action_node = flame.batch.current_node.get_value()
+    Each node has its type, name, number and the line numbers of its Node and Name lines, first line of each key,
+    Child lines and Channel blocks. Parents are found from Child lines. Line numbers start at 1 like the file scans they replace
 
-            for item in action_node.nodes:
-                action_node_list.append(item)
+    Edits are kept until write, so any number of them cost one pass over the setup. Lookups see the setup as it was last
+    read or written, so a setup can be kept and used again while the Action node hasn't changed
+    """
 
-            # Get parent axis
+    def __init__(self, action_filename):
 
-            for item in action_node_list:
-                node_name = str(item.name)[1:-1]
-                if node_name == parent_axis_name:
-                    axis_node = item
+        self.action_filename = action_filename
 
-            # Copy axis values
+        with open(action_filename, 'r') as action_file:
+            self.index(action_file.readlines())
 
-            self.copy_axis_values(self.selected_axis, axis_node)
+    def index(self, lines):
 
-            self.save_action_node()
+        # Index nodes of setup lines, edits and remembered lookups start over
 
-            # Invert axis
-            # Get axis invert mode line
+        self.lines = lines
 
-            item_line = self.find_line(axis_name)
-            line_number = self.find_line_after('InvertMode', item_line)
-            invert_mode_line = line_number - 1
+        self.nodes = []
+        self.node_names = {}
+        self.node_numbers = {}
 
-            # Edit action lines to repo inverted axis above selected axis
+        # Keys belong to the last node opened
 
-            edit_action = open(self.action_filename, 'r')
-            contents = edit_action.readlines()
-            edit_action.close()
+        node = None
 
-            contents[invert_mode_line] = '                InvertMode yes'
+        for line_number, line in enumerate(self.lines, 1):
+            words = line.split()
 
-            edit_action = open(self.action_filename, 'w')
-            contents = ''.join(contents)
-            edit_action.write(contents)
-            edit_action.close()
+            if not words:
+                continue
 
-            # Reload action setup
+            key = words[0]
 
-            action_node.load_node_setup(self.save_action_path)
+            if key == 'Node':
+                node = {'type': ' '.join(words[1:]), 'line': line_number, 'name': None, 'name_line': None, 'number': None, 'keys': {}, 'child_lines': [], 'channels': {}}
+                self.nodes.append(node)
+                continue
+            elif node is None:
+                continue
 
-            # Remove temp action file
+            if key == 'Name' and node['name'] is None:
+                node['name'] = words[-1]
+                node['name_line'] = line_number
+                if node['name'] not in self.node_names:
+                    self.node_names[node['name']] = node
+            elif key == 'Number' and node['number'] is None:
+                node['number'] = words[-1]
+                self.node_numbers[node['number']] = node
+            elif key == 'Child':
+                node['child_lines'].append(line_number)
+            elif key == 'Channel' and len(words) > 1:
+                if words[1] not in node['channels']:
+                    node['channels'][words[1]] = line_number
 
-            self.remove_temp_folder()
+            if key not in node['keys']:
+                node['keys'][key] = line_number
 
-            print ('\n', '>>> inverted axis created <<<', '\n')
+        # Child node number to parent node
 
-        else:
-            # If no parent axis, remove temp action file
+        self.parents = {}
 
-            self.remove_temp_folder()
+        for node in self.nodes:
+            for line_number in node['child_lines']:
+                child_number = self.value(line_number)
+                if child_number not in self.parents:
+                    self.parents[child_number] = node
 
-            print ('\n', '>>> no parent axis to invert <<<', '\n')
+        # Lines found by find_line
 
-    #-------------------------------------#
+        self.found_lines = {}
+
+        # Edits by line number, inserted lines go after their line number
+
+        self.replaced_lines = {}
+        self.inserted_lines = {}
+
+    def node(self, node_name):
+
+        return self.node_names.get(node_name)
+
+    def parent(self, node):
+
+        # Returns node that has node as a child, None if node isn't a child
+
+        return self.parents.get(node['number'])
+
+    def parent_name(self, node_name):
+
+        # Returns name of node that node is parented to, None if it's only parented to scene
+
+        node = self.node(node_name)
+        parent = node and self.parent(node)
+
+        if parent is None or parent['name'] == 'scene':
+            return None
+        return parent['name']
+
+    def children(self, node):
+
+        # Returns nodes linked as children of node
+
+        child_numbers = [self.value(line_number) for line_number in node['child_lines']]
+
+        return [self.node_numbers[child_number] for child_number in child_numbers if child_number in self.node_numbers]
 
     def find_line(self, item):
 
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
+        # Returns first line of setup with item anywhere in it, for lookups that aren't a node key
+
+        if item not in self.found_lines:
+            self.found_lines[item] = None
+            for line_number, line in enumerate(self.lines, 1):
                 if item in line:
-                    item_line = num
-                    return item_line
-
-    def find_line_before(self, item, item_line_num):
-
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if num == item_line_num:
-                    if item in line:
-                        line_number = num
-                        return line_number
-
-            item_line_num = item_line_num - 1
-            return self.find_line_before(item, item_line_num)
-
-    def find_line_after(self, item, item_line_num):
-
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if num > item_line_num:
-                    if item in line:
-                        line_number = num
-                        return line_number
-
-    def find_child_lines(self, item, item_line_num):
-
-        # Find all child lines for an axis
-
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if num >= item_line_num:
-                    if item in line:
-                        first_child_line = num - 1
-                        self.axis_child_list.append(first_child_line)
-                        for next_num, line in enumerate(action_file, first_child_line):
-                            if next_num > first_child_line:
-                                if item in line:
-                                    self.axis_child_list.append(next_num)
-                                else:
-                                    return
-
-    def get_child_lines(self):
-
-        for line_num in self.axis_child_list:
-            with open(self.action_filename, 'r') as action_file:
-                for num, line in enumerate(action_file, 1):
-                    if num == (line_num + 1):
-                        self.axis_child_lines_list.append(line)
-
-    def get_line_value(self, line_number):
-
-        with open(self.action_filename, 'r') as action_file:
-            for num, line in enumerate(action_file, 1):
-                if num == line_number:
-                    item_value = line.rsplit(' ', 1)[1]
-                    return item_value
+                    self.found_lines[item] = line_number
+                    break
 
-    def save_action_node(self):
-        import shutil
-        import flame
-        import os
+        return self.found_lines[item]
 
-        # Create temp action save dir
+    def value(self, line_number):
 
-        try:
-            os.makedirs(self.temp_folder)
-        except:
-            shutil.rmtree(self.temp_folder)
-            os.makedirs(self.temp_folder)
+        # Returns last value on line
 
-        # Save action node
+        return self.lines[line_number - 1].split()[-1]
 
-        action_node = flame.batch.get_node(self.action_node_name)
-        action_node.save_node_setup(self.save_action_path)
+    def set_value(self, line_number, value):
 
-    def reload_action_node(self):
+        # Replace last value on line, keeping its key and indent
 
-        # Reload action setup
+        line = self.replaced_lines.get(line_number, self.lines[line_number - 1])
 
-        self.action_node.load_node_setup(self.save_action_path)
+        self.replaced_lines[line_number] = '%s %s\n' % (line.rstrip().rsplit(None, 1)[0], value)
 
-    def remove_temp_folder(self):
-        import shutil
+    def replace_line(self, line_number, line):
 
-        # Remove temp action folder
+        self.replaced_lines[line_number] = line
 
-        shutil.rmtree(self.temp_folder)
+    def remove_line(self, line_number):
 
-    def name_axis(self, axis_num=0):
-        import flame
+        self.replaced_lines[line_number] = ''
 
-        existing_nodes = []
+    def insert_lines(self, line_number, lines):
 
-        for node in flame.batch.current_node.get_value().nodes:
-            node_name = str(node.name)[1:-1]
-            existing_nodes.append(node_name)
+        # Lines are inserted after line number in the order they're added
 
-        axis_name = 'inverted_axis_fr' + str(self.current_frame) + '_' + str(axis_num)
+        self.inserted_lines.setdefault(line_number, []).extend(lines)
 
-        if axis_name not in existing_nodes:
-            inverted_axis_name = axis_name
-            return inverted_axis_name
-        axis_num = axis_num + 1
-        return self.name_axis(axis_num)
+    def add_child(self, node, child_number):
 
-    def copy_axis_values(self, axis_to_invert, axis_node):
+        # Link node number as child of node, after its last Child line or its Number line
 
-        axis_to_invert.position = axis_node.position.get_value()
-        axis_to_invert.rotation = axis_node.rotation.get_value()
-        axis_to_invert.scale = axis_node.scale.get_value()
-        axis_to_invert.shear = axis_node.shear.get_value()
-        axis_to_invert.center = axis_node.center.get_value()
+        number_line = node['keys']['Number']
+        indent = self.lines[number_line - 1][:-len(self.lines[number_line - 1].lstrip())]
+
+        if node['child_lines']:
+            line_number = node['child_lines'][-1]
+        else:
+            line_number = number_line
+
+        self.insert_lines(line_number, ['%sChild %s\n' % (indent, child_number)])
+
+    def write(self):
+
+        # Write setup with all edits in one pass, then index setup as written
+
+        contents = []
+
+        for line_number, line in enumerate(self.lines, 1):
+            contents.append(self.replaced_lines.get(line_number, line))
+            contents.extend(self.inserted_lines.get(line_number, []))
+
+        contents = ''.join(contents)
+
+        with open(self.action_filename, 'w') as action_file:
+            action_file.write(contents)
+
+        self.index(contents.splitlines(True))
 
 #-------------------------------------#
 
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+    import os
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
+
 def invert(selection):
 
     invert = InvertAxis(selection)
-    invert.create_inverted_axis()
+    try:
+        invert.create_inverted_axis()
+    finally:
+        invert.remove_temp_folder()
 
 def invert_parent(selection):
 
     invert = InvertAxis(selection)
-    invert.invert_parent_axis()
+    try:
+        invert.invert_parent_axis()
+    finally:
+        invert.remove_temp_folder()
 
 def scope_axis(selection):
     import flame
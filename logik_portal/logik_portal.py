@@ -20,6 +20,40 @@ To install:
 
     Copy script into /opt/Autodesk/shared/python/logik_portal
 
+Studio Mirror:
+
+    Portal scripts and batch setups can be mirrored to a studio folder so seats don't each download from the portal
+
+    To sync mirror, run with Flame's python from cron or a shell:
+
+        python logik_portal.py --sync-mirror /path/to/mirror
+
+    Set Portal Mirror Path in /opt/Autodesk/shared/python/logik_portal/config/config to the mirror folder
+    to have the portal read from the mirror. Batch setup submissions still go to the portal.
+
+Timing Log:
+
+    Time spent connecting to the portal, downloading and parsing catalogs, scanning installed scripts and
+    loading lists is shown at the bottom of the Python Scripts tab and saved to cache/portal_timing.log
+    as one json line per portal session.
+
+    To save a cProfile of portal startup, start Flame with LOGIK_PORTAL_PROFILE set to a file path:
+
+        LOGIK_PORTAL_PROFILE=/tmp/logik_portal.prof
+
+Batch Setup Cache:
+
+    Downloaded batch setups are cached so downloading the same setup again doesn't touch the portal.
+    Cache folder and size are set with Batch Setup Cache Path and Batch Setup Cache Size GB in the config file.
+    Point several seats at the same cache folder to share it.
+
+Transfer Checks:
+
+    Session pool reuse and reconnects, resumed downloads, streamed installs and uploads and mirror sync
+    can be checked without Flame against a local ftp stand-in:
+
+        python logik_portal.py --check-transfers
+
 Updates:
 
 v2.2 06.03.21
@@ -75,9 +109,21 @@ v1.2 12.29.20
 
 from __future__ import print_function
 import os
+import io
+import re
 import ast
+import json
+import hashlib
+import time
 import shutil
-from ftplib import FTP
+import socket
+import socketserver
+import tarfile
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from ftplib import FTP, all_errors, error_perm, error_temp
 from functools import partial
 import xml.etree.ElementTree as ET
 from PySide2 import QtWidgets, QtCore, QtGui
@@ -86,6 +132,23 @@ VERSION = 'v2.2'
 
 SCRIPT_PATH = '/opt/Autodesk/shared/python/logik_portal'
 
+PORTAL_HOST = 'logik.hostedftp.com'
+
+PORTAL_LOGINS = {'download': ('logik', 'L0gikD0wnL0ad#20', ''),
+                 'upload': ('logik_upload', 'L0gikUpl0ad#20', '/Submit')}
+
+PORTAL_MIRROR_FOLDERS = ['/Scripts', '/Batch_Setups']
+
+# Portal path of each catalog xml
+
+PORTAL_CATALOGS = {'batch_setups': '/Batch_Setups/batch_setups.xml',
+                   'python_scripts': '/Scripts/python_scripts.xml'}
+
+# Catalog fields searched by the search boxes
+
+SCRIPT_SEARCH_FIELDS = ['name', 'developer', 'flame_version', 'description']
+BATCH_SEARCH_FIELDS = ['name', 'artist', 'flame_version', 'description']
+
 class FlameLabel(QtWidgets.QLabel):
     """
     Custom Qt Flame Label Widget
@@ -276,367 +339,1252 @@ class FlameTreeWidget(QtWidgets.QTreeWidget):
         self.horizontalScrollBar().setStyleSheet('color: #818181')
         self.setHeaderLabels(headers)
 
-# ------------------------------------------------- #
+class PortalTimer(object):
+    """
+    Collects timing spans of portal work such as ftp connects, catalog downloads and tree loading
+    Spans can be timed from any thread with: with timer.span('name'):
+    Spans are saved as one json line per portal session so slow portal opens can be compared over time
+    """
 
-class LogikPortal(object):
+    def __init__(self):
 
-    def __init__(self, selection):
-        import flame
+        self.start_time = time.time()
+        self.spans = []
+        self.lock = threading.Lock()
 
-        print ('\n', '>' * 20, 'logik portal %s' % VERSION, '<' * 20, '\n')
+    @contextmanager
+    def span(self, name, **details):
 
-        # Define paths
+        span_start = time.time()
 
-        self.shared_script_path = '/opt/Autodesk/shared/python'
-        self.config_path = os.path.join(SCRIPT_PATH, 'config')
-        self.config_file = os.path.join(self.config_path, 'config')
+        try:
+            yield details
+        finally:
+            span = {'name': name,
+                    'start': round(span_start - self.start_time, 4),
+                    'duration': round(time.time() - span_start, 4),
+                    'thread': threading.current_thread().name}
+            span.update(details)
 
-        # Load config file
+            with self.lock:
+                self.spans.append(span)
 
-        self.config_file_check()
-        self.load_config()
+    def totals(self):
 
-        # Get user
+        # Total time of each kind of span
 
-        self.flame_current_user = flame.users.current_user.name
+        totals = {}
 
-        self.temp_folder = os.path.join(SCRIPT_PATH, 'temp')
-        if not os.path.isdir(self.temp_folder):
-            try:
-                os.makedirs(self.temp_folder)
-            except:
-                return message_box('<center>Script needs full permissions to script folder.<br><br>In shell/terminal type:<br><br>chmod 777 /opt/Autodesk/shared/python/logik_portal<br>')
+        with self.lock:
+            for span in self.spans:
+                totals[span['name']] = totals.get(span['name'], 0.0) + span['duration']
 
-        # Get version of flame and convert to float
+        return totals
 
-        self.flame_version = flame.get_version()
+    def save(self, log_path, **details):
 
-        if 'pr' in self.flame_version:
-            self.flame_version = self.flame_version.rsplit('.pr', 1)[0]
-        if  self.flame_version.count('.') > 1:
-            self.flame_version = self.flame_version.rsplit('.', 1)[0]
-        self.flame_version = float(self.flame_version)
-        print ('flame_version:', self.flame_version)
+        # Append session to json log, log is rotated once it gets bigger than a megabyte
+
+        with self.lock:
+            record = {'date': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.start_time)), 'spans': list(self.spans)}
+        record.update(details)
 
         try:
-            self.ftp_download_connect()
-        except:
-            message_box("<center>Can't connect to Logik Portal.<br>Check internet connection and try again.")
-            return
+            if os.path.isfile(log_path) and os.path.getsize(log_path) > 1024 * 1024:
+                os.rename(log_path, log_path + '.1')
+            with open(log_path, 'a') as log_file:
+                log_file.write(json.dumps(record) + '\n')
+        except (IOError, OSError) as e:
+            print ('\n>>> unable to save timing log: %s <<<\n' % e)
+
+class PortalSessionPool(object):
+    """
+    Pool of logged in ftp sessions to the Logik Portal
+    Sessions are checked out with session('download') or session('upload') and handed back when the block ends
+    Idle sessions are sent a NOOP every keepalive_interval seconds so the server doesn't drop them
+    Sessions that fail with a connection error are thrown away and replaced with a fresh login
+    """
 
-        #  Init variables
+    def __init__(self, host, logins, keepalive_interval=30, max_sessions=4, timeout=60, timer=None, port=21):
 
-        self.ftp_script_list = []
-        self.installed_script_dict = {}
-        self.file_description = ''
-        self.tar_path = ''
-        self.tar_file_name = ''
-        self.batch_setups_xml_path = ''
-        self.python_scripts_xml_path = ''
-        self.sudo_password = ''
+        self.host = host
+        self.port = port
+        self.logins = logins
+        self.timer = timer or PortalTimer()
+        self.keepalive_interval = keepalive_interval
+        self.max_sessions = max_sessions
+        self.timeout = timeout
 
-        self.main_window()
+        self.idle_sessions = dict((kind, []) for kind in logins)
+        self.open_sessions = dict((kind, 0) for kind in logins)
+        self.condition = threading.Condition()
+        self.keepalive_timer = None
+        self.closed = False
 
-        self.get_installed_scripts(self.installed_scripts_tree, self.shared_script_path)
+    def connect(self, kind):
 
-        self.get_batch_setups(self.batch_setups_tree)
+        user, password, cwd = self.logins[kind]
 
-        self.get_ftp_scripts(self.portal_scripts_tree)
+        with self.timer.span('ftp connect', login=kind):
+            ftp = FTP(timeout=self.timeout)
+            ftp.connect(self.host, self.port)
+            ftp.login(user, password)
+            if cwd:
+                ftp.cwd(cwd)
 
-        # Close ftp connection
+        print ('\n>>> connected to portal <<<\n')
 
-        self.ftp.quit()
+        return ftp
 
-        # Check first items in tree lists for install/download button disable
+    def acquire(self, kind):
 
-        self.check_batch_flame_version(self.batch_setups_tree, 0)
+        # Reuse an idle session if there is one, otherwise open a new one as long as the pool isn't full
 
-        self.check_script_flame_version(self.portal_scripts_tree, 0)
+        with self.condition:
+            while not self.idle_sessions[kind] and self.open_sessions[kind] >= self.max_sessions:
+                self.condition.wait()
+            if self.idle_sessions[kind]:
+                return self.idle_sessions[kind].pop()[0]
+            self.open_sessions[kind] += 1
 
-        print ('\n>>> logik portal loaded <<<\n')
+        try:
+            return self.connect(kind)
+        except:
+            self.discard(kind, None)
+            raise
 
-    def load_config(self):
+    def release(self, kind, ftp):
 
-        # Load config file values
+        with self.condition:
+            if self.closed:
+                self.open_sessions[kind] -= 1
+                quit_session(ftp)
+            else:
+                self.idle_sessions[kind].append((ftp, time.time()))
+                self.start_keepalive()
+            self.condition.notify()
 
-        get_config_values = open(self.config_file, 'r')
-        values = get_config_values.read().splitlines()
+    def discard(self, kind, ftp):
 
-        self.matchbox_path = values[2]
-        self.batch_setup_download_path = values[4]
-        self.batch_submit_path = values[6]
-        self.script_submit_path = values[8]
-        self.open_batch = ast.literal_eval(values[10])
+        # Drop a broken session and free its slot in the pool
 
-        get_config_values.close()
+        if ftp is not None:
+            quit_session(ftp)
 
-    def config_file_check(self):
+        with self.condition:
+            self.open_sessions[kind] -= 1
+            self.condition.notify()
 
-        # Check for and load config file
-        #-------------------------------
+    @contextmanager
+    def session(self, kind):
 
-        if not os.path.isdir(self.config_path):
-            try:
-                os.makedirs(self.config_path)
-            except:
-                message_box('Unable to create folder:<br>%s<br>Check folder permissions' % self.config_path)
+        ftp = self.acquire(kind)
 
-        if not os.path.isfile(self.config_file):
-            print ('>>> config file does not exist, creating new config file <<<\n')
+        try:
+            yield ftp
+        except all_errors as e:
+            if is_connection_error(e):
+                self.discard(kind, ftp)
+            else:
+                self.release(kind, ftp)
+            raise
+        except:
+            self.release(kind, ftp)
+            raise
+        else:
+            self.release(kind, ftp)
 
-            config_text = []
+    def run(self, kind, operation):
 
-            config_text.insert(0, 'Values for Logik Portal script.')
-            config_text.insert(1, 'Matchbox Path:')
-            config_text.insert(2, '')
-            config_text.insert(3, 'Batch Setup Download Path:')
-            config_text.insert(4, '/')
-            config_text.insert(5, 'Batch Submit Path:')
-            config_text.insert(6, '/')
-            config_text.insert(7, 'Script Submit Path:')
-            config_text.insert(8, '/')
-            config_text.insert(9, 'Open Batch after download:')
-            config_text.insert(10, 'False')
+        # Run operation(ftp) with a pooled session, reconnecting and retrying once if the session has gone stale
 
-            out_file = open(self.config_file, 'w')
-            for line in config_text:
-                print(line, file=out_file)
-            out_file.close()
+        try:
+            with self.session(kind) as ftp:
+                return operation(ftp)
+        except all_errors as e:
+            if not is_connection_error(e):
+                raise
+            print ('\n>>> portal connection lost, reconnecting <<<\n')
 
-    # ----------------------------------------------------------------- #
+        with self.session(kind) as ftp:
+            return operation(ftp)
 
-    def ftp_download_connect(self):
+    def start_keepalive(self):
 
-        # Connect to ftp
+        if self.keepalive_timer is None and not self.closed:
+            self.keepalive_timer = threading.Timer(self.keepalive_interval, self.keepalive)
+            self.keepalive_timer.daemon = True
+            self.keepalive_timer.start()
 
-        self.ftp = FTP('logik.hostedftp.com')
-        self.ftp.login('logik', 'L0gikD0wnL0ad#20')
+    def keepalive(self):
 
-        print ('\n>>> connected to portal <<<\n')
+        # NOOP every idle session that hasn't been used for a while, drop the ones that don't answer
+        # Stale sessions are taken out of the pool while they're checked so a slow NOOP doesn't hold up acquire
 
-    def ftp_upload_connect(self):
+        stale_sessions = []
 
-        # Connect to ftp
+        with self.condition:
+            self.keepalive_timer = None
+            if self.closed:
+                return
 
-        self.ftp = FTP('logik.hostedftp.com')
-        self.ftp.login('logik_upload', 'L0gikUpl0ad#20')
-        self.ftp.cwd('/Submit')
+            now = time.time()
 
-        print ('\n>>> connected to portal <<<\n')
+            for kind, idle in self.idle_sessions.items():
+                for ftp, last_used in list(idle):
+                    if now - last_used >= self.keepalive_interval:
+                        idle.remove((ftp, last_used))
+                        stale_sessions.append((kind, ftp))
 
-    def ftp_disconnect(self):
+        checked_sessions = []
 
-        self.ftp.quit()
+        for kind, ftp in stale_sessions:
+            try:
+                ftp.voidcmd('NOOP')
+                checked_sessions.append((kind, ftp, True))
+            except all_errors:
+                quit_session(ftp)
+                checked_sessions.append((kind, ftp, False))
+
+        with self.condition:
+            for kind, ftp, alive in checked_sessions:
+                if alive and not self.closed:
+                    self.idle_sessions[kind].append((ftp, time.time()))
+                else:
+                    if alive:
+                        quit_session(ftp)
+                    self.open_sessions[kind] -= 1
+                self.condition.notify()
 
-        print ('\n>>> disconnected from portal <<<\n')
+            if any(self.idle_sessions.values()):
+                self.start_keepalive()
 
-    # ----------------------------------------------------------------- #
+    def close(self):
 
-    def main_window(self):
+        # Safe to call more than once, portal closes the pool from both done and window_closed
 
-        self.window = QtWidgets.QTabWidget()
-        self.window.setMinimumSize(QtCore.QSize(1200, 750))
-        self.window.setMaximumSize(QtCore.QSize(1200, 750))
-        self.window.setWindowTitle('Logik Portal %s' % VERSION)
-        self.window.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
-        self.window.setAttribute(QtCore.Qt.WA_DeleteOnClose)
-        self.window.setStyleSheet('background-color: #212121')
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            if self.keepalive_timer is not None:
+                self.keepalive_timer.cancel()
+                self.keepalive_timer = None
+            for kind, idle in self.idle_sessions.items():
+                for ftp, last_used in idle:
+                    quit_session(ftp)
+                self.open_sessions[kind] -= len(idle)
+                del idle[:]
+            self.condition.notify_all()
 
-        # Center window in linux
+        print ('\n>>> disconnected from portal <<<\n')
 
-        resolution = QtWidgets.QDesktopWidget().screenGeometry()
-        self.window.move((resolution.width() / 2) - (self.window.frameSize().width() / 2),
-                         (resolution.height() / 2) - (self.window.frameSize().height() / 2))
+class PortalMirrorSession(object):
+    """
+    Reads portal files from a studio mirror folder made with sync_portal_mirror
+    Implements the parts of ftplib.FTP used for portal downloads so it can stand in for a portal session
+    """
 
-        # Tabs
+    def __init__(self, mirror_path):
 
-        self.window.tab1 = QtWidgets.QWidget()
-        self.window.tab2 = QtWidgets.QWidget()
-        self.window.tab3 = QtWidgets.QWidget()
-        self.window.tab4 = QtWidgets.QWidget()
+        self.mirror_path = os.path.realpath(mirror_path)
 
-        self.window.setStyleSheet('QTabWidget {background-color: #212121; font: 14px "Discreet"}'
-                                  'QTabWidget::tab-bar {alignment: center}'
-                                  'QTabBar::tab {color: #9a9a9a; background-color: #212121; border: 1px solid #3a3a3a; border-bottom-color: #555555; min-width: 20ex; padding: 5px}'
-                                  'QTabBar::tab:selected {color: #bababa; border: 1px solid #555555; border-bottom: 1px solid #212121}'
-                                  'QTabWidget::pane {border-top: 1px solid #555555; top: -0.05em}')
+    def local_path(self, ftp_path):
 
-        self.window.addTab(self.window.tab1, 'Python Scripts')
-        self.window.addTab(self.window.tab3, 'Matchbox')
-        self.window.addTab(self.window.tab4, 'Batch Setups')
+        local_path = os.path.realpath(os.path.join(self.mirror_path, ftp_path.lstrip('/')))
 
-        self.python_scripts = self.python_scripts_tab()
-        self.matchbox = self.matchbox_tab()
-        self.batch_setups = self.batch_setups_tab()
+        if not local_path.startswith(self.mirror_path + os.sep) or not os.path.exists(local_path):
+            raise error_perm('550 %s: No such file or directory' % ftp_path)
 
-        #------------------------------------#
+        return local_path
 
-        # Window Layout
+    def voidcmd(self, cmd):
 
-        self.vbox = QtWidgets.QVBoxLayout()
-        self.vbox.setMargin(15)
+        return '200 Command okay.'
 
-        self.vbox.addLayout(self.window.tab1.layout)
-        self.vbox.addLayout(self.window.tab3.layout)
-        self.vbox.addLayout(self.window.tab4.layout)
+    def sendcmd(self, cmd):
 
-        self.window.setLayout(self.vbox)
+        command, ftp_path = cmd.split(' ', 1)
 
-        self.window.show()
+        if command == 'MDTM':
+            return '213 ' + time.strftime('%Y%m%d%H%M%S', time.gmtime(os.path.getmtime(self.local_path(ftp_path))))
 
-        return self.window
+        raise error_perm('502 %s not supported by portal mirror' % command)
 
-    def python_scripts_tab(self):
+    def size(self, ftp_path):
 
-        # Tab 1
+        return os.path.getsize(self.local_path(ftp_path))
 
-        # Labels
+    def nlst(self, ftp_path):
 
-        self.installed_scripts_label = FlameLabel('Installed Scripts: /opt/Autodesk/shared/python', 'background', self.window.tab1)
-        self.portal_scripts_label = FlameLabel('Portal Scripts', 'background', self.window.tab1)
-        self.script_description_label = FlameLabel('Script Description', 'background', self.window.tab1)
+        return [os.path.join(ftp_path, name) for name in os.listdir(self.local_path(ftp_path))]
 
-        # Logos
+    def retrbinary(self, cmd, callback, blocksize=8192, rest=None):
 
-        self.logik_logo_label = QtWidgets.QLabel(self.window.tab1)
-        self.logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'logik_logo.png'))
-        self.logik_logo_label.setPixmap(self.logo_label_pixmap)
+        with open(self.local_path(cmd.split(' ', 1)[1]), 'rb') as local_file:
+            if rest:
+                local_file.seek(int(rest))
+            for block in iter(partial(local_file.read, blocksize), b''):
+                callback(block)
 
-        # Text Edit
+        return '226 Transfer complete.'
 
-        self.script_description_text_edit = FlameTextEdit(self.file_description, True, self.window.tab1)
+    def transfercmd(self, cmd, rest=None):
 
-        # Installed Scripts TreeWidget
+        local_file = open(self.local_path(cmd.split(' ', 1)[1]), 'rb')
+        if rest:
+            local_file.seek(int(rest))
 
-        installed_tree_headers = ['Name', 'Version', 'Flame', 'Date', 'Developer', 'Path']
-        self.installed_scripts_tree = FlameTreeWidget(self.installed_script_description, self.script_description_text_edit, installed_tree_headers, self.window.tab1)
+        return PortalMirrorTransfer(local_file)
 
-        # Available Scripts TreeWidget
+    def voidresp(self):
 
-        available_tree_headers = ['Name', 'Version', 'Flame', 'Date', 'Developer']
-        self.portal_scripts_tree = FlameTreeWidget(self.ftp_script_description, self.script_description_text_edit, available_tree_headers, self.window.tab1)
+        return '226 Transfer complete.'
 
-        # Buttons
+    def quit(self):
 
-        self.install_script_btn = FlameButton('Install', partial(self.install_script, self.portal_scripts_tree, self.installed_scripts_tree, self.shared_script_path), self.window.tab1)
-        self.delete_script_btn = FlameButton('Delete', partial(self.delete_script, self.installed_scripts_tree, self.shared_script_path), self.window.tab1)
-        self.script_done_btn = FlameButton('Done', self.done, self.window.tab1)
+        pass
 
-        # Disable script download button if current flame version older than script minimum
+    def close(self):
 
-        self.portal_scripts_tree.clicked.connect(partial(self.check_script_flame_version, self.portal_scripts_tree))
+        pass
 
-        # Contextual Menus
+class PortalMirrorTransfer(object):
+    """
+    Stands in for the data connection socket ftplib's transfercmd returns
+    """
 
-        self.action_delete_script = QtWidgets.QAction('Delete Script', self.window.tab1)
-        self.action_delete_script.triggered.connect(partial(self.delete_script, self.installed_scripts_tree, self.shared_script_path))
-        self.installed_scripts_tree.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
-        self.installed_scripts_tree.addAction(self.action_delete_script)
+    def __init__(self, local_file):
 
-        self.action_install_script = QtWidgets.QAction('Install Script', self.window.tab1)
-        self.action_install_script.triggered.connect(partial(self.install_script, self.portal_scripts_tree, self.installed_scripts_tree, self.shared_script_path))
-        self.portal_scripts_tree.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
-        self.portal_scripts_tree.addAction(self.action_install_script)
+        self.local_file = local_file
 
-        #------------------------------------#
+    def makefile(self, mode):
 
-        #  Tab layout
+        return self.local_file
 
-        self.window.tab1.layout = QtWidgets.QGridLayout()
-        self.window.tab1.layout.setMargin(30)
-        self.window.tab1.layout.setVerticalSpacing(5)
-        self.window.tab1.layout.setHorizontalSpacing(5)
+    def close(self):
 
-        self.window.tab1.layout.addWidget(self.installed_scripts_label, 0, 0, 1, 5)
-        self.window.tab1.layout.addWidget(self.portal_scripts_label, 0, 7, 1, 5)
+        self.local_file.close()
 
-        self.window.tab1.layout.addWidget(self.installed_scripts_tree, 1, 0, 1, 5)
-        self.window.tab1.layout.addWidget(self.portal_scripts_tree, 1, 7, 1, 5)
+class PortalMirror(object):
+    """
+    Same interface as PortalSessionPool, but downloads are read from a studio mirror folder
+    Uploads still go to the portal through upload_pool
+    """
 
-        self.window.tab1.layout.addWidget(self.delete_script_btn, 2, 4)
-        self.window.tab1.layout.addWidget(self.install_script_btn, 2, 11)
+    def __init__(self, mirror_path, upload_pool):
 
-        self.window.tab1.layout.addWidget(self.script_description_label, 4, 0, 1, 12)
-        self.window.tab1.layout.addWidget(self.script_description_text_edit, 5, 0, 1, 12)
+        self.mirror_path = mirror_path
+        self.upload_pool = upload_pool
+        self.max_sessions = upload_pool.max_sessions
 
-        self.window.tab1.layout.addWidget(self.logik_logo_label, 6, 0)
-        self.window.tab1.layout.addWidget(self.script_done_btn, 6, 11)
+    @contextmanager
+    def session(self, kind):
 
-        self.window.tab1.setLayout(self.window.tab1.layout)
+        if kind == 'upload':
+            with self.upload_pool.session(kind) as ftp:
+                yield ftp
+        else:
+            yield PortalMirrorSession(self.mirror_path)
 
-    def matchbox_tab(self):
+    def run(self, kind, operation):
 
-        def matchbox_browse_dir():
+        if kind == 'upload':
+            return self.upload_pool.run(kind, operation)
 
-            file_browser = QtWidgets.QFileDialog()
-            file_browser.setDirectory(self.matchbox_path_lineedit.text())
-            file_browser.setFileMode(QtWidgets.QFileDialog.DirectoryOnly)
-            if file_browser.exec_():
-                self.matchbox_path_lineedit.setText(str(file_browser.selectedFiles()[0]))
+        with self.session(kind) as ftp:
+            return operation(ftp)
 
-        # Tab 3
+    def close(self):
 
-        # Labels
+        self.upload_pool.close()
 
-        self.matchbox_install_logik_label = FlameLabel('Install Logik Matchboxes', 'background', self.window.tab3)
-        self.matchbox_install_label = FlameLabel('Install Path', 'normal', self.window.tab3)
+class BatchSetupCache(object):
+    """
+    Downloaded batch setup tgz files, kept between portal sessions and shared by every seat using the cache path
+    Entries are named by batch name and a hash of what identifies that version of the batch setup
+    Least recently used entries are removed once the cache holds more than max_bytes
+    """
 
-        # Logos
+    def __init__(self, cache_path, max_bytes):
 
-        self.logik_logo_label = QtWidgets.QLabel(self.window.tab3)
-        self.logik_logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'logik_logo.png'))
-        self.logik_logo_label.setPixmap(self.logo_label_pixmap)
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
 
-        self.croc_logo_label = QtWidgets.QLabel(self.window.tab3)
-        self.croc_logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'croc_logo.png'))
-        self.croc_logo_label.setPixmap(self.croc_logo_label_pixmap)
-        self.croc_logo_label.setAlignment(QtCore.Qt.AlignCenter)
+        if not os.path.isdir(cache_path):
+            os.makedirs(cache_path)
 
-        # LineEdits
+    def entry_path(self, batch_name, *key):
 
-        self.matchbox_path_lineedit = FlameClickableLineEdit(self.matchbox_path, self.window.tab3)
-        self.matchbox_path_lineedit.clicked.connect(matchbox_browse_dir)
+        key = hashlib.sha1('|'.join(str(part) for part in key).encode('utf-8')).hexdigest()[:16]
 
-        # Buttons
+        return os.path.join(self.cache_path, '%s_%s.tgz' % (batch_name.replace(' ', '_'), key))
 
-        self.matchbox_download_btn = FlameButton('Download', self.check_matchbox_download_path, self.window.tab3)
-        self.matchbox_done_btn = FlameButton('Done', self.done, self.window.tab3)
+    def get(self, entry_path):
 
-        # Layout
+        # Touch entry so it counts as recently used
 
-        self.window.tab3.layout = QtWidgets.QGridLayout()
-        self.window.tab3.layout.setMargin(30)
-        self.window.tab3.layout.setVerticalSpacing(5)
-        self.window.tab3.layout.setHorizontalSpacing(5)
-        self.window.tab3.layout.setColumnStretch(1, 110)
+        if not os.path.isfile(entry_path):
+            return False
 
-        self.window.tab3.layout.addWidget(self.matchbox_install_logik_label, 0, 0, 1, 5)
+        # Entry may belong to another user of the shared cache, touching it is best effort
 
-        self.window.tab3.layout.addWidget(self.matchbox_install_label, 1, 0)
-        self.window.tab3.layout.addWidget(self.matchbox_path_lineedit, 1, 1, 1, 3)
-        self.window.tab3.layout.addWidget(self.matchbox_download_btn, 1, 4)
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
 
-        self.window.tab3.layout.addWidget(self.croc_logo_label, 2, 1)
+        return True
 
-        self.window.tab3.layout.addWidget(self.logik_logo_label, 4, 0)
-        self.window.tab3.layout.addWidget(self.matchbox_done_btn, 4, 4)
+    def partial_path(self, entry_path):
 
-        self.window.tab3.setLayout(self.window.tab3.layout)
+        # Partial download sits next to its entry so it can be renamed into place in one step
+        # Kept per workstation so seats sharing the cache don't write into each other's downloads
+        # Name doesn't end in .tgz so other seats never see it as an entry
 
-    def batch_setups_tab(self):
+        return os.path.join(self.cache_path, '.%s.%s.part' % (os.path.basename(entry_path), socket.gethostname()))
 
-        def batch_setups_download():
+    def evict(self, keep_path=None):
 
-            def save_config():
+        entries = []
 
-                # Save path to config file
+        for file_name in os.listdir(self.cache_path):
+            if file_name.endswith('.tgz'):
+                entry_path = os.path.join(self.cache_path, file_name)
+                try:
+                    entry_stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+        # Keep most recently used entries until over budget
+
+        cache_bytes = 0
+
+        for entry_mtime, entry_size, entry_path in sorted(entries, reverse=True):
+            cache_bytes += entry_size
+            if cache_bytes > self.max_bytes and entry_path != keep_path:
+                print ('>>> removing %s from batch setup cache <<<' % os.path.basename(entry_path))
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+                cache_bytes -= entry_size
+
+class PortalTask(QtCore.QObject):
+    """
+    Runs function on a worker thread and hands its result to on_done on the Qt main thread
+    If function raises, the exception is handed to on_failed instead
+    If on_progress is given, function is called with a progress keyword it can call from the worker thread
+    Task must be created on the main thread so the result is queued back to it
+    """
+
+    finished = QtCore.Signal(object, object)
+    progressed = QtCore.Signal(object)
+
+    def __init__(self, function, on_done, on_failed=None, on_progress=None):
+        super(PortalTask, self).__init__()
+
+        self.function = function
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.finished.connect(self.deliver)
+
+        if on_progress:
+            self.function = partial(function, progress=self.progressed.emit)
+            self.progressed.connect(on_progress)
+
+    def start(self):
+
+        worker = threading.Thread(target=self.run)
+        worker.daemon = True
+        worker.start()
+
+        return self
+
+    def run(self):
+
+        try:
+            result = self.function()
+        except Exception as e:
+            self.finished.emit(None, e)
+        else:
+            self.finished.emit(result, None)
+
+    @QtCore.Slot(object, object)
+    def deliver(self, result, error):
+
+        if error is None:
+            self.on_done(result)
+        elif self.on_failed:
+            self.on_failed(error)
+        else:
+            print ('\n>>> portal task failed: %s <<<\n' % error)
+
+class InstalledScriptIndex(object):
+    """
+    Header info and description of installed scripts, saved between portal sessions
+    Entries are keyed by script path and reused for as long as the script's mtime and size don't change
+    """
+
+    def __init__(self, index_path):
+
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self.changed = False
+
+        try:
+            with open(index_path, 'r') as index_file:
+                self.entries = json.load(index_file)
+        except (IOError, ValueError):
+            self.entries = {}
+
+    def get(self, script_path):
+
+        script_stat = os.stat(script_path)
+
+        with self.lock:
+            entry = self.entries.get(script_path)
+
+        if entry and entry['mtime'] == script_stat.st_mtime and entry['size'] == script_stat.st_size:
+            return entry
+
+        # Script is new or has changed since last scan
+
+        entry = read_script_header(script_path)
+        entry['mtime'] = script_stat.st_mtime
+        entry['size'] = script_stat.st_size
+
+        with self.lock:
+            self.entries[script_path] = entry
+            self.changed = True
+
+        return entry
+
+    def save(self, script_paths):
+
+        # Drop scripts that are no longer installed and write index if anything changed
+
+        with self.lock:
+            script_paths = set(script_paths)
+            for script_path in [path for path in self.entries if path not in script_paths]:
+                del self.entries[script_path]
+                self.changed = True
+
+            if not self.changed:
+                return
+
+            try:
+                with open(self.index_path + '.part', 'w') as index_file:
+                    json.dump(self.entries, index_file)
+                os.rename(self.index_path + '.part', self.index_path)
+                self.changed = False
+            except (IOError, OSError) as e:
+                print ('\n>>> unable to save script index: %s <<<\n' % e)
+
+class CatalogSearchIndex(object):
+    """
+    Inverted index over a portal catalog for the search boxes
+    Words are indexed by their first one to three letters, longer search words are looked up in a sorted word list
+    so a search never has to look through every catalog entry
+    Each keystroke narrows the last search, so only the word being typed is looked up, within the last search's entries
+    """
+
+    def __init__(self, records, fields):
+
+        self.words = {}
+        self.prefixes = {}
+        self.entry_count = len(records)
+
+        for entry_number, record in enumerate(records):
+            for word in set(search_words(' '.join(record[field] for field in fields))):
+                self.words.setdefault(word, set()).add(entry_number)
+
+        for word, entry_numbers in self.words.items():
+            for length in range(1, min(len(word), 3) + 1):
+                self.prefixes.setdefault(word[:length], set()).update(entry_numbers)
+
+        self.sorted_words = sorted(self.words)
+
+        # Entries currently shown in tree
+
+        self.all_entries = frozenset(range(self.entry_count))
+        self.visible = self.all_entries
+
+        # Recent searches by search words, so backspacing over a search is a lookup
+
+        self.searches = {(): self.all_entries}
+        self.last_search = ()
+
+    def word_matches(self, search_word, entries):
+
+        # Entries out of entries that have a word starting with search_word
+
+        if len(search_word) <= 3:
+            if entries is self.all_entries:
+                return self.prefixes.get(search_word, frozenset())
+            return entries & self.prefixes.get(search_word, frozenset())
+
+        matches = set()
+
+        word_number = bisect_left(self.sorted_words, search_word)
+        while word_number < len(self.sorted_words) and self.sorted_words[word_number].startswith(search_word):
+            if entries is self.all_entries:
+                matches.update(self.words[self.sorted_words[word_number]])
+            else:
+                matches.update(entries & self.words[self.sorted_words[word_number]])
+            word_number += 1
+
+        return matches
+
+    def search(self, search_text):
+
+        # Returns numbers of entries that have a word starting with each search word
+        # Returned set is shared with the index so it shouldn't be changed
+
+        words = tuple(sorted(set(search_words(search_text)), key=len, reverse=True))
+
+        if words in self.searches:
+            self.last_search = words
+            return self.searches[words]
+
+        # If every word of the last search starts a word of this one, this search can only narrow it
+
+        if all(any(word.startswith(last_word) for word in words) for last_word in self.last_search):
+            entries = self.searches[self.last_search]
+            new_words = [word for word in words if word not in self.last_search]
+        else:
+            entries = self.all_entries
+            new_words = words
+
+        for search_word in new_words:
+            if not entries:
+                break
+            entries = self.word_matches(search_word, entries)
+
+        if len(self.searches) > 256:
+            self.searches = {(): self.all_entries}
+        self.searches[words] = entries
+        self.last_search = words
+
+        return entries
+
+# ------------------------------------------------- #
+
+class LogikPortal(object):
+
+    def __init__(self, selection):
+        import flame
+
+        print ('\n', '>' * 20, 'logik portal %s' % VERSION, '<' * 20, '\n')
+
+        # Time portal work so slow opens can be traced to network, script scan or tree loading
+
+        self.timer = PortalTimer()
+
+        # Define paths
+
+        self.shared_script_path = '/opt/Autodesk/shared/python'
+        self.config_path = os.path.join(SCRIPT_PATH, 'config')
+        self.config_file = os.path.join(self.config_path, 'config')
+
+        # Load config file
+
+        self.config_file_check()
+        self.load_config()
+
+        # Get user
+
+        self.flame_current_user = flame.users.current_user.name
+
+        self.temp_folder = os.path.join(SCRIPT_PATH, 'temp')
+        self.cache_folder = os.path.join(SCRIPT_PATH, 'cache')
+        for folder in [self.temp_folder, self.cache_folder]:
+            if os.path.isdir(folder):
+                continue
+            try:
+                os.makedirs(folder)
+            except:
+                return message_box('<center>Script needs full permissions to script folder.<br><br>In shell/terminal type:<br><br>chmod 777 /opt/Autodesk/shared/python/logik_portal<br>')
+
+        # Get version of flame and convert to float
+
+        self.flame_version = flame.get_version()
+
+        if 'pr' in self.flame_version:
+            self.flame_version = self.flame_version.rsplit('.pr', 1)[0]
+        if  self.flame_version.count('.') > 1:
+            self.flame_version = self.flame_version.rsplit('.', 1)[0]
+        self.flame_version = float(self.flame_version)
+        print ('flame_version:', self.flame_version)
+
+        # Portal sessions stay logged in until the portal is closed
+
+        self.ftp_pool = PortalSessionPool(PORTAL_HOST, PORTAL_LOGINS, timer=self.timer)
+
+        # Read scripts and batch setups from studio mirror if one is set in config
+
+        if self.portal_mirror_path:
+            print ('portal_mirror_path:', self.portal_mirror_path)
+            self.ftp_pool = PortalMirror(self.portal_mirror_path, self.ftp_pool)
+
+        #  Init variables
+
+        self.ftp_script_list = []
+        self.installed_script_dict = {}
+        self.file_description = ''
+        self.batch_tar_files = []
+        self.tar_file_name = ''
+        self.batch_setups_xml_path = os.path.join(self.cache_folder, 'batch_setups.xml')
+        self.python_scripts_xml_path = os.path.join(self.cache_folder, 'python_scripts.xml')
+        self.catalog_xml_paths = {'batch_setups': self.batch_setups_xml_path, 'python_scripts': self.python_scripts_xml_path}
+        self.sudo_password = ''
+        self.portal_tasks = []
+        self.portal_closed = False
+        self.portal_script_catalog = {}
+        self.batch_setup_catalog = {}
+        self.portal_script_search = None
+        self.batch_setup_search = None
+        self.portal_script_items = []
+        self.batch_setup_items = []
+        try:
+            self.batch_setup_cache = BatchSetupCache(self.batch_setup_cache_path, int(self.batch_setup_cache_size * 1024 * 1024 * 1024))
+        except OSError:
+            return message_box('Unable to create batch setup cache folder:<br>%s<br>Check folder permissions' % self.batch_setup_cache_path)
+        self.script_index = InstalledScriptIndex(os.path.join(self.cache_folder, 'installed_scripts.json'))
+        self.startup_time = time.time()
+        self.startup_phases = {}
+
+        # Show window right away, trees are filled in as each loading phase finishes
+
+        self.main_window()
+        self.window.destroyed.connect(self.window_closed)
+
+        QtCore.QTimer.singleShot(0, partial(self.startup_phase_done, 'first paint'))
+
+        # Scan installed scripts and load python scripts catalog on worker threads
+        # Batch setups catalog is loaded when the Batch Setups tab is first opened
+
+        self.start_task(partial(self.scan_installed_scripts, self.shared_script_path), self.installed_scripts_loaded)
+
+        self.open_catalogs(['python_scripts'])
+
+        print ('\n>>> logik portal open, loading scripts <<<\n')
+
+    def start_task(self, function, on_done, on_failed=None, on_progress=None):
+
+        # Run function on a worker thread, results are ignored if portal was closed in the meantime
+
+        def if_open(callback, result):
+            if not self.portal_closed:
+                callback(result)
+
+        task = PortalTask(function, partial(if_open, on_done),
+                          partial(if_open, on_failed) if on_failed else None,
+                          partial(if_open, on_progress) if on_progress else None)
+        self.portal_tasks.append(task.start())
+
+    def window_closed(self, *args):
+
+        self.portal_closed = True
+
+        # Log out of portal if window was closed without the Done button
+
+        try:
+            self.ftp_pool.close()
+        except:
+            pass
+
+        # Save timing of this portal session
+
+        self.timer.save(os.path.join(self.cache_folder, 'portal_timing.log'),
+                        startup_phases=self.startup_phases,
+                        flame_version=self.flame_version,
+                        portal_mirror=bool(self.portal_mirror_path))
+
+    def startup_phase_done(self, phase):
+
+        # Print how long after opening the portal each loading phase finished
+
+        if phase in self.startup_phases:
+            return
+
+        self.startup_phases[phase] = time.time() - self.startup_time
+        print ('>>> %s: %.3f sec <<<' % (phase, self.startup_phases[phase]))
+
+        if all(p in self.startup_phases for p in ['first paint', 'installed scripts', 'portal catalogs']):
+            print ('\n>>> logik portal loaded in %.3f sec <<<\n' % max(self.startup_phases.values()))
+            self.show_timing_summary()
+
+    def show_timing_summary(self):
+
+        # Show total time of each kind of portal work in status area
+
+        totals = self.timer.totals()
+
+        summary = []
+        for name in ['ftp connect', 'catalog check', 'catalog download', 'xml parse', 'search index', 'installed script scan', 'tree population']:
+            if name in totals:
+                summary.append('%s %.2f' % (name, totals[name]))
+
+        status = 'Loaded in %.2f sec' % max(self.startup_phases.values())
+        if summary:
+            status += '   |   ' + '   '.join(summary)
+
+        print ('timing:', status)
+
+        self.portal_status_label.setText(status)
+
+    def installed_scripts_loaded(self, installed_scripts):
+
+        with self.timer.span('tree population', tree='installed scripts'):
+            self.get_installed_scripts(self.installed_scripts_tree, self.shared_script_path, installed_scripts)
+
+        # Portal scripts may have loaded first, highlight any that are newer than installed scripts
+
+        for index in range(self.portal_scripts_tree.topLevelItemCount()):
+            self.set_ftp_script_color(self.portal_scripts_tree.topLevelItem(index))
+
+        self.startup_phase_done('installed scripts')
+
+    def open_catalogs(self, catalog_names):
+
+        # Open from cached catalogs if there are any, otherwise catalogs have to be downloaded first
+
+        if all(os.path.isfile(self.catalog_xml_paths[catalog_name]) for catalog_name in catalog_names):
+            self.start_task(partial(self.load_catalogs, catalog_names, False), partial(self.cached_catalogs_loaded, catalog_names))
+        else:
+            self.start_task(partial(self.load_catalogs, catalog_names, True), self.catalogs_loaded, self.catalogs_unavailable)
+
+    def load_catalogs(self, catalog_names, refresh):
+
+        # Returns entries of each catalog keyed by catalog name
+        # If refresh is True only catalogs that changed on the portal are returned
+
+        if refresh:
+            changed = self.ftp_pool.run('download', partial(self.refresh_catalogs, catalog_names=catalog_names))
+        else:
+            changed = list(catalog_names)
+
+        catalogs = {}
+
+        # Search indexes are built here so the main thread only has to fill the trees
+
+        if 'batch_setups' in changed:
+            catalogs['batch_setups'] = self.read_batch_setups()
+            with self.timer.span('search index', catalog='batch_setups'):
+                catalogs['batch_setups_search'] = CatalogSearchIndex(catalogs['batch_setups'], BATCH_SEARCH_FIELDS)
+        if 'python_scripts' in changed:
+            catalogs['python_scripts'] = self.read_ftp_scripts()
+            with self.timer.span('search index', catalog='python_scripts'):
+                catalogs['python_scripts_search'] = CatalogSearchIndex(catalogs['python_scripts'], SCRIPT_SEARCH_FIELDS)
+
+        return catalogs
+
+    def catalogs_loaded(self, catalogs):
+
+        # Check first items in tree lists for install/download button disable
+
+        if 'batch_setups' in catalogs:
+            with self.timer.span('tree population', tree='batch setups'):
+                self.get_batch_setups(self.batch_setups_tree, catalogs['batch_setups'], catalogs['batch_setups_search'])
+            self.check_batch_flame_version(self.batch_setups_tree, 0)
+
+        if 'python_scripts' in catalogs:
+            with self.timer.span('tree population', tree='portal scripts'):
+                self.get_ftp_scripts(self.portal_scripts_tree, catalogs['python_scripts'], catalogs['python_scripts_search'])
+            self.check_script_flame_version(self.portal_scripts_tree, 0)
+
+        self.startup_phase_done('portal catalogs')
+
+    def cached_catalogs_loaded(self, catalog_names, catalogs):
+
+        self.catalogs_loaded(catalogs)
+
+        # Check cached catalogs against portal in the background
+
+        self.reconcile_catalogs(catalog_names)
+
+    def catalogs_unavailable(self, error):
+
+        print ('error:', error)
+
+        self.startup_phase_done('portal catalogs')
+
+        message_box("<center>Can't connect to Logik Portal.<br>Check internet connection and try again.")
+
+    def load_config(self):
+
+        # Load config file values
+
+        get_config_values = open(self.config_file, 'r')
+        values = get_config_values.read().splitlines()
+
+        self.matchbox_path = values[2]
+        self.batch_setup_download_path = values[4]
+        self.batch_submit_path = values[6]
+        self.script_submit_path = values[8]
+        self.open_batch = ast.literal_eval(values[10])
+
+        # Config files from older versions don't have mirror or batch setup cache values
+
+        if len(values) > 12:
+            self.portal_mirror_path = values[12]
+        else:
+            self.portal_mirror_path = ''
+
+        if len(values) > 16:
+            self.batch_setup_cache_path = values[14]
+            self.batch_setup_cache_size = float(values[16])
+        else:
+            self.batch_setup_cache_path = os.path.join(SCRIPT_PATH, 'cache', 'batch_setups')
+            self.batch_setup_cache_size = 10.0
+
+        get_config_values.close()
+
+    def config_file_check(self):
+
+        # Check for and load config file
+        #-------------------------------
+
+        if not os.path.isdir(self.config_path):
+            try:
+                os.makedirs(self.config_path)
+            except:
+                message_box('Unable to create folder:<br>%s<br>Check folder permissions' % self.config_path)
+
+        if not os.path.isfile(self.config_file):
+            print ('>>> config file does not exist, creating new config file <<<\n')
+
+            config_text = []
+
+            config_text.insert(0, 'Values for Logik Portal script.')
+            config_text.insert(1, 'Matchbox Path:')
+            config_text.insert(2, '')
+            config_text.insert(3, 'Batch Setup Download Path:')
+            config_text.insert(4, '/')
+            config_text.insert(5, 'Batch Submit Path:')
+            config_text.insert(6, '/')
+            config_text.insert(7, 'Script Submit Path:')
+            config_text.insert(8, '/')
+            config_text.insert(9, 'Open Batch after download:')
+            config_text.insert(10, 'False')
+            config_text.insert(11, 'Portal Mirror Path:')
+            config_text.insert(12, '')
+            config_text.insert(13, 'Batch Setup Cache Path:')
+            config_text.insert(14, os.path.join(SCRIPT_PATH, 'cache', 'batch_setups'))
+            config_text.insert(15, 'Batch Setup Cache Size GB:')
+            config_text.insert(16, '10')
+
+            out_file = open(self.config_file, 'w')
+            for line in config_text:
+                print(line, file=out_file)
+            out_file.close()
+
+    # ----------------------------------------------------------------- #
+
+    def refresh_catalog(self, ftp, ftp_path, xml_path):
+
+        # Download catalog xml to cache folder only if size or modification time on portal changed
+        # Returns True if cached catalog was updated
+
+        stamp_path = xml_path + '.stamp'
+
+        with self.timer.span('catalog check', path=ftp_path):
+            try:
+                ftp.voidcmd('TYPE I')
+                portal_stamp = '%s %s' % (ftp.size(ftp_path), ftp.sendcmd('MDTM ' + ftp_path).split(' ', 1)[1])
+            except error_perm:
+                portal_stamp = ''
+
+        if portal_stamp and os.path.isfile(xml_path) and os.path.isfile(stamp_path):
+            with open(stamp_path, 'r') as stamp_file:
+                if stamp_file.read() == portal_stamp:
+                    print ('>>> %s up to date <<<' % ftp_path)
+                    return False
+
+        print ('>>> downloading %s <<<' % ftp_path)
+
+        partial_path = xml_path + '.part'
+
+        with self.timer.span('catalog download', path=ftp_path):
+            with open(partial_path, 'wb') as xml_file:
+                ftp.retrbinary('RETR ' + ftp_path, xml_file.write)
+
+        os.rename(partial_path, xml_path)
+
+        with open(stamp_path, 'w') as stamp_file:
+            stamp_file.write(portal_stamp)
+
+        return True
+
+    def refresh_catalogs(self, ftp, catalog_names):
+
+        # Returns list of catalogs that changed on the portal
+
+        changed = []
+
+        for catalog_name in catalog_names:
+            if self.refresh_catalog(ftp, PORTAL_CATALOGS[catalog_name], self.catalog_xml_paths[catalog_name]):
+                changed.append(catalog_name)
+
+        return changed
+
+    def reconcile_catalogs(self, catalog_names):
+
+        def catalogs_refreshed(catalogs):
+
+            # Reload trees for catalogs that changed on the portal
+
+            self.catalogs_loaded(catalogs)
+
+            print ('\n>>> portal catalogs up to date <<<\n')
+
+            self.show_timing_summary()
+
+        def catalogs_offline(error):
+
+            print ('\n>>> unable to reach Logik Portal, using cached catalogs <<<\n')
+            print ('error:', error)
+
+        self.start_task(partial(self.load_catalogs, catalog_names, True), catalogs_refreshed, catalogs_offline)
+
+    # ----------------------------------------------------------------- #
+
+    def main_window(self):
+
+        self.window = QtWidgets.QTabWidget()
+        self.window.setMinimumSize(QtCore.QSize(1200, 750))
+        self.window.setMaximumSize(QtCore.QSize(1200, 750))
+        self.window.setWindowTitle('Logik Portal %s' % VERSION)
+        self.window.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+        self.window.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        self.window.setStyleSheet('background-color: #212121')
+
+        # Center window in linux
+
+        resolution = QtWidgets.QDesktopWidget().screenGeometry()
+        self.window.move((resolution.width() / 2) - (self.window.frameSize().width() / 2),
+                         (resolution.height() / 2) - (self.window.frameSize().height() / 2))
+
+        # Tabs
+
+        self.window.tab1 = QtWidgets.QWidget()
+        self.window.tab2 = QtWidgets.QWidget()
+        self.window.tab3 = QtWidgets.QWidget()
+        self.window.tab4 = QtWidgets.QWidget()
+
+        self.window.setStyleSheet('QTabWidget {background-color: #212121; font: 14px "Discreet"}'
+                                  'QTabWidget::tab-bar {alignment: center}'
+                                  'QTabBar::tab {color: #9a9a9a; background-color: #212121; border: 1px solid #3a3a3a; border-bottom-color: #555555; min-width: 20ex; padding: 5px}'
+                                  'QTabBar::tab:selected {color: #bababa; border: 1px solid #555555; border-bottom: 1px solid #212121}'
+                                  'QTabWidget::pane {border-top: 1px solid #555555; top: -0.05em}')
+
+        self.window.addTab(self.window.tab1, 'Python Scripts')
+        self.window.addTab(self.window.tab3, 'Matchbox')
+        self.window.addTab(self.window.tab4, 'Batch Setups')
+
+        self.python_scripts = self.python_scripts_tab()
+
+        # Matchbox and Batch Setups tabs are built the first time they're opened
+
+        self.built_tabs = [self.window.indexOf(self.window.tab1)]
+        self.window.currentChanged.connect(self.tab_changed)
+
+        #------------------------------------#
+
+        # Window Layout
+
+        self.vbox = QtWidgets.QVBoxLayout()
+        self.vbox.setMargin(15)
+
+        self.vbox.addLayout(self.window.tab1.layout)
+
+        self.window.setLayout(self.vbox)
+
+        self.window.show()
+
+        return self.window
+
+    def tab_changed(self, tab_index):
+
+        if tab_index in self.built_tabs:
+            return
+
+        self.built_tabs.append(tab_index)
+
+        if tab_index == self.window.indexOf(self.window.tab3):
+            self.matchbox = self.matchbox_tab()
+
+        elif tab_index == self.window.indexOf(self.window.tab4):
+            self.batch_setups = self.batch_setups_tab()
+            self.open_catalogs(['batch_setups'])
+
+    def python_scripts_tab(self):
+
+        # Tab 1
+
+        # Labels
+
+        self.installed_scripts_label = FlameLabel('Installed Scripts: /opt/Autodesk/shared/python', 'background', self.window.tab1)
+        self.portal_scripts_label = FlameLabel('Portal Scripts', 'background', self.window.tab1)
+        self.script_description_label = FlameLabel('Script Description', 'background', self.window.tab1)
+        self.portal_status_label = FlameLabel('Loading...', 'normal', self.window.tab1)
+
+        # Logos
+
+        self.logik_logo_label = QtWidgets.QLabel(self.window.tab1)
+        self.logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'logik_logo.png'))
+        self.logik_logo_label.setPixmap(self.logo_label_pixmap)
+
+        # Text Edit
+
+        self.script_description_text_edit = FlameTextEdit(self.file_description, True, self.window.tab1)
+
+        # Search LineEdit
+
+        self.portal_scripts_search_lineedit = FlameLineEdit('', self.window.tab1)
+        self.portal_scripts_search_lineedit.setPlaceholderText('Search')
+        self.portal_scripts_search_lineedit.setMinimumWidth(150)
+        self.portal_scripts_search_lineedit.textChanged.connect(self.search_portal_scripts)
+
+        # Installed Scripts TreeWidget
+
+        installed_tree_headers = ['Name', 'Version', 'Flame', 'Date', 'Developer', 'Path']
+        self.installed_scripts_tree = FlameTreeWidget(self.installed_script_description, self.script_description_text_edit, installed_tree_headers, self.window.tab1)
+
+        # Available Scripts TreeWidget
+
+        available_tree_headers = ['Name', 'Version', 'Flame', 'Date', 'Developer']
+        self.portal_scripts_tree = FlameTreeWidget(self.ftp_script_description, self.script_description_text_edit, available_tree_headers, self.window.tab1)
+
+        # Multiple portal scripts can be selected to install/update them all at once
+
+        self.portal_scripts_tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+
+        # Buttons
+
+        self.install_script_btn = FlameButton('Install', partial(self.install_script, self.portal_scripts_tree, self.installed_scripts_tree, self.shared_script_path), self.window.tab1)
+        self.delete_script_btn = FlameButton('Delete', partial(self.delete_script, self.installed_scripts_tree, self.shared_script_path), self.window.tab1)
+        self.script_done_btn = FlameButton('Done', self.done, self.window.tab1)
+
+        # Disable script download button if current flame version older than script minimum
+
+        self.portal_scripts_tree.clicked.connect(partial(self.check_script_flame_version, self.portal_scripts_tree))
+
+        # Contextual Menus
+
+        self.action_delete_script = QtWidgets.QAction('Delete Script', self.window.tab1)
+        self.action_delete_script.triggered.connect(partial(self.delete_script, self.installed_scripts_tree, self.shared_script_path))
+        self.installed_scripts_tree.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
+        self.installed_scripts_tree.addAction(self.action_delete_script)
+
+        self.action_install_script = QtWidgets.QAction('Install Script', self.window.tab1)
+        self.action_install_script.triggered.connect(partial(self.install_script, self.portal_scripts_tree, self.installed_scripts_tree, self.shared_script_path))
+        self.portal_scripts_tree.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
+        self.portal_scripts_tree.addAction(self.action_install_script)
+
+        #------------------------------------#
+
+        #  Tab layout
+
+        self.window.tab1.layout = QtWidgets.QGridLayout()
+        self.window.tab1.layout.setMargin(30)
+        self.window.tab1.layout.setVerticalSpacing(5)
+        self.window.tab1.layout.setHorizontalSpacing(5)
+
+        self.window.tab1.layout.addWidget(self.installed_scripts_label, 0, 0, 1, 5)
+        self.window.tab1.layout.addWidget(self.portal_scripts_label, 0, 7, 1, 3)
+        self.window.tab1.layout.addWidget(self.portal_scripts_search_lineedit, 0, 10, 1, 2)
+
+        self.window.tab1.layout.addWidget(self.installed_scripts_tree, 1, 0, 1, 5)
+        self.window.tab1.layout.addWidget(self.portal_scripts_tree, 1, 7, 1, 5)
+
+        self.window.tab1.layout.addWidget(self.delete_script_btn, 2, 4)
+        self.window.tab1.layout.addWidget(self.install_script_btn, 2, 11)
+
+        self.window.tab1.layout.addWidget(self.script_description_label, 4, 0, 1, 12)
+        self.window.tab1.layout.addWidget(self.script_description_text_edit, 5, 0, 1, 12)
+
+        self.window.tab1.layout.addWidget(self.logik_logo_label, 6, 0)
+        self.window.tab1.layout.addWidget(self.portal_status_label, 6, 1, 1, 10)
+        self.window.tab1.layout.addWidget(self.script_done_btn, 6, 11)
+
+        self.window.tab1.setLayout(self.window.tab1.layout)
+
+    def matchbox_tab(self):
+
+        def matchbox_browse_dir():
+
+            file_browser = QtWidgets.QFileDialog()
+            file_browser.setDirectory(self.matchbox_path_lineedit.text())
+            file_browser.setFileMode(QtWidgets.QFileDialog.DirectoryOnly)
+            if file_browser.exec_():
+                self.matchbox_path_lineedit.setText(str(file_browser.selectedFiles()[0]))
+
+        # Tab 3
+
+        # Labels
+
+        self.matchbox_install_logik_label = FlameLabel('Install Logik Matchboxes', 'background', self.window.tab3)
+        self.matchbox_install_label = FlameLabel('Install Path', 'normal', self.window.tab3)
+
+        # Logos
+
+        self.logik_logo_label = QtWidgets.QLabel(self.window.tab3)
+        self.logik_logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'logik_logo.png'))
+        self.logik_logo_label.setPixmap(self.logo_label_pixmap)
+
+        self.croc_logo_label = QtWidgets.QLabel(self.window.tab3)
+        self.croc_logo_label_pixmap = QtGui.QPixmap(os.path.join(SCRIPT_PATH, 'croc_logo.png'))
+        self.croc_logo_label.setPixmap(self.croc_logo_label_pixmap)
+        self.croc_logo_label.setAlignment(QtCore.Qt.AlignCenter)
+
+        # LineEdits
+
+        self.matchbox_path_lineedit = FlameClickableLineEdit(self.matchbox_path, self.window.tab3)
+        self.matchbox_path_lineedit.clicked.connect(matchbox_browse_dir)
+
+        # Buttons
+
+        self.matchbox_download_btn = FlameButton('Download', self.check_matchbox_download_path, self.window.tab3)
+        self.matchbox_done_btn = FlameButton('Done', self.done, self.window.tab3)
+
+        # Layout
+
+        self.window.tab3.layout = QtWidgets.QGridLayout()
+        self.window.tab3.layout.setMargin(30)
+        self.window.tab3.layout.setVerticalSpacing(5)
+        self.window.tab3.layout.setHorizontalSpacing(5)
+        self.window.tab3.layout.setColumnStretch(1, 110)
+
+        self.window.tab3.layout.addWidget(self.matchbox_install_logik_label, 0, 0, 1, 5)
+
+        self.window.tab3.layout.addWidget(self.matchbox_install_label, 1, 0)
+        self.window.tab3.layout.addWidget(self.matchbox_path_lineedit, 1, 1, 1, 3)
+        self.window.tab3.layout.addWidget(self.matchbox_download_btn, 1, 4)
+
+        self.window.tab3.layout.addWidget(self.croc_logo_label, 2, 1)
+
+        self.window.tab3.layout.addWidget(self.logik_logo_label, 4, 0)
+        self.window.tab3.layout.addWidget(self.matchbox_done_btn, 4, 4)
+
+        self.window.tab3.setLayout(self.window.tab3.layout)
+
+    def batch_setups_tab(self):
+
+        def batch_setups_download():
+
+            def save_config():
+
+                # Save path to config file
 
                 edit_config = open(self.config_file, 'r')
                 contents = edit_config.readlines()
                 edit_config.close
 
                 contents[4] = self.batch_setup_download_path + '\n'
-                contents[10] = str(self.open_batch_btn.isChecked())
+                contents[10] = str(self.open_batch_btn.isChecked()) + '\n'
 
                 edit_config = open(self.config_file, 'w')
                 contents = ''.join(contents)
@@ -715,41 +1663,44 @@ class LogikPortal(object):
                                 shutil.rmtree(path_to_delete)
                         print ('\n')
 
-                # Connect to ftp
-
-                self.ftp_download_connect()
+                # Get batch tgz file from batch setup cache or download it, then uncompress it into download path
 
-                # Download dest path
+                batch_record = self.batch_setup_catalog.get(batch_name.replace(' ', '_'), {})
+                batch_ftp_path = os.path.join('/Batch_Setups', batch_item.text(1), batch_name + '.tgz')
+                batch_flame_version = batch_item.text(1)
+                batch_download_path = self.batch_setup_download_path
 
-                tgz_path = os.path.join(self.batch_setup_download_path, batch_name + '.tgz')
-                print ('tgz_path:', tgz_path)
+                def download_batch(progress):
 
-                # Download batch tgz file
+                    tgz_path = self.fetch_batch_setup(batch_ftp_path, batch_name, batch_flame_version, batch_record, progress)
 
-                self.ftp.retrbinary('RETR ' + os.path.join('/Batch_Setups', batch_item.text(1), batch_name + '.tgz'), open(tgz_path, 'wb').write)
+                    with open(tgz_path, 'rb') as tgz_file:
+                        extract_tgz(tgz_file, batch_download_path)
 
-                # Uncompress tgz file
+                def batch_downloaded(result):
 
-                tgz_escaped_path = tgz_path.replace(' ', '\ ')
-                download_escaped_path = self.batch_setup_download_path.replace(' ', '\ ')
+                    QtWidgets.QApplication.restoreOverrideCursor()
+                    self.batch_setups_download_btn.setEnabled(True)
 
-                tar_command = 'tar -xvf %s -C %s' % (tgz_escaped_path, download_escaped_path + '/')
-                print ('tar_command:', tar_command)
+                    if self.open_batch_btn.isChecked():
+                        open_batch()
 
-                os.system(tar_command)
+                    message_box('%s downloaded' % batch_name)
 
-                # Delete tgz file
+                def batch_download_failed(error):
 
-                os.remove(tgz_path)
+                    QtWidgets.QApplication.restoreOverrideCursor()
+                    self.batch_setups_download_btn.setEnabled(True)
+                    self.batch_setups_progress_label.setText('')
 
-                # Disconnect ftp
+                    print ('error:', error)
 
-                self.ftp.quit()
+                    message_box('<center>%s download failed<br><br>Download again to resume' % batch_name)
 
-                if self.open_batch_btn.isChecked():
-                    open_batch()
+                QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
+                self.batch_setups_download_btn.setEnabled(False)
 
-                message_box('%s downloaded' % batch_name)
+                self.start_task(download_batch, batch_downloaded, batch_download_failed, self.batch_setups_progress_label.setText)
 
         def submit_batch_setup():
             from PySide2 import QtCore, QtWidgets
@@ -784,18 +1735,17 @@ class LogikPortal(object):
                     edit_config.write(contents)
                     edit_config.close()
 
-                def compress_batch_setup():
+                def get_batch_files():
 
-                    # Add batch files to tar file
+                    # Get batch folder and .batch file to add to tar, names in tar are relative to folder holding the batch
 
                     batch_folder_path = self.submit_batch_path_lineedit.text()[:-6]
                     print ('batch_folder_path:', batch_folder_path)
 
-                    batch_root_folder = batch_folder_path.rsplit('/', 1)[0]
                     batch_folder = batch_folder_path.rsplit('/', 1)[1]
 
-                    tar_file_list = batch_folder + ' ' + batch_folder + '.batch'
-                    print ('tar_file_list:', tar_file_list)
+                    self.batch_tar_files = [(batch_folder_path, batch_folder), (batch_folder_path + '.batch', batch_folder + '.batch')]
+                    print ('batch_tar_files:', self.batch_tar_files)
 
                     if batch_folder_path.endswith('.flare'):
                         self.tar_file_name = batch_folder_path.rsplit('/', 1)[1][:-6]
@@ -803,24 +1753,13 @@ class LogikPortal(object):
                         self.tar_file_name = batch_folder_path.rsplit('/', 1)[1]
                     print ('tar_file_name:', self.tar_file_name)
 
-                    self.tar_path = os.path.join(self.temp_folder, self.tar_file_name) + '.tgz'
-                    print ('tar_path:', self.tar_path)
-
-                    tar_command = 'tar -cvf %s  %s' % (self.tar_path, tar_file_list)
-                    print ('tar_command:', tar_command)
-
-                    os.chdir(batch_root_folder)
-                    os.system(tar_command)
-
-                    print ('\n>>> batch tar file created <<<\n')
-
-                def create_batch_xml_file():
+                def create_batch_xml():
 
                     description_text = self.submit_batch_description_text_edit.toPlainText()
                     description_text = description_text.replace("'", "\"")
                     description_text = description_text.replace('&', '-')
 
-                    # Create batch info file
+                    # Create batch info
 
                     text = []
 
@@ -830,69 +1769,51 @@ class LogikPortal(object):
                     text.insert(3, "        <description>'%s'</description>" % description_text)
                     text.insert(4, '    </batch>')
 
-                    out_file = open(xml_file, 'w')
-                    for line in text:
-                        print(line, file=out_file)
-                    out_file.close()
+                    return ('\n'.join(text) + '\n').encode('utf-8')
 
                 def upload_batch():
 
                     QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
 
-                    self.ftp_upload_connect()
-
-                    # Check to see if file already exists on ftp
-
-                    ftp_file_list = self.ftp.nlst('/Submit/Batch_Setups')
+                    with self.ftp_pool.session('upload') as ftp:
 
-                    if self.tar_file_name + '.tgz' in ftp_file_list:
-                        QtWidgets.QApplication.restoreOverrideCursor()
-                        self.ftp.quit()
-                        return message_box('Batch setup already exists. Rename and try again.')
+                        # Check to see if file already exists on ftp
 
-                    print ('\nuploading...\n')
+                        ftp_file_list = ftp.nlst('/Submit/Batch_Setups')
 
-                    # Upload tar to ftp
+                        if self.tar_file_name + '.tgz' in ftp_file_list:
+                            QtWidgets.QApplication.restoreOverrideCursor()
+                            return message_box('Batch setup already exists. Rename and try again.')
 
-                    tar_ftp_path = os.path.join('/Submit/Batch_Setups', self.tar_file_name) + '.tgz'
+                        print ('\nuploading...\n')
 
-                    with open(self.tar_path, 'rb') as ftpup:
-                        self.ftp.storbinary('STOR ' + tar_ftp_path, ftpup)
+                        # Compress batch setup straight into upload
 
-                    # Delete local tar file
+                        tar_ftp_path = os.path.join('/Submit/Batch_Setups', self.tar_file_name) + '.tgz'
 
-                    os.remove(self.tar_path)
+                        upload_tgz(ftp, tar_ftp_path, self.batch_tar_files)
 
-                    # Upload batch xml file
+                        # Upload batch xml
 
-                    batch_xml_ftp_path = os.path.join('/Submit/Batch_Setups', self.tar_file_name) + '.xml'
+                        batch_xml_ftp_path = os.path.join('/Submit/Batch_Setups', self.tar_file_name) + '.xml'
 
-                    with open(xml_file, 'rb') as ftpup:
-                        self.ftp.storbinary('STOR ' + batch_xml_ftp_path, ftpup)
+                        ftp.storbinary('STOR ' + batch_xml_ftp_path, io.BytesIO(batch_xml))
 
-                    QtWidgets.QApplication.restoreOverrideCursor()
+                        QtWidgets.QApplication.restoreOverrideCursor()
 
-                    # Check that both files were uploaded to site
+                        # Check that both files were uploaded to site
 
-                    ftp_file_list = self.ftp.nlst('/Submit/Batch_Setups')
+                        ftp_file_list = ftp.nlst('/Submit/Batch_Setups')
 
-                    if self.tar_file_name + '.tgz' and self.tar_file_name + '.xml' not in ftp_file_list:
-                        QtWidgets.QApplication.restoreOverrideCursor()
-                        self.ftp.quit()
-                        return message_box('Upload failed. Try again.')
+                        if self.tar_file_name + '.tgz' not in ftp_file_list or self.tar_file_name + '.xml' not in ftp_file_list:
+                            return message_box('Upload failed. Try again.')
 
                     print ('\n>>> upload done <<<\n')
 
-                    os.remove(xml_file)
-
                     # Close window
 
                     self.submit_batch_window.close()
 
-                    # Close ftp connection
-
-                    self.ftp.quit()
-
                     # Confirm file uploaded
 
                     return message_box('<center>Batch setup uploaded!<br>It will be added to the Logik Portal shortly</center>')
@@ -905,9 +1826,8 @@ class LogikPortal(object):
                     return message_box('Enter batch setup description')
                 else:
                     save_config()
-                    compress_batch_setup()
-                    xml_file = os.path.join(SCRIPT_PATH, '%s.xml' % self.tar_file_name)
-                    create_batch_xml_file()
+                    get_batch_files()
+                    batch_xml = create_batch_xml()
                     upload_batch()
 
             flame_version = str(self.flame_version)
@@ -1016,6 +1936,13 @@ class LogikPortal(object):
 
         self.batch_setups_text_edit = FlameTextEdit(self.file_description, True, self.window.tab4)
 
+        # Search LineEdit
+
+        self.batch_setups_search_lineedit = FlameLineEdit('', self.window.tab4)
+        self.batch_setups_search_lineedit.setPlaceholderText('Search')
+        self.batch_setups_search_lineedit.setMinimumWidth(150)
+        self.batch_setups_search_lineedit.textChanged.connect(self.search_batch_setups)
+
         # Batch Setups TreeWidget
 
         logik_batch_setups_tree_headers = ['Name', 'Flame', 'Artist']
@@ -1035,6 +1962,10 @@ class LogikPortal(object):
         self.open_batch_btn = FlamePushButton(' Open Batch', self.open_batch, self.window)
         self.open_batch_btn.setToolTip('Opens batch setup after download is finished')
 
+        # Download progress
+
+        self.batch_setups_progress_label = FlameLabel('', 'normal', self.window.tab4)
+
         # Buttons
 
         self.batch_setups_submit_btn = FlameButton('Submit', submit_batch_setup, self.window.tab4)
@@ -1057,7 +1988,8 @@ class LogikPortal(object):
         self.window.tab4.layout.setVerticalSpacing(5)
         self.window.tab4.layout.setHorizontalSpacing(5)
 
-        self.window.tab4.layout.addWidget(self.batch_setups_label, 0, 0, 1, 5)
+        self.window.tab4.layout.addWidget(self.batch_setups_label, 0, 0, 1, 3)
+        self.window.tab4.layout.addWidget(self.batch_setups_search_lineedit, 0, 3, 1, 2)
 
         self.window.tab4.layout.addWidget(self.batch_setups_tree, 1, 0, 1, 5)
 
@@ -1065,6 +1997,7 @@ class LogikPortal(object):
         self.window.tab4.layout.addWidget(self.batch_setups_download_btn, 2, 4)
 
         self.window.tab4.layout.addWidget(self.open_batch_btn, 2, 0)
+        self.window.tab4.layout.addWidget(self.batch_setups_progress_label, 2, 1, 1, 2)
 
         self.window.tab4.layout.addWidget(self.batch_setups_desciption_label, 4, 0, 1, 5)
         self.window.tab4.layout.addWidget(self.batch_setups_text_edit, 5, 0, 1, 5)
@@ -1200,9 +2133,6 @@ class LogikPortal(object):
             self.download_logik_matchboxes()
 
     def download_logik_matchboxes(self):
-        from subprocess import Popen, PIPE
-        import urllib
-        import time
 
         print ('\ndownloading Logik Matchboxes...\n')
 
@@ -1210,38 +2140,115 @@ class LogikPortal(object):
 
         QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
 
-        # Download Logik Matchboxes
+        def matchboxes_installed(result):
 
-        tar_path = '/opt/Autodesk/shared/python/logik_portal/MatchboxShaderCollection.tgz'
-        print ('tar_path', tar_path)
+            QtWidgets.QApplication.restoreOverrideCursor()
 
-        urllib.request.urlretrieve('https://logik-matchbook.org/MatchboxShaderCollection.tgz', tar_path)
+            written, unchanged = result
 
-        command = 'tar -xvpzf /opt/Autodesk/shared/python/logik_portal/MatchboxShaderCollection.tgz --strip-components 1 -C %s' % self.matchbox_install_path
-        command = command.split(' ', 6)
+            message_box('<center>Logik Matchboxes installed<br><br>%s files updated, %s unchanged' % (written, unchanged))
 
-        if not self.folder_write_permission:
+        def matchboxes_failed(error):
 
-            # Sudo untar
+            QtWidgets.QApplication.restoreOverrideCursor()
 
-            p = Popen(['sudo', '-S'] + command, stdin=PIPE, stderr=PIPE, universal_newlines=True)
-            p.communicate(self.sudo_password + '\n')[1]
+            print ('error:', error)
 
-        else:
+            message_box('Install Failed')
 
-            # Normal untar
+        self.start_task(self.install_logik_matchboxes, matchboxes_installed, matchboxes_failed)
 
-            Popen(command, stdin=PIPE, stderr=PIPE, universal_newlines=True)
+    def install_logik_matchboxes(self):
+        from subprocess import Popen, PIPE
+        from urllib.request import urlopen
+        import tempfile
 
-        time.sleep(5)
+        # Unpack Matchbox collection as it downloads, only writing files that changed since the last install
+        # Manifest of installed files is kept per install path in the cache folder
+        # If install path isn't writable, changed files are collected in a staging folder and copied with sudo
+        # Runs on a worker thread, returns number of files written and unchanged
 
-        QtWidgets.QApplication.restoreOverrideCursor()
+        install_path = self.matchbox_install_path
+        manifest_path = os.path.join(self.cache_folder, 'matchbox_manifest.json')
 
-        if os.listdir(self.matchbox_install_path) != []:
-            os.remove(tar_path)
-            message_box('Logik Matchboxes installed')
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                manifests = json.load(manifest_file)
+        except (IOError, ValueError):
+            manifests = {}
+
+        installed_manifest = manifests.get(install_path, {})
+        manifest = {}
+        written = 0
+        unchanged = 0
+
+        if self.folder_write_permission:
+            write_path = install_path
         else:
-            message_box('Install Failed')
+            write_path = tempfile.mkdtemp(dir=self.temp_folder)
+
+        try:
+            response = urlopen('https://logik-matchbook.org/MatchboxShaderCollection.tgz', timeout=60)
+
+            with tarfile.open(fileobj=response, mode='r|gz') as tgz:
+                for member in tgz:
+
+                    # Strip top folder of collection
+
+                    if not member.isfile() or '/' not in member.name.strip('/'):
+                        continue
+
+                    file_name = member.name.strip('/').split('/', 1)[1]
+                    install_file_path = tgz_member_path(install_path, file_name)
+
+                    content = tgz.extractfile(member).read()
+                    manifest[file_name] = [hashlib.sha256(content).hexdigest(), len(content)]
+
+                    if installed_manifest.get(file_name) == manifest[file_name] and os.path.isfile(install_file_path) and os.path.getsize(install_file_path) == len(content):
+                        unchanged += 1
+                        continue
+
+                    # Write to temp file and move into place so Flame never sees a half written shader
+
+                    write_file_path = tgz_member_path(write_path, file_name)
+
+                    if not os.path.isdir(os.path.dirname(write_file_path)):
+                        os.makedirs(os.path.dirname(write_file_path))
+
+                    with open(write_file_path + '.part', 'wb') as write_file:
+                        write_file.write(content)
+                    os.chmod(write_file_path + '.part', member.mode)
+                    os.rename(write_file_path + '.part', write_file_path)
+
+                    written += 1
+
+            response.close()
+
+            if not manifest:
+                raise IOError('No matchboxes found in download')
+
+            # Sudo copy changed files into place and wait for copy to finish
+
+            if write_path != install_path and written:
+                p = Popen(['sudo', '-S', 'cp', '-Rp', write_path + '/.', install_path], stdin=PIPE, stderr=PIPE, universal_newlines=True)
+                error = p.communicate(self.sudo_password + '\n')[1]
+                if p.returncode:
+                    raise IOError(error)
+
+        finally:
+            if write_path != install_path:
+                shutil.rmtree(write_path, ignore_errors=True)
+
+        # Save manifest for next install
+
+        manifests[install_path] = manifest
+
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump(manifests, manifest_file)
+
+        print ('\n>>> matchboxes installed: %s updated, %s unchanged <<<\n' % (written, unchanged))
+
+        return written, unchanged
 
     # ----------------------------------------------------------------- #
 
@@ -1333,121 +2340,27 @@ class LogikPortal(object):
         script_item = selected_script[0]
         script_path = script_item.text(5)
 
-        with open(script_path, 'r') as script:
-            script_lines = script.read()
+        text_edit.setPlainText(self.script_index.get(script_path)['description'])
 
-        try:
-            file_description = script_lines.split("'''", 1)[1]
-            file_description = file_description.split("'''", 1)[0]
-            file_description = file_description.strip()
-        except:
-            file_description = ''
+    def get_installed_scripts(self, tree, scripts_root_path, installed_scripts=None):
+        from PySide2 import QtWidgets, QtCore
 
-        text_edit.setPlainText(file_description)
+        # Scan for installed scripts unless scan was already done on a worker thread
 
-    def get_installed_scripts(self, tree, scripts_root_path):
-        from PySide2 import QtWidgets, QtCore
+        if installed_scripts is None:
+            installed_scripts = self.scan_installed_scripts(scripts_root_path)
 
         # Clear tree list
 
         tree.clear()
 
-        # print ('scripts_root_path:', scripts_root_path, flush=True)
-
-        for root, dirs, files in os.walk(scripts_root_path, followlinks=True):
-            for script in files:
-                if script.endswith('.py'):
-
-                    # Get script name from .py file name
-
-                    script_name = script[:-3]
-                    script_name = script_name.replace('_', ' ')
-                    print ('script_name:', script_name)
-
-                    script_path = os.path.join(root, script)
-                    print ('script_path:', script_path)
-
-                    # Read in script to separate out comments
-
-                    script_code = open(script_path, 'r')
-                    script_lines = script_code.read().splitlines()[1:]
-                    script_code.close()
-
-                    # Split out script info to comment list
-
-                    comment_lines = []
-
-                    for line in script_lines:
-                        if line != '':
-                            comment_lines.append(line)
-                        else:
-                            break
-
-                    # Get script info from comment list
-
-                    try:
-                        script_version = [line.split('Script Version: ', 1)[1] for line in comment_lines if 'Script Version: ' in line]
-                        if script_version:
-                            script_version = script_version[0]
-                        else:
-                            script_version = [line.split("'", 2)[1] for line in script_lines if 'VERSION = ' in line] # For old scripts
-                            if script_version:
-                                script_version = script_version[0]
-                                if 'v' in script_version:
-                                    script_version = script_version[1:]
-                            else:
-                                script_version = ''
-                    except:
-                        script_version = ''
-                    print ('script_version:', script_version)
-
-                    try:
-                        script_date = [line.split('Update Date: ', 1)[1] for line in comment_lines if 'Update Date: ' in line]
-                        if script_date:
-                            script_date = script_date[0]
-                        else:
-                            script_date = [line.split(' ', 1)[1] for line in comment_lines if 'Updated:' in line] # For old scripts
-                            if script_date:
-                                script_date = script_date[0]
-                            else:
-                                script_date = ''
-                    except:
-                        script_date = ''
-                    print ('script_date:', script_date)
-
-                    try:
-                        script_dev = [line.split('Written by: ', 1)[1] for line in comment_lines if 'Written by' in line]
-                        if script_dev:
-                            script_dev = script_dev[0]
-                        else:
-                            script_dev = [line.split('Created by ', 1)[1] for line in comment_lines if 'Created by' in line] # For old scripts
-                            if script_dev:
-                                script_dev = script_dev[0]
-                            else:
-                                script_dev = ''
-                    except:
-                        script_dev = ''
-                    print ('script_dev:', script_dev)
-
-                    try:
-                        script_flame_version = [line.split('Flame Version: ', 1)[1] for line in comment_lines if 'Flame Version: ' in line]
-                        if script_flame_version:
-                            script_flame_version = script_flame_version[0].split(' ', 1)[0]
-                        else:
-                            script_flame_version = [line.split(' ', 1)[1] for line in comment_lines if 'Flame 20' in line] # For old scripts
-                            if script_flame_version:
-                                script_flame_version = script_flame_version[0].split(' ', 1)[0]
-                            else:
-                                script_flame_version = ''
-                    except:
-                        script_version = ''
-                    print ('script_min_flame_version:', script_flame_version)
-
-                    # Add script to tree
-
-                    QtWidgets.QTreeWidgetItem(tree, [script_name, script_version, script_flame_version, script_date, script_dev, script_path])
-
-                    self.installed_script_dict.update({script_name : script_version})
+        for script_name, script_version, script_flame_version, script_date, script_dev, script_path in installed_scripts:
+
+            # Add script to tree
+
+            QtWidgets.QTreeWidgetItem(tree, [script_name, script_version, script_flame_version, script_date, script_dev, script_path])
+
+            self.installed_script_dict.update({script_name : script_version})
 
         # Set width of tree headers
 
@@ -1467,6 +2380,49 @@ class LogikPortal(object):
 
         tree.setCurrentItem(tree.topLevelItem(0))
 
+    def scan_installed_scripts(self, scripts_root_path):
+
+        # Read script info from headers of all installed scripts
+        # Doesn't touch any widgets so it can be run on a worker thread
+
+        installed_scripts = []
+
+        with self.timer.span('installed script scan', path=scripts_root_path) as details:
+            for root, dirs, files in os.walk(scripts_root_path, followlinks=True):
+                for script in files:
+                    if script.endswith('.py'):
+
+                        # Get script name from .py file name
+
+                        script_name = script[:-3]
+                        script_name = script_name.replace('_', ' ')
+                        print ('script_name:', script_name)
+
+                        script_path = os.path.join(root, script)
+                        print ('script_path:', script_path)
+
+                        # Header info comes from script index, only new or changed scripts are read
+
+                        script_header = self.script_index.get(script_path)
+
+                        script_version = script_header['version']
+                        script_flame_version = script_header['flame_version']
+                        script_date = script_header['date']
+                        script_dev = script_header['dev']
+
+                        print ('script_version:', script_version)
+                        print ('script_min_flame_version:', script_flame_version)
+
+                        installed_scripts.append((script_name, script_version, script_flame_version, script_date, script_dev, script_path))
+
+            details['scripts'] = len(installed_scripts)
+
+        # Save index so next scan only has to stat unchanged scripts
+
+        self.script_index.save([script[5] for script in installed_scripts])
+
+        return installed_scripts
+
     def delete_script(self, tree, root_script_path):
         import shutil
 
@@ -1505,94 +2461,284 @@ class LogikPortal(object):
                 except:
                     pass
 
-            print ('\n>>> DELETED: %s <<<\n' % script_name)
+            print ('\n>>> DELETED: %s <<<\n' % script_name)
+
+            # Update list of installed scripts
+
+            self.get_installed_scripts(tree, root_script_path)
+
+    def install_script(self, portal_tree, installed_tree, script_path):
+        from PySide2 import QtGui
+        import flame
+
+        print ('\n>>> downloading scripts <<<\n')
+
+        # Get selected script info from selection
+
+        selected_scripts = []
+
+        for script_item in portal_tree.selectedItems():
+            script_name = script_item.text(0).strip()
+            script_name = script_name.replace(' ', '_')
+            script_flame_version = script_item.text(2)
+            selected_scripts.append((script_item, script_name, script_flame_version))
+
+            print ('script_name:', script_name)
+            print ('script_flame_version:', script_flame_version)
+
+        if not selected_scripts:
+            return
+
+        # Confirm overwrite of scripts that are already installed
+        # If not overwriting, only scripts that aren't installed yet are installed
+
+        existing_scripts = [script for script in selected_scripts if os.path.isdir(os.path.join(script_path, script[1]))]
+
+        if existing_scripts:
+            if len(selected_scripts) == 1:
+                overwrite_script = message_box_confirm('Script already exists. Overwrite?')
+            else:
+                overwrite_script = message_box_confirm('Scripts already exist. Overwrite?<br><br>%s' % '<br>'.join(script[1].replace('_', ' ') for script in existing_scripts))
+
+            if not overwrite_script:
+                selected_scripts = [script for script in selected_scripts if script not in existing_scripts]
+
+        if not selected_scripts:
+            print ('\n>>> script not installed <<<\n')
+            return
+
+        def download_scripts():
+
+            # Download scripts side by side, one pooled portal session per download
+
+            with ThreadPoolExecutor(max_workers=self.ftp_pool.max_sessions) as executor:
+                return list(executor.map(lambda script: self.download_script(script[1], script[2], script_path), selected_scripts))
+
+        def scripts_downloaded(results):
+
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+            # Refresh installed scripts tree list once for all scripts
+
+            self.get_installed_scripts(installed_tree, script_path)
+
+            # Set color of installed scripts in portal tree to normal color
+
+            for (script_item, script_name, script_flame_version), installed in zip(selected_scripts, results):
+                if installed:
+                    script_item.setForeground(0, QtGui.QColor('#9a9a9a'))
+
+            # Refresh python hooks
+
+            flame.execute_shortcut('Rescan Python Hooks')
+            print ('\n>>> python hooks refreshed <<<\n')
+
+            failed_scripts = [script[1].replace('_', ' ') for script, installed in zip(selected_scripts, results) if not installed]
+
+            if len(selected_scripts) == 1:
+                if failed_scripts:
+                    return message_box('download failed')
+                return message_box('%s script installed' % selected_scripts[0][1].replace('_', ' '))
+            if failed_scripts:
+                return message_box('<center>%s of %s scripts installed<br><br>Download failed:<br>%s' % (len(selected_scripts) - len(failed_scripts), len(selected_scripts), '<br>'.join(failed_scripts)))
+            return message_box('%s scripts installed' % len(selected_scripts))
+
+        def scripts_failed(error):
+
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+            print ('error:', error)
+
+            message_box('download failed')
+
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
+
+        self.start_task(download_scripts, scripts_downloaded, scripts_failed)
+
+    def download_script(self, script_name, script_flame_version, script_path):
+
+        # Download and unpack a single script from the portal
+        # Runs on a worker thread, returns True if script was installed
+
+        # Set source and destination paths
+
+        source_script_path = os.path.join('/Scripts', script_flame_version, script_name) + '.tgz'
+        print ('source_script_path: ', source_script_path)
+
+        dest_folder = os.path.join(script_path, script_name)
+        print ('dest_folder:', dest_folder)
+
+        try:
+
+            # Replace existing script folder
+
+            if os.path.isdir(dest_folder):
+                shutil.rmtree(dest_folder)
+
+            os.makedirs(dest_folder)
+
+            # Download script tgz file and uncompress it as it arrives
+
+            self.download_tgz(source_script_path, dest_folder)
+
+        except all_errors + (tarfile.TarError,) as e:
+            print ('\n>>> %s download failed: %s <<<\n' % (script_name, e))
+            shutil.rmtree(dest_folder, ignore_errors=True)
+            return False
+
+        return os.path.isfile(os.path.join(dest_folder, script_name + '.py'))
+
+    def fetch_batch_setup(self, ftp_path, batch_name, batch_flame_version, batch_record, progress=None):
+
+        # Returns path of batch tgz in batch setup cache, downloading it first if it isn't cached
+        # Cache entry is found by catalog sha256 when there is one, so cache hits don't touch the portal
+        # Otherwise entry is found by flame version and size/modification time of tgz on portal
+
+        if batch_record.get('sha256'):
+            cache_path = self.batch_setup_cache.entry_path(batch_name, batch_record['sha256'])
+        else:
+            def portal_stamp(ftp):
+                ftp.voidcmd('TYPE I')
+                return ftp.size(ftp_path), ftp.sendcmd('MDTM ' + ftp_path).split(' ', 1)[1]
+
+            batch_size, batch_mtime = self.ftp_pool.run('download', portal_stamp)
+            batch_record = dict(batch_record, size=batch_size)
+            cache_path = self.batch_setup_cache.entry_path(batch_name, batch_flame_version, batch_size, batch_mtime)
+
+        if self.batch_setup_cache.get(cache_path):
+            print ('>>> %s found in batch setup cache <<<' % batch_name)
+            if progress:
+                progress('Installing from batch setup cache')
+            return cache_path
+
+        partial_path = self.batch_setup_cache.partial_path(cache_path)
 
-            # Update list of installed scripts
+        self.download_file(ftp_path, cache_path, batch_record.get('size'), batch_record.get('sha256'), progress, partial_path=partial_path)
 
-            self.get_installed_scripts(tree, root_script_path)
+        self.batch_setup_cache.evict(cache_path)
 
-    def install_script(self, portal_tree, installed_tree, script_path):
-        from PySide2 import QtGui
-        import shutil
-        import flame
+        return cache_path
 
-        print ('\n>>> downloading script <<<\n')
+    def download_tgz(self, ftp_path, dest_folder):
 
-        self.ftp_download_connect()
+        # Stream tgz from the portal data connection straight into tar extraction
+        # Nothing but the unpacked files is written to disk
 
-        # Get selected script info from selection
+        def stream_tgz(ftp):
 
-        selected_script = portal_tree.selectedItems()
-        script_item = selected_script[0]
-        script_name = script_item.text(0).strip()
-        script_name = script_name.replace(' ', '_')
-        script_flame_version = script_item.text(2)
+            ftp.voidcmd('TYPE I')
+            conn = ftp.transfercmd('RETR ' + ftp_path)
 
-        print ('script_name:', script_name)
-        print ('script_flame_version:', script_flame_version)
+            try:
+                with conn.makefile('rb') as tgz_file:
+                    extract_tgz(tgz_file, dest_folder)
 
-        # Set source and destination paths
+                    # Read past end of archive padding so the transfer completes
 
-        source_script_path = os.path.join('/Scripts', script_flame_version, script_name) + '.tgz'
-        print ('source_script_path: ', source_script_path)
+                    while tgz_file.read(65536):
+                        pass
+            except:
 
-        dest_script_path = os.path.join(script_path, script_name, script_name) + '.tgz'
-        print ('dest_script_path: ', dest_script_path)
+                # Abandon transfer but read the server's reply so the session can be reused
 
-        dest_folder = dest_script_path.rsplit('/', 1)[0]
-        print ('dest_folder:', dest_folder)
+                conn.close()
+                try:
+                    ftp.voidresp()
+                except all_errors:
+                    pass
+                raise
 
-        if os.path.isdir(dest_folder):
-            overwrite_script = message_box_confirm('Script already exists. Overwrite?')
+            conn.close()
+            ftp.voidresp()
 
-            if not overwrite_script:
-                print ('\n>>> script not installed <<<\n')
-                return
-            else:
-                shutil.rmtree(dest_folder)
+        self.ftp_pool.run('download', stream_tgz)
 
-        # Create local folder for script
+    def download_file(self, ftp_path, local_path, expected_size=None, expected_hash=None, progress=None, retries=5, partial_path=None):
 
-        try:
-            os.makedirs(dest_folder)
-        except:
-            pass
+        # Download into partial_path, local_path.part by default, resuming with REST from what is already there if the connection drops
+        # File is only renamed to local_path once its size, and sha256 if given, check out
+        # partial_path must be on the same filesystem as local_path so the file appears there in one step
+        # progress is called with a status string as the download goes
+
+        if not partial_path:
+            partial_path = local_path + '.part'
+        report = {'time': 0}
+
+        def retrieve(ftp):
+
+            ftp.voidcmd('TYPE I')
+
+            total = expected_size
+            if total is None:
+                try:
+                    total = ftp.size(ftp_path)
+                except error_perm:
+                    total = None
 
-        # Download script tgz file
+            offset = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+            if total is not None and offset > total:
+                offset = 0
+            if total is not None and offset == total:
+                return total
 
-        self.ftp.retrbinary('RETR ' + source_script_path, open(dest_script_path, 'wb').write)
+            if offset:
+                print ('>>> resuming %s at %s bytes <<<' % (ftp_path, offset))
 
-        # Uncompress tgz file
+            received = {'bytes': offset, 'start_bytes': offset, 'start_time': time.time()}
 
-        tar_command = 'tar -xvf %s -C %s' % (dest_script_path, dest_folder)
-        print ('tar_command:', tar_command)
+            with open(partial_path, 'ab' if offset else 'wb') as partial_file:
 
-        os.system(tar_command)
+                def write(block):
 
-        # delete tgz file
+                    partial_file.write(block)
+                    received['bytes'] += len(block)
 
-        os.remove(dest_script_path)
+                    # Report speed and time left a few times a second
 
-        # Disconnect from ftp
+                    now = time.time()
+                    if progress and now - report['time'] >= 0.25:
+                        report['time'] = now
+                        rate = (received['bytes'] - received['start_bytes']) / max(now - received['start_time'], 0.001)
+                        progress(download_status(received['bytes'], total, rate))
 
-        self.ftp_disconnect()
+                ftp.retrbinary('RETR ' + ftp_path, write, rest=offset or None)
 
-        # Refresh installed scripts tree list
+            return total
 
-        self.get_installed_scripts(installed_tree, script_path)
+        for attempt in range(retries):
+            try:
+                with self.ftp_pool.session('download') as ftp:
+                    total = retrieve(ftp)
+                break
+            except all_errors as e:
+                if not (is_connection_error(e) or str(e).startswith('426')) or attempt == retries - 1:
+                    raise
+                print ('\n>>> download interrupted, resuming: %s <<<\n' % e)
+                time.sleep(1)
+
+        # Verify download
 
-        # Set color of selected script in portal tree to normal color
+        downloaded_size = os.path.getsize(partial_path)
 
-        script_item.setForeground(0, QtGui.QColor('#9a9a9a'))
+        if total is not None and downloaded_size != total:
+            os.remove(partial_path)
+            raise IOError('%s is %s bytes, expected %s' % (ftp_path, downloaded_size, total))
 
-        # Refresh python hooks
+        if expected_hash:
+            sha256 = hashlib.sha256()
+            with open(partial_path, 'rb') as partial_file:
+                for block in iter(partial(partial_file.read, 1024 * 1024), b''):
+                    sha256.update(block)
+            if sha256.hexdigest() != expected_hash.lower():
+                os.remove(partial_path)
+                raise IOError('%s failed sha256 check' % ftp_path)
 
-        flame.execute_shortcut('Rescan Python Hooks')
-        print ('\n>>> python hooks refreshed <<<\n')
+        os.replace(partial_path, local_path)
 
-        if os.path.isfile(dest_script_path[:-3] + 'py'):
-            return message_box('%s script installed' % script_name.replace('_', ' '))
-        return message_box('download failed')
+        if progress:
+            progress(download_status(downloaded_size, downloaded_size, None))
+
+        return local_path
 
     # ----------------------------------------------------------------- #
 
@@ -1601,21 +2747,26 @@ class LogikPortal(object):
         print ('\n>>> checking script version <<<\n')
 
         # Get selected script date
+        # Install is disabled if any selected script needs a newer version of flame
 
         selected_script = tree.selectedItems()
-        script_item = selected_script[0]
-        script_name = script_item.text(0)
-        script_flame_version = script_item.text(2)
+        if not selected_script:
+            return
 
         print ('current_flame_version:', self.flame_version)
-        print ('script_flame_version:', script_flame_version, '\n')
-        print (float(script_flame_version) > float(self.flame_version))
 
-        if float(script_flame_version) > float(self.flame_version):
-            print ('\n>>> %s requires newer version of flame <<<\n' % script_name)
-            self.install_script_btn.setEnabled(False)
-        else:
-            self.install_script_btn.setEnabled(True)
+        for script_item in selected_script:
+            script_name = script_item.text(0)
+            script_flame_version = script_item.text(2)
+
+            print ('script_flame_version:', script_flame_version, '\n')
+
+            if float(script_flame_version) > float(self.flame_version):
+                print ('\n>>> %s requires newer version of flame <<<\n' % script_name)
+                self.install_script_btn.setEnabled(False)
+                return
+
+        self.install_script_btn.setEnabled(True)
 
     def ftp_script_description(self, text_edit, tree, tree_index):
 
@@ -1626,76 +2777,103 @@ class LogikPortal(object):
         script_name = script.text(0)
         print ('script_name:', script_name, '\n')
 
-        # Add items from xml to batch list
+        # Get description from catalog loaded with script list
+
+        script_record = self.portal_script_catalog.get(script_name)
+
+        if script_record:
+            text_edit.setPlainText(script_record['description'])
+
+    def read_ftp_scripts(self):
+
+        # Read script entries from cached python scripts xml
+        # Doesn't touch any widgets so it can be run on a worker thread
 
-        xml_tree = ET.parse(self.python_scripts_xml_path)
+        ftp_scripts = []
+
+        with self.timer.span('xml parse', catalog='python_scripts'):
+            xml_tree = ET.parse(self.python_scripts_xml_path)
         root = xml_tree.getroot()
 
         for script in root.findall('script'):
-            if script.get('name') == script_name:
-                text_edit.setPlainText(script[-1].text[1:-1])
+            ftp_scripts.append({'name': str(script.get('name')),
+                                'version': str(script[0].text[1:-1]),
+                                'flame_version': str(script[1].text[1:-1]),
+                                'date': str(script[2].text[1:-1]),
+                                'developer': str(script[3].text[1:-1]),
+                                'description': str(script[-1].text[1:-1])})
 
-    def get_ftp_scripts(self, tree):
+        return ftp_scripts
 
-        print ('\n>>> downloading python script list <<<\n')
+    def set_ftp_script_color(self, script_item):
 
-        # Download xml to temp folder
+        script_name = script_item.text(0)
+        script_version = script_item.text(1)
+        flame_version = script_item.text(2)
 
-        self.python_scripts_xml_path = os.path.join(self.temp_folder, 'python_scripts.xml')
+        # If newer version of script exists on ftp, highlight script entry
 
-        self.ftp.retrbinary('RETR ' + '/Scripts/python_scripts.xml', open(self.python_scripts_xml_path, 'wb').write)
+        if script_name in self.installed_script_dict:
+            installed_script_version = self.installed_script_dict.get(script_name)
+            try:
+                if float(script_version) > float(installed_script_version):
+                    for column in range(5):
+                        script_item.setForeground(column, QtGui.QColor('#ffffff'))
+            except:
+                pass
 
-        # Add items from xml to scripts tree list
+        # if script requires newer version of flame grey out script entry
 
-        xml_tree = ET.parse(self.python_scripts_xml_path)
-        root = xml_tree.getroot()
+        if float(self.flame_version) < float(flame_version):
+            for column in range(5):
+                script_item.setForeground(column, QtGui.QColor('#555555'))
 
-        for script in root.findall('script'):
-            script_name = str(script.get('name'))
-            script_version = str(script[0].text[1:-1])
-            flame_version = str(script[1].text[1:-1])
-            date = str(script[2].text[1:-1])
-            developer_name = str(script[3].text[1:-1])
+    def get_ftp_scripts(self, tree, ftp_scripts=None, search_index=None):
 
-            print ('script_name:', script_name)
-            print ('script_version:', script_version)
-            print ('flame_version:', flame_version)
-            print ('date:', date)
-            print ('developer_name:', developer_name, '\n')
+        print ('\n>>> loading python script list <<<\n')
 
-            new_script = QtWidgets.QTreeWidgetItem(self.portal_scripts_tree, [script_name, script_version, flame_version, date, developer_name])
+        # Read catalog unless it was already read on a worker thread
 
-            # If newer version of script exists on ftp, highlight script entry
+        if ftp_scripts is None:
+            ftp_scripts = self.read_ftp_scripts()
+        if search_index is None:
+            search_index = CatalogSearchIndex(ftp_scripts, SCRIPT_SEARCH_FIELDS)
 
-            if script_name in self.installed_script_dict:
-                installed_script_version = self.installed_script_dict.get(script_name)
-                print ('installed_script_version:', installed_script_version)
-                try:
-                    if float(script_version) > float(installed_script_version):
-                        new_script.setForeground(0, QtGui.QColor('#ffffff'))
-                        new_script.setForeground(1, QtGui.QColor('#ffffff'))
-                        new_script.setForeground(2, QtGui.QColor('#ffffff'))
-                        new_script.setForeground(3, QtGui.QColor('#ffffff'))
-                        new_script.setForeground(4, QtGui.QColor('#ffffff'))
-                except:
-                    pass
+        # Clear tree list
+
+        tree.clear()
+        self.ftp_script_list = []
+
+        # Index catalog by script name so selections don't have to search the xml
 
-            # if script requires newer version of flame grey out script entry
+        self.portal_script_catalog = dict((script['name'], script) for script in ftp_scripts)
 
-            if float(self.flame_version) < float(flame_version):
-                new_script.setForeground(0, QtGui.QColor('#555555'))
-                new_script.setForeground(1, QtGui.QColor('#555555'))
-                new_script.setForeground(2, QtGui.QColor('#555555'))
-                new_script.setForeground(3, QtGui.QColor('#555555'))
-                new_script.setForeground(4, QtGui.QColor('#555555'))
+        # Add items from xml to scripts tree list
+
+        self.portal_script_items = []
+
+        for script in ftp_scripts:
+
+            new_script = QtWidgets.QTreeWidgetItem(self.portal_scripts_tree, [script['name'], script['version'], script['flame_version'], script['date'], script['developer']])
 
-            self.ftp_script_list.append(script_name)
+            self.set_ftp_script_color(new_script)
+
+            self.ftp_script_list.append(script['name'])
+            self.portal_script_items.append(new_script)
 
         print ('install_script_dict:', self.installed_script_dict, '\n')
         print ('ftp_script_list:', self.ftp_script_list)
 
+        # Reapply search to reloaded list
+
+        self.portal_script_search = search_index
+        self.search_portal_scripts(self.portal_scripts_search_lineedit.text())
+
         # Select top item in script setup list
 
+        if not tree.topLevelItemCount():
+            return
+
         tree.setCurrentItem(tree.topLevelItem(0))
 
         # Get selected script setup description
@@ -1713,6 +2891,27 @@ class LogikPortal(object):
         self.portal_scripts_tree.header().setSectionResizeMode(4, QtWidgets.QHeaderView.Fixed)
         self.portal_scripts_tree.setTextElideMode(QtCore.Qt.ElideNone)
 
+    def search_portal_scripts(self, search_text):
+
+        if self.portal_script_search:
+            self.filter_catalog_tree(self.portal_script_items, self.portal_script_search, search_text)
+
+    def search_batch_setups(self, search_text):
+
+        if self.batch_setup_search:
+            self.filter_catalog_tree(self.batch_setup_items, self.batch_setup_search, search_text)
+
+    def filter_catalog_tree(self, tree_items, search_index, search_text):
+
+        # Only show/hide items whose visibility changed since last keystroke
+
+        visible = search_index.search(search_text)
+
+        for entry_number in search_index.visible ^ visible:
+            tree_items[entry_number].setHidden(entry_number not in visible)
+
+        search_index.visible = visible
+
     # ----------------------------------------------------------------- #
 
     def check_batch_flame_version(self, tree, tree_index):
@@ -1722,6 +2921,8 @@ class LogikPortal(object):
         # Get selected script date
 
         selected_batch = tree.selectedItems()
+        if not selected_batch:
+            return
         batch_item = selected_batch[0]
         batch_name = batch_item.text(0)
         batch_flame_version = batch_item.text(1)
@@ -1742,50 +2943,87 @@ class LogikPortal(object):
         batch_name = batch_item.text(0)
         batch_name = batch_name.replace(' ', '_')
 
-        # Add items from xml to batch list
+        # Get description from catalog loaded with batch setup list
+
+        batch_record = self.batch_setup_catalog.get(batch_name)
+
+        if batch_record:
+            text_edit.setPlainText(batch_record['description'])
+
+    def read_batch_setups(self):
+
+        # Read batch setup entries from cached batch setups xml
+        # Doesn't touch any widgets so it can be run on a worker thread
 
-        xml_tree = ET.parse(self.batch_setups_xml_path)
+        batch_setups = []
+
+        with self.timer.span('xml parse', catalog='batch_setups'):
+            xml_tree = ET.parse(self.batch_setups_xml_path)
         root = xml_tree.getroot()
 
         for batch in root.findall('batch'):
-            if batch.get('name') == batch_name:
-                text_edit.setPlainText(batch[2].text[1:-1])
+            batch_setups.append({'name': str(batch.get('name')),
+                                 'artist': str(batch[0].text[1:-1]),
+                                 'flame_version': str(batch[1].text[1:-1]),
+                                 'description': str(batch[2].text[1:-1]),
+                                 'size': None,
+                                 'sha256': None})
+
+            # Size and hash of batch tgz are used to verify downloads when the catalog has them
+
+            if batch.findtext('size'):
+                batch_setups[-1]['size'] = int(batch.findtext('size').strip("' "))
+            if batch.findtext('sha256'):
+                batch_setups[-1]['sha256'] = batch.findtext('sha256').strip("' ")
+
+        return batch_setups
 
-    def get_batch_setups(self, tree):
+    def get_batch_setups(self, tree, batch_setups=None, search_index=None):
 
-        print ('\n>>> downloading batch setups list <<<\n')
+        print ('\n>>> loading batch setups list <<<\n')
 
-        # Download xml to temp folder
+        # Read catalog unless it was already read on a worker thread
 
-        self.batch_setups_xml_path = os.path.join(self.temp_folder, 'batch_setups.xml')
+        if batch_setups is None:
+            batch_setups = self.read_batch_setups()
+        if search_index is None:
+            search_index = CatalogSearchIndex(batch_setups, BATCH_SEARCH_FIELDS)
 
-        self.ftp.retrbinary('RETR ' + '/Batch_Setups/batch_setups.xml', open(self.batch_setups_xml_path, 'wb').write)
+        # Clear tree list
+
+        tree.clear()
 
         # Add items from xml to batch list
 
-        xml_tree = ET.parse(self.batch_setups_xml_path)
-        root = xml_tree.getroot()
+        # Index catalog by batch setup name so selections don't have to search the xml
 
-        for batch in root.findall('batch'):
-            batch_name = str(batch.get('name'))
-            artist_name = str(batch[0].text[1:-1])
-            flame_version = str(batch[1].text[1:-1])
+        self.batch_setup_catalog = dict((batch['name'], batch) for batch in batch_setups)
+
+        self.batch_setup_items = []
 
-            # print ('batch_name:', batch_name)
-            # print ('artist_name:', artist_name)
-            # print ('flame_version:', flame_version, '\n')
+        for batch in batch_setups:
 
-            batch_setup = QtWidgets.QTreeWidgetItem(tree, [batch_name, flame_version, artist_name])
+            batch_setup = QtWidgets.QTreeWidgetItem(tree, [batch['name'], batch['flame_version'], batch['artist']])
 
             # if batch setup requires newer version of flame grey out script entry
 
-            if float(self.flame_version) < float(flame_version):
+            if float(self.flame_version) < float(batch['flame_version']):
                 batch_setup.setForeground(0, QtGui.QColor('#555555'))
                 batch_setup.setForeground(1, QtGui.QColor('#555555'))
                 batch_setup.setForeground(2, QtGui.QColor('#555555'))
 
+            self.batch_setup_items.append(batch_setup)
+
+        # Reapply search to reloaded list
+
+        self.batch_setup_search = search_index
+        self.search_batch_setups(self.batch_setups_search_lineedit.text())
+
         # Select top item in batch setup list
 
+        if not tree.topLevelItemCount():
+            return
+
         tree.setCurrentItem(tree.topLevelItem(0))
 
         # Get selected batch setup description
@@ -1796,6 +3034,8 @@ class LogikPortal(object):
 
     def done(self):
 
+        self.portal_closed = True
+
         self.window.close()
 
         try:
@@ -1809,7 +3049,7 @@ class LogikPortal(object):
             pass
 
         try:
-            self.ftp.quit()
+            self.ftp_pool.close()
         except:
             pass
 
@@ -1821,6 +3061,586 @@ class LogikPortal(object):
 
         print ('done.\n')
 
+def read_script_header(script_path):
+
+    # Get script info from the comment block at the top of a script and description from its header docstring
+    # Script is only read up to the end of the header, old scripts without a Script Version are read until their VERSION line
+
+    script_lines = []
+    comment_lines = []
+    comments_done = False
+
+    with open(script_path, 'r') as script:
+        first_line = script.readline()
+        quote_count = first_line.count("'''")
+
+        # Split out script info to comment list
+
+        for line in script:
+            line = line.rstrip('\r\n')
+            script_lines.append(line)
+            quote_count += line.count("'''")
+
+            if not comments_done:
+                if line != '':
+                    comment_lines.append(line)
+                else:
+                    comments_done = True
+
+            if comments_done and quote_count >= 2:
+                break
+
+        header_text = first_line + '\n'.join(script_lines)
+
+        # For old scripts
+
+        if not [line for line in comment_lines if 'Script Version: ' in line] and not [line for line in script_lines if 'VERSION = ' in line]:
+            for line in script:
+                if 'VERSION = ' in line:
+                    script_lines.append(line.rstrip('\r\n'))
+                    break
+
+    try:
+        script_version = [line.split('Script Version: ', 1)[1] for line in comment_lines if 'Script Version: ' in line]
+        if script_version:
+            script_version = script_version[0]
+        else:
+            script_version = [line.split("'", 2)[1] for line in script_lines if 'VERSION = ' in line] # For old scripts
+            if script_version:
+                script_version = script_version[0]
+                if 'v' in script_version:
+                    script_version = script_version[1:]
+            else:
+                script_version = ''
+    except:
+        script_version = ''
+
+    try:
+        script_date = [line.split('Update Date: ', 1)[1] for line in comment_lines if 'Update Date: ' in line]
+        if script_date:
+            script_date = script_date[0]
+        else:
+            script_date = [line.split(' ', 1)[1] for line in comment_lines if 'Updated:' in line] # For old scripts
+            if script_date:
+                script_date = script_date[0]
+            else:
+                script_date = ''
+    except:
+        script_date = ''
+
+    try:
+        script_dev = [line.split('Written by: ', 1)[1] for line in comment_lines if 'Written by' in line]
+        if script_dev:
+            script_dev = script_dev[0]
+        else:
+            script_dev = [line.split('Created by ', 1)[1] for line in comment_lines if 'Created by' in line] # For old scripts
+            if script_dev:
+                script_dev = script_dev[0]
+            else:
+                script_dev = ''
+    except:
+        script_dev = ''
+
+    try:
+        script_flame_version = [line.split('Flame Version: ', 1)[1] for line in comment_lines if 'Flame Version: ' in line]
+        if script_flame_version:
+            script_flame_version = script_flame_version[0].split(' ', 1)[0]
+        else:
+            script_flame_version = [line.split(' ', 1)[1] for line in comment_lines if 'Flame 20' in line] # For old scripts
+            if script_flame_version:
+                script_flame_version = script_flame_version[0].split(' ', 1)[0]
+            else:
+                script_flame_version = ''
+    except:
+        script_flame_version = ''
+
+    # Description is everything between the first pair of triple quotes
+
+    try:
+        description = header_text.split("'''", 1)[1]
+        description = description.split("'''", 1)[0]
+        description = description.strip()
+    except:
+        description = ''
+
+    return {'version': script_version,
+            'flame_version': script_flame_version,
+            'date': script_date,
+            'dev': script_dev,
+            'description': description}
+
+def search_words(text):
+
+    # Lower case words of text for catalog search, flame versions such as 2021.2 are kept as one word
+
+    return re.findall(r'\w+(?:\.\w+)*', text.lower())
+
+def download_status(received, total, rate):
+
+    # Status line for a download such as: 45.2 of 300.0 MB  3.2 MB/s  1:20 left
+
+    megabytes = 1024.0 * 1024.0
+
+    if total:
+        status = '%.1f of %.1f MB' % (received / megabytes, total / megabytes)
+    else:
+        status = '%.1f MB' % (received / megabytes)
+
+    if rate:
+        status += '  %.1f MB/s' % (rate / megabytes)
+        if total:
+            seconds_left = int(max(total - received, 0) / rate)
+            status += '  %d:%02d left' % (seconds_left // 60, seconds_left % 60)
+
+    return status
+
+def upload_tgz(ftp, ftp_path, tar_files):
+
+    # Gzip tar tar_files, a list of (path, name in tar), straight into an ftp STOR without writing anything to disk
+
+    ftp.voidcmd('TYPE I')
+    conn = ftp.transfercmd('STOR ' + ftp_path)
+
+    try:
+        with conn.makefile('wb') as upload_file:
+            with tarfile.open(fileobj=upload_file, mode='w|gz') as tgz:
+                for path, name in tar_files:
+                    tgz.add(path, arcname=name)
+    except:
+
+        # Abandon upload but read the server's reply so the session can be reused
+
+        conn.close()
+        try:
+            ftp.voidresp()
+        except all_errors:
+            pass
+        raise
+
+    conn.close()
+    ftp.voidresp()
+
+def tgz_member_path(dest_folder, member_name):
+
+    # Path a tgz member unpacks to, refusing any member that would land outside of dest_folder
+
+    dest_folder = os.path.realpath(dest_folder)
+    member_path = os.path.realpath(os.path.join(dest_folder, member_name))
+
+    if member_path != dest_folder and not member_path.startswith(dest_folder + os.sep):
+        raise tarfile.TarError('%s is outside of %s' % (member_name, dest_folder))
+
+    return member_path
+
+def extract_tgz(tgz_file, dest_folder):
+
+    # Unpack tgz stream in-process as it is read, refusing any member that would land outside of dest_folder
+
+    dest_folder = os.path.realpath(dest_folder)
+
+    with tarfile.open(fileobj=tgz_file, mode='r|*') as tgz:
+        if hasattr(tarfile, 'data_filter'):
+            tgz.extraction_filter = tarfile.data_filter
+        for member in tgz:
+            member_path = tgz_member_path(dest_folder, member.name)
+            if member.issym() or member.islnk():
+                link_root = os.path.dirname(member_path) if member.issym() else dest_folder
+                link_path = os.path.realpath(os.path.join(link_root, member.linkname))
+                if not link_path.startswith(dest_folder + os.sep):
+                    raise tarfile.TarError('%s links outside of %s' % (member.name, dest_folder))
+            tgz.extract(member, dest_folder)
+
+def sync_portal_mirror(mirror_path, host=PORTAL_HOST, login=PORTAL_LOGINS['download'], port=21):
+
+    # Copy /Scripts and /Batch_Setups, including their catalogs, from the portal into mirror_path
+    # Files whose size and modification time match the mirror copy are skipped, files gone from the portal are removed
+
+    print ('\n>>> syncing portal mirror: %s <<<\n' % mirror_path)
+
+    user, password, cwd = login
+
+    ftp = FTP(timeout=60)
+    ftp.connect(host, port)
+    ftp.login(user, password)
+    ftp.voidcmd('TYPE I')
+
+    counts = {'downloaded': 0, 'skipped': 0, 'removed': 0}
+
+    try:
+        for ftp_folder in PORTAL_MIRROR_FOLDERS:
+            sync_mirror_folder(ftp, ftp_folder, os.path.join(mirror_path, ftp_folder.lstrip('/')), counts)
+    finally:
+        quit_session(ftp)
+
+    print ('\n>>> portal mirror synced: %(downloaded)s downloaded, %(skipped)s unchanged, %(removed)s removed <<<\n' % counts)
+
+    return counts
+
+def sync_mirror_folder(ftp, ftp_folder, mirror_folder, counts):
+
+    if not os.path.isdir(mirror_folder):
+        os.makedirs(mirror_folder)
+
+    entries = list_portal_folder(ftp, ftp_folder)
+
+    # Sync sub folders before files so catalogs are only updated once everything they list is in the mirror
+
+    for name, is_folder, size, mtime in sorted(entries, key=lambda entry: not entry[1]):
+        ftp_path = ftp_folder + '/' + name
+        mirror_path = tgz_member_path(mirror_folder, name)
+
+        if is_folder:
+            sync_mirror_folder(ftp, ftp_path, mirror_path, counts)
+            continue
+
+        if os.path.isfile(mirror_path) and os.path.getsize(mirror_path) == size and int(os.path.getmtime(mirror_path)) == mtime:
+            counts['skipped'] += 1
+            continue
+
+        print ('>>> mirroring %s <<<' % ftp_path)
+
+        with open(mirror_path + '.part', 'wb') as mirror_file:
+            ftp.retrbinary('RETR ' + ftp_path, mirror_file.write)
+        os.rename(mirror_path + '.part', mirror_path)
+        os.utime(mirror_path, (mtime, mtime))
+
+        counts['downloaded'] += 1
+
+    # Remove anything no longer on the portal
+
+    portal_names = set(entry[0] for entry in entries)
+
+    for name in os.listdir(mirror_folder):
+        if name in portal_names:
+            continue
+        mirror_path = os.path.join(mirror_folder, name)
+        if os.path.isdir(mirror_path):
+            shutil.rmtree(mirror_path)
+        else:
+            os.remove(mirror_path)
+        counts['removed'] += 1
+
+def list_portal_folder(ftp, ftp_folder):
+    import calendar
+
+    # Returns (name, is_folder, size, mtime) for each entry of a portal folder
+    # Uses MLSD when the server has it, otherwise NLST and SIZE/MDTM for each entry
+
+    def to_mtime(modify):
+        return calendar.timegm(time.strptime(modify[:14], '%Y%m%d%H%M%S'))
+
+    entries = []
+
+    try:
+        for name, facts in ftp.mlsd(ftp_folder, ['type', 'size', 'modify']):
+            if facts.get('type') == 'dir':
+                entries.append((name, True, 0, 0))
+            elif facts.get('type') == 'file':
+                entries.append((name, False, int(facts['size']), to_mtime(facts['modify'])))
+        return entries
+    except error_perm:
+        pass
+
+    for ftp_path in ftp.nlst(ftp_folder):
+        name = ftp_path.rstrip('/').rsplit('/', 1)[-1]
+        if name in ['.', '..']:
+            continue
+        try:
+            size = ftp.size(ftp_folder + '/' + name)
+            mtime = to_mtime(ftp.sendcmd('MDTM ' + ftp_folder + '/' + name).split(' ', 1)[1])
+            entries.append((name, False, size, mtime))
+        except error_perm:
+            entries.append((name, True, 0, 0))
+
+    return entries
+
+def benchmark_catalog_search(entry_count=10000):
+    import random
+
+    # Time search index build and searches typed one key at a time, then backspaced, against a synthetic catalog
+
+    random.seed(1)
+
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [''.join(random.choice(letters) for i in range(random.randint(3, 10))) for i in range(5000)]
+    vocabulary += ['blur', 'matchbox', 'camera', 'track', 'paint', 'action', 'render', 'batch', 'clip', 'export'] * 100
+
+    records = []
+    for entry_number in range(entry_count):
+        records.append({'name': ' '.join(random.sample(vocabulary, 3)) + ' %d' % entry_number,
+                        'developer': random.choice(vocabulary).title(),
+                        'flame_version': random.choice(['2020', '2021', '2021.1', '2021.2', '2022']),
+                        'description': ' '.join(random.choice(vocabulary) for i in range(random.randint(10, 60)))})
+
+    start_time = time.time()
+    search_index = CatalogSearchIndex(records, SCRIPT_SEARCH_FIELDS)
+    print ('index build: %.1f ms for %d entries' % ((time.time() - start_time) * 1000, entry_count))
+
+    for search_text in ['matchbox blur', 'camera track 2021.2', 'paint', 'zzzz']:
+        search_times = []
+        for length in list(range(1, len(search_text) + 1)) + list(range(len(search_text) - 1, -1, -1)):
+            start_time = time.time()
+            search_index.search(search_text[:length])
+            search_times.append((time.time() - start_time) * 1000)
+        print ('%-20s %5d matches  mean %.3f ms  max %.3f ms per keystroke' % (search_text, len(search_index.search(search_text)), sum(search_times) / len(search_times), max(search_times)))
+
+class PortalStandInHandler(socketserver.StreamRequestHandler):
+    """
+    One control connection to PortalStandIn
+    Handles the ftp commands the portal uses, paths are read from and written to the stand-in root folder
+    """
+
+    def reply(self, line):
+
+        self.wfile.write((line + '\r\n').encode('utf-8'))
+
+    def local_path(self, ftp_path):
+
+        return os.path.join(self.server.root_path, os.path.join(self.cwd, ftp_path).lstrip('/'))
+
+    def data_connection(self):
+
+        data_conn = self.data_socket.accept()[0]
+        self.data_socket.close()
+
+        return data_conn
+
+    def handle(self):
+
+        self.server.control_sockets.append(self.request)
+        self.cwd = '/'
+        self.rest = 0
+        self.reply('220 portal stand-in ready')
+
+        for line in self.rfile:
+            command, argument = (line.decode('utf-8').strip() + ' ').split(' ', 1)
+            command = command.upper()
+            argument = argument.strip()
+            self.server.commands.append((command, argument))
+
+            if command == 'USER':
+                self.reply('331 password required')
+            elif command == 'PASS':
+                self.server.logins += 1
+                self.reply('230 logged in')
+            elif command in ('TYPE', 'NOOP', 'OPTS'):
+                self.reply('200 ok')
+            elif command == 'CWD':
+                if os.path.isdir(self.local_path(argument)):
+                    self.cwd = os.path.join(self.cwd, argument)
+                    self.reply('250 ok')
+                else:
+                    self.reply('550 no such folder')
+            elif command == 'SIZE':
+                if os.path.isfile(self.local_path(argument)):
+                    self.reply('213 %s' % os.path.getsize(self.local_path(argument)))
+                else:
+                    self.reply('550 no such file')
+            elif command == 'MDTM':
+                self.reply('213 ' + time.strftime('%Y%m%d%H%M%S', time.gmtime(os.path.getmtime(self.local_path(argument)))))
+            elif command == 'REST':
+                self.rest = int(argument)
+                self.reply('350 restarting at %s' % self.rest)
+            elif command == 'PASV':
+                self.data_socket = socket.socket()
+                self.data_socket.bind(('127.0.0.1', 0))
+                self.data_socket.listen(1)
+                port = self.data_socket.getsockname()[1]
+                self.reply('227 entering passive mode (127,0,0,1,%s,%s)' % (port >> 8, port & 255))
+            elif command == 'RETR':
+                self.reply('150 opening data connection')
+                data_conn = self.data_connection()
+                with open(self.local_path(argument), 'rb') as local_file:
+                    local_file.seek(self.rest)
+                    self.rest = 0
+                    data = local_file.read()
+                if self.server.drop_after is not None:
+
+                    # Injected disconnect, send part of the file and drop both connections
+
+                    data_conn.sendall(data[:self.server.drop_after])
+                    self.server.drop_after = None
+                    data_conn.close()
+                    return
+                data_conn.sendall(data)
+                data_conn.close()
+                self.reply('226 transfer complete')
+            elif command == 'STOR':
+                self.reply('150 opening data connection')
+                data_conn = self.data_connection()
+                with open(self.local_path(argument), 'wb') as local_file:
+                    for block in iter(partial(data_conn.recv, 65536), b''):
+                        local_file.write(block)
+                data_conn.close()
+                self.reply('226 transfer complete')
+            elif command == 'MLSD':
+                self.reply('150 opening data connection')
+                data_conn = self.data_connection()
+                folder_path = self.local_path(argument)
+                for name in sorted(os.listdir(folder_path)):
+                    path = os.path.join(folder_path, name)
+                    facts = 'type=dir;' if os.path.isdir(path) else 'type=file;size=%s;' % os.path.getsize(path)
+                    facts += 'modify=%s;' % time.strftime('%Y%m%d%H%M%S', time.gmtime(os.path.getmtime(path)))
+                    data_conn.sendall(('%s %s\r\n' % (facts, name)).encode('utf-8'))
+                data_conn.close()
+                self.reply('226 transfer complete')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 %s not implemented' % command)
+
+class PortalStandIn(socketserver.ThreadingTCPServer):
+    """
+    Local ftp server standing in for the Logik Portal so session pool, resume and mirror sync can be checked without Flame
+    Set drop_after to a byte count to drop the connection part way through the next RETR
+    drop_sessions() drops every open control connection, the way a server drops idle sessions
+    """
+
+    daemon_threads = True
+
+    def __init__(self, root_path):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0), PortalStandInHandler)
+
+        self.root_path = root_path
+        self.control_sockets = []
+        self.commands = []
+        self.logins = 0
+        self.drop_after = None
+
+        server_thread = threading.Thread(target=self.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+
+    def drop_sessions(self):
+
+        for control_socket in self.control_sockets:
+            try:
+                control_socket.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+        del self.control_sockets[:]
+
+def check_portal_transfers():
+    import tempfile
+
+    # Check session pool, resumed downloads, streamed installs and uploads and mirror sync against a local portal stand-in
+
+    temp_folder = tempfile.mkdtemp(prefix='logik_portal_check_')
+    portal_folder = os.path.join(temp_folder, 'portal')
+
+    # Portal with a script tgz and a batch setup tgz big enough to be dropped part way through
+
+    script_folder = os.path.join(temp_folder, 'script')
+    os.makedirs(script_folder)
+    with open(os.path.join(script_folder, 'check_script.py'), 'w') as script_file:
+        script_file.write('# check script\n')
+
+    os.makedirs(os.path.join(portal_folder, 'Scripts', '2021'))
+    os.makedirs(os.path.join(portal_folder, 'Batch_Setups', '2021'))
+    os.makedirs(os.path.join(portal_folder, 'Submit'))
+
+    with tarfile.open(os.path.join(portal_folder, 'Scripts', '2021', 'check_script.tgz'), 'w:gz') as tgz:
+        tgz.add(os.path.join(script_folder, 'check_script.py'), arcname='check_script.py')
+
+    batch_data = os.urandom(1024 * 1024)
+    with open(os.path.join(portal_folder, 'Batch_Setups', '2021', 'check_batch.tgz'), 'wb') as batch_file:
+        batch_file.write(batch_data)
+
+    server = PortalStandIn(portal_folder)
+    logins = {'download': ('logik', 'check', ''), 'upload': ('logik_upload', 'check', '/Submit')}
+    port = server.server_address[1]
+    pool = PortalSessionPool('127.0.0.1', logins, keepalive_interval=0.2, port=port)
+
+    portal = LogikPortal.__new__(LogikPortal)
+    portal.ftp_pool = pool
+
+    try:
+
+        # Second session is the first one handed back, not a new login
+
+        with pool.session('download') as ftp:
+            first_session = ftp
+        with pool.session('download') as ftp:
+            assert ftp is first_session, 'idle session was not reused'
+        assert server.logins == 1, 'expected 1 login, got %s' % server.logins
+        print ('>>> acquire and reuse: ok <<<')
+
+        # Session dropped by the server is replaced with a fresh login
+
+        server.drop_sessions()
+        size = pool.run('download', lambda ftp: ftp.size('/Batch_Setups/2021/check_batch.tgz'))
+        assert size == len(batch_data), 'wrong size after reconnect'
+        assert server.logins == 2, 'expected 2 logins, got %s' % server.logins
+        print ('>>> dropped session reconnected: ok <<<')
+
+        # Keepalive drops idle sessions that don't answer NOOP
+
+        server.drop_sessions()
+        time.sleep(1)
+        assert pool.open_sessions['download'] == 0 and not pool.idle_sessions['download'], 'dead idle session kept'
+        print ('>>> keepalive drops dead sessions: ok <<<')
+
+        # Download dropped half way through resumes with REST from the partial file
+
+        server.drop_after = len(batch_data) // 2
+        batch_path = os.path.join(temp_folder, 'check_batch.tgz')
+        portal.download_file('/Batch_Setups/2021/check_batch.tgz', batch_path, len(batch_data), hashlib.sha256(batch_data).hexdigest())
+        with open(batch_path, 'rb') as batch_file:
+            assert batch_file.read() == batch_data, 'resumed download does not match'
+        assert ('REST', str(len(batch_data) // 2)) in server.commands, 'download was not resumed with REST'
+        print ('>>> REST resume after disconnect: ok <<<')
+
+        # Script tgz is unpacked as it streams in and submissions are streamed out as tgz
+
+        install_folder = os.path.join(temp_folder, 'installed')
+        os.makedirs(install_folder)
+        portal.download_tgz('/Scripts/2021/check_script.tgz', install_folder)
+        assert os.path.isfile(os.path.join(install_folder, 'check_script.py')), 'streamed install failed'
+
+        pool.run('upload', partial(upload_tgz, ftp_path='check_submit.tgz', tar_files=[(script_folder, 'check_script')]))
+        with tarfile.open(os.path.join(portal_folder, 'Submit', 'check_submit.tgz')) as tgz:
+            assert 'check_script/check_script.py' in tgz.getnames(), 'streamed upload failed'
+        print ('>>> streamed install and upload: ok <<<')
+
+        # Mirror sync only downloads what changed, mirror serves the same downloads
+
+        mirror_folder = os.path.join(temp_folder, 'mirror')
+        counts = sync_portal_mirror(mirror_folder, '127.0.0.1', logins['download'], port)
+        assert counts['downloaded'] == 2, 'expected 2 files mirrored, got %s' % counts['downloaded']
+        counts = sync_portal_mirror(mirror_folder, '127.0.0.1', logins['download'], port)
+        assert counts['downloaded'] == 0 and counts['skipped'] == 2, 'unchanged files mirrored again'
+
+        portal.ftp_pool = PortalMirror(mirror_folder, pool)
+        mirror_install_folder = os.path.join(temp_folder, 'mirror_installed')
+        os.makedirs(mirror_install_folder)
+        portal.download_tgz('/Scripts/2021/check_script.tgz', mirror_install_folder)
+        assert os.path.isfile(os.path.join(mirror_install_folder, 'check_script.py')), 'mirror install failed'
+        print ('>>> mirror sync and install: ok <<<')
+
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(temp_folder, True)
+
+    print ('\n>>> portal transfer checks passed <<<\n')
+
+def is_connection_error(error):
+
+    # Socket errors, a closed control connection and 421 service not available mean the session is gone
+
+    if isinstance(error, (socket.error, EOFError)):
+        return True
+    return isinstance(error, error_temp) and str(error).startswith('421')
+
+def quit_session(ftp):
+
+    try:
+        ftp.quit()
+    except all_errors:
+        ftp.close()
+
 def message_box(message):
 
     msg_box = QtWidgets.QMessageBox()
@@ -1868,6 +3688,26 @@ def message_box_confirm(message):
         return True
     return False
 
+def open_logik_portal(selection):
+    import cProfile
+    import pstats
+
+    # Set LOGIK_PORTAL_PROFILE to a file path to save a cProfile of portal startup to it
+
+    profile_path = os.environ.get('LOGIK_PORTAL_PROFILE')
+
+    if not profile_path:
+        return LogikPortal(selection)
+
+    profile = cProfile.Profile()
+    portal = profile.runcall(LogikPortal, selection)
+    profile.dump_stats(profile_path)
+
+    print ('\n>>> portal startup profile saved to %s <<<\n' % profile_path)
+    pstats.Stats(profile).sort_stats('cumulative').print_stats(20)
+
+    return portal
+
 def get_main_menu_custom_ui_actions():
 
     return [
@@ -1876,9 +3716,25 @@ def get_main_menu_custom_ui_actions():
             'actions': [
                 {
                     'name': 'Logik Portal',
-                    'execute': LogikPortal,
+                    'execute': open_logik_portal,
                     'minimumVersion': '2021'
                 }
             ]
         }
     ]
+
+if __name__ == '__main__':
+    import sys
+
+    # Run outside of Flame to sync a studio portal mirror, for example from cron
+
+    if len(sys.argv) == 3 and sys.argv[1] == '--sync-mirror':
+        sync_portal_mirror(sys.argv[2])
+    elif len(sys.argv) == 2 and sys.argv[1] == '--benchmark-search':
+        benchmark_catalog_search()
+    elif len(sys.argv) == 2 and sys.argv[1] == '--check-transfers':
+        check_portal_transfers()
+    else:
+        print ('usage: python logik_portal.py --sync-mirror /path/to/mirror')
+        print ('       python logik_portal.py --benchmark-search')
+        print ('       python logik_portal.py --check-transfers')
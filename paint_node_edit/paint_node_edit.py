@@ -12,6 +12,8 @@ Description:
 
     Edit paint stroke durations in paint node.
 
+    If more than one paint node is selected all selected paint nodes are edited with the same settings.
+
     Right-click on paint node -> Paint -> Delete Paint Strokes
     Right-click on paint node -> Paint -> Paint Strokes to Sequence: All
     Right-click on paint node -> Paint -> Paint Strokes to Range: All
@@ -79,14 +81,201 @@ v1.1 02.01.20:
 
 from __future__ import print_function
 import os
+import re
+from multiprocessing.pool import ThreadPool
 
 VERSION = 'v3.0'
 
+# Paint node code the stroke index needs to find, in the order it appears in a stroke
+
+STROKE_TOKENS = re.compile(r'<PrStroke|</PrStroke>|<stroke(\d+)>|LifeSpan(Start|End)="([^"]*)"|\b(?:Brush)?Type="([^"]*)"')
+
+# Lifespan values paint uses for strokes that last the whole sequence
+
+SEQUENCE_LIFESPAN = (-2147483648, 2147483647)
+
+# Stroke number tags, renumbered after strokes are deleted
+
+STROKE_TAG = re.compile(r'<(/?)stroke(\d+)>')
+
+class PaintStrokeIndex(object):
+    """
+    Index of the strokes in saved paint node code, built with one pass over the code
+    Each stroke has the offsets of its <PrStroke ... </PrStroke> code, its stroke number, its brush type and the offsets of its
+    LifeSpanStart and LifeSpanEnd values, so any number of strokes can be edited or deleted with one rewrite of the code
+    """
+
+    def __init__(self, paint_node_code):
+
+        self.paint_node_code = paint_node_code
+        self.strokes = []
+        self.last_stroke_number = None
+
+        # Lifespan values belong to the last stroke opened, same as splitting code on '<PrStroke'
+
+        stroke = None
+
+        for token in STROKE_TOKENS.finditer(paint_node_code):
+            code = token.group(0)
+
+            if token.group(1) is not None:
+                self.last_stroke_number = int(token.group(1))
+
+            if code == '<PrStroke':
+                stroke = {'start': token.start(), 'end': None, 'number': None, 'brush': None, 'lifespans': []}
+                self.strokes.append(stroke)
+            elif stroke is None:
+                continue
+            elif code == '</PrStroke>':
+                if stroke['end'] is None:
+                    stroke['end'] = token.end()
+            elif token.group(1) is not None:
+                if stroke['number'] is None:
+                    stroke['number'] = self.last_stroke_number
+            elif token.group(4) is not None:
+                if stroke['brush'] is None:
+                    stroke['brush'] = token.group(4)
+            else:
+                stroke['lifespans'].append((token.group(2), token.start(3), token.end(3)))
+
+    def strokes_in_range(self, first_stroke, last_stroke):
+
+        return [stroke for stroke in self.strokes if stroke['number'] is not None and first_stroke <= stroke['number'] <= last_stroke]
+
+    def lifespan(self, stroke):
+
+        # Returns first lifespan start and end of stroke as ints, None if missing
+
+        values = {}
+
+        for lifespan, value_start, value_end in stroke['lifespans']:
+            if lifespan not in values:
+                try:
+                    values[lifespan] = int(float(self.paint_node_code[value_start:value_end]))
+                except ValueError:
+                    values[lifespan] = None
+
+        return values.get('Start'), values.get('End')
+
+    def summary(self, first_stroke, last_stroke, first_frame, last_frame):
+
+        # Returns number of strokes in range, their brush types, first and last frame of their lifespans
+        # and how many of them are on each frame from first to last frame
+        # Lifespans are clipped to frame range, strokes with no lifespan are counted on every frame
+
+        brushes = {}
+        lifespan_first = None
+        lifespan_last = None
+        frame_changes = [0] * (last_frame - first_frame + 2)
+
+        strokes = self.strokes_in_range(first_stroke, last_stroke)
+
+        for stroke in strokes:
+            brush = stroke['brush'] or 'Unknown'
+            brushes[brush] = brushes.get(brush, 0) + 1
+
+            lifespan_start, lifespan_end = self.lifespan(stroke)
+
+            if lifespan_start is None:
+                lifespan_start = SEQUENCE_LIFESPAN[0]
+            if lifespan_end is None:
+                lifespan_end = SEQUENCE_LIFESPAN[1]
+
+            if lifespan_first is None or lifespan_start < lifespan_first:
+                lifespan_first = lifespan_start
+            if lifespan_last is None or lifespan_end > lifespan_last:
+                lifespan_last = lifespan_end
+
+            # Count stroke once where its lifespan starts and uncount it after it ends
+
+            start = max(lifespan_start, first_frame)
+            end = min(lifespan_end, last_frame)
+
+            if start <= end:
+                frame_changes[start - first_frame] += 1
+                frame_changes[end - first_frame + 1] -= 1
+
+        frame_counts = []
+        count = 0
+
+        for change in frame_changes[:-1]:
+            count += change
+            frame_counts.append(count)
+
+        return {'strokes': len(strokes),
+                'brushes': brushes,
+                'lifespan_first': lifespan_first,
+                'lifespan_last': lifespan_last,
+                'frame_counts': frame_counts}
+
+    def set_lifespans(self, first_stroke, last_stroke, lifespan_start, lifespan_end):
+
+        # Returns paint node code with lifespan of strokes in range changed
+
+        edits = []
+
+        for stroke in self.strokes_in_range(first_stroke, last_stroke):
+            for lifespan, value_start, value_end in stroke['lifespans']:
+                if lifespan == 'Start':
+                    edits.append((value_start, value_end, str(lifespan_start)))
+                else:
+                    edits.append((value_start, value_end, str(lifespan_end)))
+
+        return self.apply_edits(edits)
+
+    def delete_strokes(self, first_stroke, last_stroke):
+
+        # Returns paint node code with strokes in range removed and strokes after them renumbered to close the gap
+        # Strokes with no </PrStroke> before the next stroke are left alone
+
+        edits = [(stroke['start'], stroke['end'], '') for stroke in self.strokes_in_range(first_stroke, last_stroke) if stroke['end'] is not None]
+
+        # Old to new number of every stroke after deleted range
+
+        renumber = {}
+
+        if self.last_stroke_number is not None:
+            deleted_count = last_stroke - first_stroke + 1
+            for stroke_number in range(last_stroke + 1, self.last_stroke_number + 1):
+                renumber[stroke_number] = stroke_number - deleted_count
+
+        return self.apply_edits(edits, renumber)
+
+    def apply_edits(self, edits, renumber=None):
+
+        # Edits are (start, end, new code) and can't overlap
+        # If renumber is given, stroke tags in code that's kept are renumbered in same pass
+
+        def renumber_tag(tag):
+
+            stroke_number = int(tag.group(2))
+            if stroke_number not in renumber:
+                return tag.group(0)
+            return '<%sstroke%s>' % (tag.group(1), renumber[stroke_number])
+
+        def keep(code):
+
+            if renumber:
+                return STROKE_TAG.sub(renumber_tag, code)
+            return code
+
+        new_code = []
+        position = 0
+
+        for start, end, code in sorted(edits):
+            new_code.append(keep(self.paint_node_code[position:start]))
+            new_code.append(code)
+            position = end
+
+        new_code.append(keep(self.paint_node_code[position:]))
+
+        return ''.join(new_code)
+
 class EditPaint(object):
 
     def __init__(self, selection, lifespanstart, lifespanend, range_type, menu_size):
+        import shutil
         import flame
-        import re
 
         print ('\n', '>' * 20, 'paint node edit - %s %s' % (range_type, VERSION), '<' * 20, '\n')
 
@@ -94,10 +283,12 @@ class EditPaint(object):
 
         self.menu_size = menu_size
 
-        self.paint_node = [n for n in selection][0]
+        # All selected paint nodes are edited with the same settings
 
-        self.paint_node_name = str(self.paint_node.name)[1:-1]
-        print ('paint_node:', self.paint_node_name)
+        self.paint_nodes = [n for n in selection if n.type == 'Paint']
+
+        self.paint_node_names = [str(n.name)[1:-1] for n in self.paint_nodes]
+        print ('paint_nodes:', ', '.join(self.paint_node_names))
 
         self.lifespanstart = lifespanstart
         self.lifespanend = lifespanend
@@ -123,26 +314,22 @@ class EditPaint(object):
 
         # Create temp paint folder
 
-        self.temp_paint_path = '/opt/Autodesk/shared/python/paint_node_edit/temp_paint/'
-        if not os.path.isdir(self.temp_paint_path):
-            os.makedirs(self.temp_paint_path)
-
-        # Path to save paint node
-
-        self.paint_node_path = os.path.join(self.temp_paint_path, self.paint_node_name + '.paint_node')
+        self.temp_paint_path = create_temp_folder('paint_node_edit')
 
-        # Save paint node
+        # Save paint nodes, Flame has to do this from main thread
 
-        self.paint_node.save_node_setup(self.paint_node_path)
+        self.paint_setups = []
 
-        # Load saved paint node
+        for paint_node, paint_node_name in zip(self.paint_nodes, self.paint_node_names):
+            paint_node_path = os.path.join(self.temp_paint_path, paint_node_name + '.paint_node')
+            paint_node.save_node_setup(paint_node_path)
+            self.paint_setups.append({'node': paint_node, 'name': paint_node_name, 'path': paint_node_path})
 
-        get_paint_node = open(self.paint_node_path, 'r')
-        values = get_paint_node.read().splitlines()
+        # Read and index saved paint nodes in parallel
 
-        self.paint_node_code = values[0]
-
-        get_paint_node.close()
+        pool = ThreadPool(min(len(self.paint_setups), 8))
+        pool.map(read_paint_setup, self.paint_setups)
+        pool.close()
 
         # ------------------------ #
 
@@ -157,12 +344,17 @@ class EditPaint(object):
         self.x_scaling = ''
         self.y_scaling = ''
 
-        # Get last stroke number
+        # Get last stroke number, paint nodes without strokes are skipped
+
+        for paint_setup in self.paint_setups:
+            print ('%s last_stroke:' % paint_setup['name'], paint_setup['stroke_index'].last_stroke_number)
+
+        self.paint_setups = [paint_setup for paint_setup in self.paint_setups if paint_setup['stroke_index'].last_stroke_number is not None]
 
-        try:
-            self.last_stroke = int(re.findall('<stroke(.*?)>', self.paint_node_code)[-1])
+        if self.paint_setups:
+            self.last_stroke = max(paint_setup['stroke_index'].last_stroke_number for paint_setup in self.paint_setups)
             print ('last_stroke:', self.last_stroke, '\n')
-        except:
+        else:
             self.last_stroke = ''
 
         # If no strokes put up message window
@@ -175,6 +367,7 @@ class EditPaint(object):
             else:
                 self.main_window()
         else:
+            shutil.rmtree(self.temp_paint_path, True)
             message_box('No strokes to edit - Paint something!')
 
     def main_window(self):
@@ -693,6 +886,69 @@ class EditPaint(object):
 
                     self.setText(value_string)
 
+        class StrokeHistogram(QtWidgets.QWidget):
+            """
+            Bar graph of how many strokes are on each frame, frames are binned to fit widget width
+            Strokes in selected stroke range are drawn over all strokes
+            """
+
+            def __init__(self, all_counts, first_frame, parent=None):
+
+                super(StrokeHistogram, self).__init__(parent)
+
+                self.all_counts = all_counts
+                self.selected_counts = all_counts
+                self.first_frame = first_frame
+
+                self.setMinimumSize(QtCore.QSize(260, 60))
+                self.setMouseTracking(True)
+
+            def set_selected_counts(self, selected_counts):
+
+                self.selected_counts = selected_counts
+                self.update()
+
+            def paintEvent(self, event):
+                from PySide2 import QtGui
+
+                painter = QtGui.QPainter(self)
+                painter.fillRect(self.rect(), QtGui.QColor('#2d2d2d'))
+
+                frames = len(self.all_counts)
+                width = self.width()
+                height = self.height()
+
+                if frames and width:
+                    peak = max(max(self.all_counts), 1)
+                    columns = min(frames, width)
+
+                    for column in range(columns):
+
+                        # Tallest count of frames in column is drawn so single frame spikes aren't lost
+
+                        first = column * frames // columns
+                        last = max((column + 1) * frames // columns, first + 1)
+                        x = column * width // columns
+                        bar_width = max((column + 1) * width // columns - x, 1)
+
+                        for counts, color in ((self.all_counts, '#555555'), (self.selected_counts, '#b8b1a7')):
+                            bar_height = max(counts[first:last]) * height // peak
+                            if bar_height:
+                                painter.fillRect(x, height - bar_height, bar_width, bar_height, QtGui.QColor(color))
+
+                painter.end()
+
+            def mouseMoveEvent(self, event):
+
+                # Show stroke count of frame under cursor
+
+                if not self.all_counts or not self.width():
+                    return
+
+                frame = min(max(event.pos().x() * len(self.all_counts) // self.width(), 0), len(self.all_counts) - 1)
+
+                QtWidgets.QToolTip.showText(event.globalPos(), 'Frame %s: %s strokes, %s selected' % (frame + self.first_frame, self.all_counts[frame], self.selected_counts[frame]), self)
+
         def all_strokes_to_range(self):
 
             self.window.setWindowTitle('Edit Paint Node %s - All Paint Strokes to Frame Range' % VERSION)
@@ -1103,6 +1359,48 @@ class EditPaint(object):
             self.end_stroke_lineedit.textChanged.connect(end_set_slider)
             self.end_stroke_slider.raise_()
 
+            # Stroke Timeline - all strokes are summarized once, selected strokes again when stroke range changes
+
+            self.range7_label = QtWidgets.QLabel('Stroke Timeline', self.window)
+            self.range7_label.setAlignment(QtCore.Qt.AlignCenter)
+            self.range7_label.setMinimumSize(QtCore.QSize(260, 28))
+            self.range7_label.setStyleSheet('color: #9a9a9a; background-color: #393939; font: 14px "Discreet"')
+
+            all_strokes_summary = self.stroke_summary(0, self.last_stroke)
+
+            self.stroke_histogram = StrokeHistogram(all_strokes_summary['frame_counts'], 1, self.window)
+
+            self.stroke_summary_label = QtWidgets.QLabel('', self.window)
+            self.stroke_summary_label.setMinimumHeight(28)
+            self.stroke_summary_label.setWordWrap(True)
+            self.stroke_summary_label.setStyleSheet('color: #9a9a9a; font: 14px "Discreet"')
+
+            def lifespan_text(summary):
+
+                if summary['lifespan_first'] is None:
+                    return 'none'
+                if (summary['lifespan_first'], summary['lifespan_last']) == SEQUENCE_LIFESPAN:
+                    return 'sequence'
+
+                lifespan_first = 'sequence' if summary['lifespan_first'] == SEQUENCE_LIFESPAN[0] else summary['lifespan_first']
+                lifespan_last = 'sequence' if summary['lifespan_last'] == SEQUENCE_LIFESPAN[1] else summary['lifespan_last']
+
+                return '%s - %s' % (lifespan_first, lifespan_last)
+
+            def update_stroke_summary():
+
+                summary = self.stroke_summary(int(self.start_stroke_lineedit.text()), int(self.end_stroke_lineedit.text()))
+
+                brushes = ', '.join('%s %s' % (brush, count) for brush, count in sorted(summary['brushes'].items(), key=lambda brush: -brush[1]))
+
+                self.stroke_summary_label.setText('%s of %s strokes  |  Lifespan: %s  |  %s' % (summary['strokes'], all_strokes_summary['strokes'], lifespan_text(summary), brushes or 'No strokes'))
+                self.stroke_histogram.set_selected_counts(summary['frame_counts'])
+
+            self.start_stroke_lineedit.textChanged.connect(update_stroke_summary)
+            self.end_stroke_lineedit.textChanged.connect(update_stroke_summary)
+
+            update_stroke_summary()
+
             # Buttons
 
             self.apply_btn.clicked.connect(self.editpaint_strokes_range_range)
@@ -1137,6 +1435,12 @@ class EditPaint(object):
 
             self.gridbox.setRowMinimumHeight(7, 35)
 
+            self.gridbox.addWidget(self.range7_label, 8, 0, 1, 5)
+            self.gridbox.addWidget(self.stroke_histogram, 9, 0, 1, 5)
+            self.gridbox.addWidget(self.stroke_summary_label, 10, 0, 1, 5)
+
+            self.gridbox.setRowMinimumHeight(11, 35)
+
         def stroke_to_current_or_sequence_range_window(self):
 
             if self.range_type == 'sequence range':
@@ -1288,7 +1592,7 @@ class EditPaint(object):
         self.cancel_btn.setStyleSheet('QPushButton {color: #9a9a9a; background-color: #424142; border-top: 1px inset #555555; border-bottom: 1px inset black; font: 14px "Discreet"}'
                                       'QPushButton:pressed {color: #d9d9d9; background-color: #4f4f4f; border-top: 1px inset #666666; font: italic}'
                                       'QPushButton:disabled {color: #747474; background-color: #353535; border-top: 1px solid #444444; border-bottom: 1px solid #242424}')
-        self.cancel_btn.clicked.connect(self.window.close)
+        self.cancel_btn.clicked.connect(self.cancel)
 
         if self.range_type == 'range all':
             all_strokes_to_range(self)
@@ -1322,7 +1626,6 @@ class EditPaint(object):
         self.window.show()
 
     def editpaint_strokes_range_range(self):
-        import re
 
         # Variables from window
 
@@ -1339,41 +1642,18 @@ class EditPaint(object):
                 except:
                     pass
 
-                # Split paint node into strokes
-
-                split_list = self.paint_node_code.split('<PrStroke')
-
-                loop_range = end_stroke - start_stroke + 1
-
-                # Remove selected strokes
-
-                for s in range(loop_range):
-                    stroke_start_name = '<stroke%s>' % start_stroke
-                    #stroke_end_name = '</stroke%s>' % start_stroke
-
-                    for stroke in split_list:
-                        if stroke_start_name in stroke:
-                            stroke = '<PrStroke' + stroke
-
-                            # Replace lifespan values
-
-                            new_stroke = re.sub('LifeSpanStart="(.*?)"', 'LifeSpanStart="%s"' % start_frame, stroke)
-                            new_stroke = re.sub('LifeSpanEnd="(.*?)"', 'LifeSpanEnd="%s"' % end_frame, new_stroke)
+                # Replace lifespan values of selected strokes
 
-                            # Replace stroke code
+                for paint_setup in self.paint_setups:
+                    paint_setup['code'] = paint_setup['stroke_index'].set_lifespans(start_stroke, end_stroke, start_frame, end_frame)
 
-                            self.paint_node_code = self.paint_node_code.replace(stroke, new_stroke)
-
-                    start_stroke = start_stroke + 1
-
-                self.save_paint_node()
+                self.save_paint_nodes()
             else:
                 message_box('End frame should be equal to<br>or higher than start frame')
         else:
             message_box('End stroke should be equal to<br>or higher than start stroke')
 
     def editpaint_strokes_range(self):
-        import re
 
         start_stroke = int(str(self.start_stroke_lineedit.text()))
         end_stroke = int(str(self.end_stroke_lineedit.text()))
@@ -1381,34 +1661,12 @@ class EditPaint(object):
         if end_stroke >= start_stroke:
             self.window.close()
 
-            # Split paint node into strokes
-
-            split_list = self.paint_node_code.split('<PrStroke')
-
-            loop_range = end_stroke - start_stroke + 1
-            #print 'loop_range:', loop_range
-
-            # Edit selected strokes
-
-            for s in range(loop_range):
-                stroke_start_name = '<stroke%s>' % start_stroke
-
-                for stroke in split_list:
-                    if stroke_start_name in stroke:
-                        stroke = '<PrStroke' + stroke
-
-                        # Replace lifespan values
-
-                        new_stroke = re.sub('LifeSpanStart="(.*?)"', 'LifeSpanStart="%s"' % self.lifespanstart, stroke)
-                        new_stroke = re.sub('LifeSpanEnd="(.*?)"', 'LifeSpanEnd="%s"' % self.lifespanend, new_stroke)
-
-                        # Replace stroke code
-
-                        self.paint_node_code = self.paint_node_code.replace(stroke, new_stroke)
+            # Replace lifespan values of selected strokes
 
-                start_stroke = start_stroke + 1
+            for paint_setup in self.paint_setups:
+                paint_setup['code'] = paint_setup['stroke_index'].set_lifespans(start_stroke, end_stroke, self.lifespanstart, self.lifespanend)
 
-            self.save_paint_node()
+            self.save_paint_nodes()
 
         else:
             message_box('End stroke should be equal to<br>or higher than start stroke')
@@ -1425,67 +1683,14 @@ class EditPaint(object):
 
             self.window.close()
 
-            delete_start_stroke = delete_start
-
-            # Split paint node into strokes
-
-            split_list = self.paint_node_code.split('<PrStroke')
-
-            split_list_fixed = []
-
-            for line in split_list:
-                new_line = line.rsplit('</PrStroke>')[0]
-                split_list_fixed.append(new_line)
-
-            loop_range = delete_end - delete_start + 1
-
-            # Remove selected strokes
-
-            for s in range(loop_range):
-                stroke_start_name = '<stroke%s>' % delete_start
-                stroke_end_name = '</stroke%s>' % delete_start
-
-                for n in split_list_fixed:
-                    if stroke_start_name in n:
-                        n = '<PrStroke' + n + '</PrStroke>'
-                        # print 'stoke_code:', n, '\n', '\n'
-
-                        # Remove selected stroke string
-
-                        self.paint_node_code = self.paint_node_code.replace(n, '')
-
-                delete_start = delete_start + 1
+            # Remove selected strokes and renumber strokes after them
 
-            #print self.paint_node_code
-
-            loop_range = self.last_stroke - delete_end
-            stroke_num = delete_end + 1
-            new_stroke_num = delete_start_stroke
-
-            for s in range(loop_range):
-                stroke_start_name = '<stroke%s>' % stroke_num
-                stroke_end_name = '</stroke%s>' % stroke_num
-                # print 'stroke_start_name:', stroke_start_name
-                # print 'stroke_end_name:', stroke_end_name
-
-                new_stroke_start_name = '<stroke%s>' % new_stroke_num
-                new_stroke_end_name = '</stroke%s>' % new_stroke_num
-                # print 'new_stroke_start_name:', new_stroke_start_name
-                # print 'new_stroke_end_name:', new_stroke_end_name
-
-                self.paint_node_code = self.paint_node_code.replace(stroke_start_name, new_stroke_start_name)
-                self.paint_node_code = self.paint_node_code.replace(stroke_end_name, new_stroke_end_name)
-
-                new_stroke_num = new_stroke_num + 1
-                stroke_num = stroke_num + 1
-                # print 'new_stroke_num:', new_stroke_num
-                # print 'stroke_num:', stroke_num
-
-            # print '\n', self.paint_node_code, '\n'
+            for paint_setup in self.paint_setups:
+                paint_setup['code'] = paint_setup['stroke_index'].delete_strokes(delete_start, delete_end)
 
             print ('deleted strokes %s to %s\n' % (delete_start, delete_end))
 
-            self.save_paint_node()
+            self.save_paint_nodes()
         else:
             message_box('End stroke should be equal to<br>or higher than start stroke')
 
@@ -1494,10 +1699,11 @@ class EditPaint(object):
 
         # Replace lifespan values
 
-        self.paint_node_code = re.sub('LifeSpanStart="(.*?)"', 'LifeSpanStart="%s"' % self.lifespanstart, self.paint_node_code)
-        self.paint_node_code = re.sub('LifeSpanEnd="(.*?)"', 'LifeSpanEnd="%s"' % self.lifespanend, self.paint_node_code)
+        for paint_setup in self.paint_setups:
+            paint_setup['code'] = re.sub('LifeSpanStart="(.*?)"', 'LifeSpanStart="%s"' % self.lifespanstart, paint_setup['code'])
+            paint_setup['code'] = re.sub('LifeSpanEnd="(.*?)"', 'LifeSpanEnd="%s"' % self.lifespanend, paint_setup['code'])
 
-        self.save_paint_node()
+        self.save_paint_nodes()
 
     def editpaint_node_range_all(self):
 
@@ -1517,35 +1723,104 @@ class EditPaint(object):
         else:
             message_box('End frame should be equal to<br>or higher than start frame')
 
+    def cancel(self):
+        import shutil
+
+        # Delete temp folder
+
+        shutil.rmtree(self.temp_paint_path, True)
+
+        self.window.close()
+
+    def stroke_summary(self, first_stroke, last_stroke):
+
+        # Summary of strokes in range across all paint nodes, over the same frame range as the frame range sliders
+
+        summary = {'strokes': 0, 'brushes': {}, 'lifespan_first': None, 'lifespan_last': None, 'frame_counts': [0] * self.batch_duration}
+
+        for paint_setup in self.paint_setups:
+            paint_summary = paint_setup['stroke_index'].summary(first_stroke, last_stroke, 1, self.batch_duration)
+
+            summary['strokes'] += paint_summary['strokes']
+
+            for brush, count in paint_summary['brushes'].items():
+                summary['brushes'][brush] = summary['brushes'].get(brush, 0) + count
+
+            if paint_summary['lifespan_first'] is not None:
+                if summary['lifespan_first'] is None or paint_summary['lifespan_first'] < summary['lifespan_first']:
+                    summary['lifespan_first'] = paint_summary['lifespan_first']
+                if summary['lifespan_last'] is None or paint_summary['lifespan_last'] > summary['lifespan_last']:
+                    summary['lifespan_last'] = paint_summary['lifespan_last']
+
+            summary['frame_counts'] = [count + paint_count for count, paint_count in zip(summary['frame_counts'], paint_summary['frame_counts'])]
+
+        return summary
+
     #------------------------------------#
 
-    def save_paint_node(self):
+    def save_paint_nodes(self):
         import shutil
-        import flame
-
-        # Save paint node setup file
+        import time
 
-        paint_code = []
+        start_time = time.time()
 
-        paint_code.insert(0, self.paint_node_code)
+        # Overwrite old paint node setup files with new paint node code in parallel
 
-        # Overwrite old paint node with new paint node
+        pool = ThreadPool(min(len(self.paint_setups), 8))
+        pool.map(write_paint_setup, self.paint_setups)
+        pool.close()
 
-        out_file = open(self.paint_node_path, 'w')
-        for line in paint_code:
-            print(line, file=out_file)
-        out_file.close()
+        # Load new setups, Flame has to do this from main thread
 
-        self.paint_node.load_node_setup(self.paint_node_path)
+        for paint_setup_number, paint_setup in enumerate(self.paint_setups):
+            paint_setup['node'].load_node_setup(paint_setup['path'])
+            print ('>>> paint node updated %s of %s: %s <<<' % (paint_setup_number + 1, len(self.paint_setups), paint_setup['name']))
 
         # Delete temp folder
 
         shutil.rmtree(self.temp_paint_path)
 
-        print ('\n>>> paint node updated <<<\n')
+        print ('\n>>> %s paint node(s) updated in %.2f sec <<<\n' % (len(self.paint_setups), time.time() - start_time))
+
+        if len(self.paint_setups) > 1:
+            message_box('%s paint nodes updated:<br><br>%s' % (len(self.paint_setups), '<br>'.join(paint_setup['name'] for paint_setup in self.paint_setups)))
 
 #------------------------------------#
 
+def create_temp_folder(script_name):
+    import tempfile
+    import atexit
+    import shutil
+
+    # Create private temp folder for this run on local disk so setups aren't saved and loaded over the network
+    # Uses $TMPDIR if it's set, otherwise /dev/shm. Folder is removed when flame exits if script doesn't get to remove it
+
+    temp_root = os.environ.get('TMPDIR')
+    if not temp_root and os.access('/dev/shm', os.W_OK):
+        temp_root = '/dev/shm'
+
+    temp_folder = tempfile.mkdtemp(prefix=script_name + '_', dir=temp_root)
+    atexit.register(shutil.rmtree, temp_folder, True)
+
+    return temp_folder
+
+def read_paint_setup(paint_setup):
+
+    # Load saved paint node and index its strokes once so range edits and deletes don't have to search the code for each stroke
+
+    get_paint_node = open(paint_setup['path'], 'r')
+    values = get_paint_node.read().splitlines()
+    get_paint_node.close()
+
+    paint_setup['code'] = values[0]
+    paint_setup['stroke_index'] = PaintStrokeIndex(paint_setup['code'])
+
+def write_paint_setup(paint_setup):
+
+    out_file = open(paint_setup['path'], 'w')
+    print(paint_setup['code'], file=out_file)
+    out_file.close()
+
 def message_box(message):
     from PySide2 import QtWidgets, QtCore
 
@@ -1633,7 +1908,7 @@ def edit_sequence_range(selection):
 
 def edit_range(selection):
 
-    menu_size = 260
+    menu_size = 420
 
     lifespanstart = 1
     lifespanend = 1
@@ -1659,6 +1934,35 @@ def edit_current_frame_range(selection):
 
 #------------------------------------#
 
+def benchmark_stroke_delete():
+    import time
+
+    # Time indexing, summarizing and deleting the first tenth of the strokes of synthetic paint nodes
+    # Time per stroke should stay flat as stroke count goes up
+
+    for stroke_count in [5000, 10000, 20000]:
+        paint_node_code = ['<Setup><Strokes>']
+        for stroke_number in range(stroke_count):
+            paint_node_code.append('<PrStroke LifeSpanStart="%d" LifeSpanEnd="%d"><stroke%d><Points>0 0 1 1</Points></stroke%d></PrStroke>' % (stroke_number, stroke_number, stroke_number, stroke_number))
+        paint_node_code.append('</Strokes></Setup>')
+        paint_node_code = ''.join(paint_node_code)
+
+        start_time = time.time()
+        stroke_index = PaintStrokeIndex(paint_node_code)
+        index_time = time.time() - start_time
+
+        start_time = time.time()
+        stroke_index.summary(0, stroke_count, 1, stroke_count)
+        summary_time = time.time() - start_time
+
+        start_time = time.time()
+        stroke_index.delete_strokes(0, stroke_count // 10 - 1)
+        delete_time = time.time() - start_time
+
+        print ('%6d strokes  index %.3f sec  timeline summary %.3f sec  delete/renumber %.3f sec  %.2f us per stroke' % (stroke_count, index_time, summary_time, delete_time, delete_time / stroke_count * 1000000))
+
+#------------------------------------#
+
 def scope_paint_node(selection):
     import flame
 
@@ -1720,3 +2024,13 @@ def get_batch_custom_ui_actions():
             ]
         }
     ]
+
+if __name__ == '__main__':
+    import sys
+
+    # Run outside of Flame to benchmark stroke delete: python paint_node_edit.py --benchmark
+
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_stroke_delete()
+    else:
+        print ('usage: python paint_node_edit.py --benchmark')